@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark: registry cold start with and without the snapshot
+
+For each agent count (default 1,000 and 10,000) writes synthetic agents into
+a temporary workspace, then measures AgentRegistry construction:
+
+- scan: no snapshot, every metadata.json is parsed
+- snapshot: after save_registry wrote .mcp-state/registry.snapshot
+- partial: the snapshot with 10% of the agents' metadata rewritten since,
+  so only those are parsed again
+
+Each registry is checked to index the same agent states.
+
+Usage: python scripts/bench_cold_start.py [--agents 1000 10000]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def write_agents(agents_dir: Path, count: int) -> list[Path]:
+    """Create `count` agents on disk with metadata only"""
+    now = datetime.now(timezone.utc).isoformat()
+    paths = []
+    for i in range(count):
+        agent_id = str(uuid.uuid4())
+        metadata = {
+            "agent_id": agent_id,
+            "name": f"agent-{i:05d}",
+            "description": f"Synthetic agent {i}",
+            "managed_files": [f"src/module_{i}.py"],
+            "created_at": now,
+            "last_updated": now,
+            "interaction_count": i % 50,
+            "success_rate": 1.0 if i % 50 else 0.0,
+            "total_tasks_completed": i % 50,
+            "recent_interactions": [{"timestamp": now, "success": True, "type": "task_execution"}] * (i % 10),
+        }
+        path = agents_dir / agent_id / "metadata.json"
+        path.parent.mkdir(parents=True)
+        path.write_text(json.dumps(metadata, indent=2))
+        paths.append(path)
+    return paths
+
+
+async def cold_start(registry_class, config_manager):
+    """Construct a registry, returning it and the construction time"""
+    start = time.perf_counter()
+    registry = registry_class(config_manager)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0)  # Let the background tasks it scheduled start before shutdown
+    return registry, elapsed
+
+
+async def run(agent_count: int):
+    with tempfile.TemporaryDirectory() as workspace:
+        # ConfigManager picks the workspace up from WORKSPACE_PATH
+        os.environ["WORKSPACE_PATH"] = workspace
+        paths = write_agents(Path(workspace) / ".mcp-agents", agent_count)
+
+        from src.core.agents.registry.registry import AgentRegistry
+        from src.core.config.manager.manager import ConfigManager
+        from src.schemas.agents.agents import AgentState
+
+        config_manager = ConfigManager()
+        snapshot_path = config_manager.system.state_dir / "registry.snapshot"
+        assert not snapshot_path.exists()
+
+        registry, scan_time = await cold_start(AgentRegistry, config_manager)
+        expected = {agent_id: state.to_dict() for agent_id, state in registry.agent_index.items()}
+        await registry.shutdown()  # Writes the snapshot
+        snapshot_size = snapshot_path.stat().st_size
+
+        registry, snapshot_time = await cold_start(AgentRegistry, config_manager)
+        assert {agent_id: state.to_dict() for agent_id, state in registry.agent_index.items()} == expected
+        await registry.shutdown()
+
+        # Rewrite a tenth of the agents behind the snapshot's back
+        for path in paths[::10]:
+            data = json.loads(path.read_text())
+            data["interaction_count"] += 1
+            expected[data["agent_id"]] = AgentState(**data).to_dict()  # With field defaults filled in
+            path.write_text(json.dumps(data, indent=2))
+
+        registry, partial_time = await cold_start(AgentRegistry, config_manager)
+        assert {agent_id: state.to_dict() for agent_id, state in registry.agent_index.items()} == expected
+        await registry.shutdown()
+
+    print(f"{agent_count:,} agents ({snapshot_size / 1024:,.0f} KB snapshot)")
+    print(f"  scan      {scan_time * 1000:>9.1f} ms")
+    print(f"  snapshot  {snapshot_time * 1000:>9.1f} ms  {scan_time / snapshot_time:>5.1f}x faster")
+    print(f"  partial   {partial_time * 1000:>9.1f} ms  {scan_time / partial_time:>5.1f}x faster (10% changed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, nargs="+", default=[1_000, 10_000], help="Agent counts to measure")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)  # Startup and shutdown log per agent
+    for agent_count in args.agents:
+        asyncio.run(run(agent_count))
+
+
+if __name__ == "__main__":
+    main()
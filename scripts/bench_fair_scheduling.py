@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Benchmark: dispatch wait for a low-volume agent under a flood
+
+Agent "flood" submits N code_generation tasks and, once a few of them have been
+dispatched, agent "quiet" submits one. Reports how many dispatch slots the quiet agent waits with the previous global
+(-priority, task_id) heap and with the FairScheduler, then measures wall-clock
+enqueue-to-start wait through a real TaskQueue. Exits non-zero if the fair
+wait is not bounded by the flood agent's quantum.
+
+Usage: python scripts/bench_fair_scheduling.py [--flood 50] [--flood-weight 1]
+"""
+
+import argparse
+import asyncio
+import heapq
+import math
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.tasks.queue import AgentTask, FairScheduler, TaskExecutor, TaskQueue  # noqa: E402
+
+
+def make_tasks(flood: int) -> list[AgentTask]:
+    tasks = [AgentTask.create("flood", {"message": f"task {i}", "task_type": "code_generation"}) for i in range(flood)]
+    tasks.append(AgentTask.create("quiet", {"message": "hello", "task_type": "conversation"}))
+    return tasks
+
+
+def slots_waited_global_heap(tasks: list[AgentTask], head_start: int) -> int:
+    """Dispatch slots before the quiet task starts with the old global heap"""
+    heap = [(-task.priority, task.task_id) for task in tasks[:-1]]
+    heapq.heapify(heap)
+    for _ in range(head_start):
+        heapq.heappop(heap)
+    quiet_id = tasks[-1].task_id
+    heapq.heappush(heap, (-tasks[-1].priority, quiet_id))
+    slot = 0
+    while heap:
+        _, task_id = heapq.heappop(heap)
+        if task_id == quiet_id:
+            return slot
+        slot += 1
+    raise RuntimeError("quiet task never dispatched")
+
+
+def slots_waited_fair(tasks: list[AgentTask], head_start: int, flood_weight: float) -> int:
+    """Dispatch slots before the quiet task starts with the fair scheduler"""
+    scheduler = FairScheduler({"flood": flood_weight})
+    for task in tasks[:-1]:
+        scheduler.put(task)
+    for _ in range(head_start):
+        scheduler.get_nowait()
+    quiet_id = tasks[-1].task_id
+    scheduler.put(tasks[-1])
+    slot = 0
+    while not scheduler.empty():
+        if scheduler.get_nowait() == quiet_id:
+            return slot
+        slot += 1
+    raise RuntimeError("quiet task never dispatched")
+
+
+class RecordStart(TaskExecutor):
+    """Executor that records when each task started"""
+
+    def __init__(self):
+        self.started: dict[str, float] = {}
+
+    async def execute(self, task):
+        self.started[task.task_id] = time.perf_counter()
+        await asyncio.sleep(0.5)  # Simulated generation time
+        task.result = {"success": True}
+
+
+async def wall_clock_wait(flood: int, head_start: int, flood_weight: float) -> float:
+    """Enqueue-to-start wait of the quiet task through a real TaskQueue"""
+    queue = TaskQueue(max_tasks=flood + 10, agent_weights={"flood": flood_weight})
+    executor = RecordStart()
+    queue.register_executor("agent_operation", executor)
+
+    tasks = make_tasks(flood)
+    for task in tasks[:-1]:
+        queue.queue_task(task)
+
+    await queue.start_worker()
+    while len(executor.started) < head_start:
+        await asyncio.sleep(0.01)
+
+    quiet = tasks[-1]
+    enqueued = time.perf_counter()
+    queue.queue_task(quiet)
+    while quiet.task_id not in executor.started:
+        await asyncio.sleep(0.01)
+    await queue.stop_worker()
+    return executor.started[quiet.task_id] - enqueued
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flood", type=int, default=50, help="Tasks submitted by the flooding agent")
+    parser.add_argument("--flood-weight", type=float, default=1.0, help="Scheduling weight of the flooding agent")
+    parser.add_argument("--head-start", type=int, default=5, help="Flood tasks dispatched before the quiet agent submits")
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.flood)
+    legacy_slots = slots_waited_global_heap(tasks, args.head_start)
+    fair_slots = slots_waited_fair(tasks, args.head_start, args.flood_weight)
+    # The flood flow can hold at most one quantum (ceil(weight)) when the quiet task arrives
+    bound = math.ceil(args.flood_weight)
+
+    print(f"Flood of {args.flood} tasks ({args.head_start} already dispatched), flood weight {args.flood_weight}")
+    print(f"  global heap: quiet agent waits {legacy_slots} dispatch slots (depends on random task IDs)")
+    print(f"  fair (DRR):  quiet agent waits {fair_slots} dispatch slots (bound {bound})")
+
+    wait = asyncio.run(wall_clock_wait(args.flood, args.head_start, args.flood_weight))
+    print(f"  fair (DRR):  quiet agent enqueue-to-start {wait * 1000:.0f} ms through TaskQueue")
+
+    if fair_slots > bound:
+        print("FAIL: fair scheduler wait exceeded the flood agent's quantum")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
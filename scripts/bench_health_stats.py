@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Benchmark: /health with many agents loaded
+
+Indexes N synthetic agents (default 10,000), then times the /health handler,
+which calls AgentRegistry.get_registry_stats on every request:
+
+- before: the statistics recomputed with a pass over every agent and task
+- after: get_registry_stats reading the registry's running totals
+
+Before timing, a mix of interactions, file assignments and removals is
+applied through the registry and the running totals are checked against
+a full recomputation.
+
+Usage: python scripts/bench_health_stats.py [--agents 10000] [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def write_agents(agents_dir: Path, count: int):
+    """Create `count` agents on disk with metadata only"""
+    now = datetime.now(timezone.utc).isoformat()
+    for i in range(count):
+        agent_id = str(uuid.uuid4())
+        interactions = random.randint(0, 50)
+        completed = random.randint(0, interactions)
+        metadata = {
+            "agent_id": agent_id,
+            "name": f"agent-{i:05d}",
+            "description": f"Synthetic agent {i}",
+            "managed_files": [f"src/module_{i}.py"],
+            "created_at": now,
+            "last_updated": now,
+            "interaction_count": interactions,
+            "success_rate": completed / interactions if interactions else 0.0,
+            "total_tasks_completed": completed,
+            "recent_interactions": [],
+        }
+        (agents_dir / agent_id).mkdir(parents=True)
+        (agents_dir / agent_id / "metadata.json").write_text(json.dumps(metadata))
+
+
+def recompute_stats(registry) -> dict:
+    """get_registry_stats as it was: a pass over every agent and every task"""
+    states = registry.agent_index.values()
+    success_rates = [state.success_rate for state in states if state.interaction_count > 0]
+    most_active = max(states, key=lambda state: state.interaction_count, default=None)
+    return {
+        "total_agents": len(registry.agent_index),
+        "hydrated_agents": len(registry.agents),
+        "managed_files": sum(len(state.managed_files) for state in states),
+        "total_interactions": sum(state.interaction_count for state in states),
+        "average_success_rate": round(sum(success_rates) / len(success_rates), 3) if success_rates else 0.0,
+        "most_active_agent": most_active.name if most_active else None,
+        "queued_tasks": len(registry.task_queue.tasks),
+        "active_tasks": sum(1 for t in registry.task_queue.tasks.values() if t.status.value == "running"),
+        "timed_out_tasks": registry.task_queue.metrics["timeouts"],
+        "deduplicated_submissions": registry.task_queue.metrics["deduplicated"],
+        "rejected_tasks": registry.task_queue.metrics["rejected"],
+        "conversation_summaries": registry.compactor.summaries,
+        "batched_tasks": registry.agent_executor.batched_tasks,
+        "llm_calls_saved": registry.agent_executor.llm_calls_saved,
+        "max_hydrated_agents": registry.max_hydrated_agents,
+        "dehydrated_agents": registry.dehydrated_count,
+        "resident_bytes": sum(agent.resident_bytes for agent in registry.agents.values()),
+        "resident_bytes_by_agent": {agent_id: agent.resident_bytes for agent_id, agent in registry.agents.items()},
+    }
+
+
+def churn(registry, operations: int):
+    """Apply interactions, file moves and removals through the registry's own paths"""
+    # A subset keeps the number of hydrated agents (and their open log files) modest
+    agent_ids = random.sample(list(registry.agent_index), min(200, len(registry.agent_index)))
+    for n in range(operations):
+        agent_id = random.choice(agent_ids)
+        if agent_id not in registry.agent_index:
+            continue
+        action = n % 10
+        if action < 7:
+            registry.get_agent(agent_id)._update_interaction_stats(success=random.random() < 0.8)
+        elif action < 9:
+            registry.assign_file_to_agent(agent_id, f"src/extra_{n}.py")
+        else:
+            registry.remove_agent(agent_id)
+
+
+async def time_health(handler, llm_manager, registry, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await handler(None, llm_manager, registry)
+    return (time.perf_counter() - start) / requests
+
+
+async def run(agent_count: int, requests: int, operations: int):
+    with tempfile.TemporaryDirectory() as workspace:
+        # ConfigManager picks the workspace up from WORKSPACE_PATH
+        os.environ["WORKSPACE_PATH"] = workspace
+        print(f"Writing {agent_count:,} agents...")
+        write_agents(Path(workspace) / ".mcp-agents", agent_count)
+
+        import logging
+
+        from src.api.http.handlers import handlers
+        from src.core.agents.registry.registry import AgentRegistry
+        from src.core.config.manager.manager import ConfigManager
+        from src.core.llm.manager.manager import LLMManager
+
+        logging.disable(logging.INFO)  # The handler logs every request
+        registry = AgentRegistry(ConfigManager())
+        llm_manager = LLMManager()
+
+        churn(registry, operations)
+        incremental, recomputed = registry.get_registry_stats(), recompute_stats(registry)
+        # Agents tied for most interactions may be reported in either order
+        leaders = [
+            registry.get_agent_by_name(stats.pop("most_active_agent")).state.interaction_count
+            for stats in (incremental, recomputed)
+        ]
+        assert incremental == recomputed and leaders[0] == leaders[1], (incremental, recomputed)
+        print(f"Running totals match a full recomputation after {operations:,} state changes\n")
+
+        original = registry.get_registry_stats
+        registry.get_registry_stats = lambda: recompute_stats(registry)
+        before = await time_health(handlers.handle_health_check, llm_manager, registry, requests)
+        registry.get_registry_stats = original
+        after = await time_health(handlers.handle_health_check, llm_manager, registry, requests)
+
+        print(f"/health with {len(registry.agent_index):,} agents, {requests:,} requests\n")
+        print(f"before  {before * 1_000_000:>10.1f} us/request  {1 / before:>10,.0f} requests/s")
+        print(f"after   {after * 1_000_000:>10.1f} us/request  {1 / after:>10,.0f} requests/s")
+        print(f"\n{before / after:.1f}x faster")
+
+        await registry.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=10_000, help="Number of synthetic agents")
+    parser.add_argument("--requests", type=int, default=2_000, help="Health requests per measurement")
+    parser.add_argument("--operations", type=int, default=2_000, help="State changes applied before timing")
+    args = parser.parse_args()
+    asyncio.run(run(args.agents, args.requests, args.operations))
+
+
+if __name__ == "__main__":
+    main()
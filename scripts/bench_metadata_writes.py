@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Benchmark: agent metadata persistence
+
+Applies interaction-stat updates to a set of agents the way
+Agent._update_interaction_stats does, persisting them:
+
+- before: synchronous json.dump(indent=2) straight into metadata.json on every update
+- after: AgentStateStore.mark_dirty, with the background flusher writing
+  coalesced states through temp file + atomic rename
+
+Reports updates per second as seen by the event loop and the number of
+files actually written.
+
+Usage: python scripts/bench_metadata_writes.py [--agents 20] [--updates 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.agents.agent.state_store import AgentStateStore  # noqa: E402
+from src.schemas.agents.agents import AgentState  # noqa: E402
+
+
+def make_states(count: int) -> list[AgentState]:
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        AgentState(
+            agent_id=f"agent-{i:04d}",
+            name=f"Agent {i}",
+            description="Synthetic agent",
+            managed_files=[f"src/module_{i}.py"],
+            created_at=now,
+            last_updated=now,
+            interaction_count=0,
+            success_rate=0.0,
+            total_tasks_completed=0,
+            recent_interactions=[],
+        )
+        for i in range(count)
+    ]
+
+
+def update(state: AgentState):
+    """Same mutation as Agent._update_interaction_stats"""
+    state.interaction_count += 1
+    state.total_tasks_completed += 1
+    state.success_rate = state.total_tasks_completed / state.interaction_count
+    state.last_updated = datetime.now(timezone.utc).isoformat()
+    state.recent_interactions.append({"timestamp": state.last_updated, "success": True, "type": "task_execution"})
+    state.recent_interactions = state.recent_interactions[-10:]
+
+
+async def run_before(root: Path, states: list[AgentState], updates: int) -> tuple[float, int]:
+    paths = [root / state.agent_id / "metadata.json" for state in states]
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    for n in range(updates):
+        index = n % len(states)
+        update(states[index])
+        with open(paths[index], "w") as f:
+            json.dump(states[index].to_dict(), f, indent=2)
+        if n % 100 == 0:
+            await asyncio.sleep(0)  # Give the loop a turn, as between real requests
+    return time.perf_counter() - start, updates
+
+
+async def run_after(root: Path, states: list[AgentState], updates: int, interval: float) -> tuple[float, int]:
+    paths = [root / state.agent_id / "metadata.json" for state in states]
+    store = AgentStateStore(flush_interval=interval)
+    await store.start()
+
+    start = time.perf_counter()
+    for n in range(updates):
+        index = n % len(states)
+        update(states[index])
+        store.mark_dirty(paths[index], states[index])
+        if n % 100 == 0:
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    await store.stop()
+    for state, path in zip(states, paths):
+        assert json.loads(path.read_text())["interaction_count"] == state.interaction_count
+    return elapsed, store.writes
+
+
+async def main_async(agents: int, updates: int, interval: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        before_time, before_writes = await run_before(Path(tmp) / "before", make_states(agents), updates)
+        after_time, after_writes = await run_after(Path(tmp) / "after", make_states(agents), updates, interval)
+
+    print(f"{updates:,} updates across {agents} agents\n")
+    print(f"before  {updates / before_time:>12,.0f} updates/s  {before_writes:>8,} files written")
+    print(f"after   {updates / after_time:>12,.0f} updates/s  {after_writes:>8,} files written")
+    print(f"\n{before_time / after_time:.1f}x more updates/s, {before_writes / max(after_writes, 1):.0f}x fewer writes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=20, help="Number of agents receiving updates")
+    parser.add_argument("--updates", type=int, default=20_000, help="Total stat updates")
+    parser.add_argument("--interval", type=float, default=0.5, help="Flush interval in seconds")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.agents, args.updates, args.interval))
+
+
+if __name__ == "__main__":
+    main()
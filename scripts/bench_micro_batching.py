@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Benchmark: LLM calls saved by merging queued requests per agent
+
+Queues T conversation tasks for each of N agents (default 8 x 12) through a
+real TaskQueue and AgentTaskExecutor, once without batching and once with a
+conversation batch window. Synthetic agents share one simulated model that
+runs a single call at a time: each call costs --prompt-ms of prompt
+evaluation plus --generate-ms per request it answers.
+
+Reports LLM calls made, calls saved and wall-clock time for both runs, and
+fails unless every task completes with its own answer in both.
+
+Usage: python scripts/bench_micro_batching.py [--agents 8] [--tasks 12] [--window 0.01] [--batch-size 4]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.agents.registry.registry import AgentTaskExecutor  # noqa: E402
+from src.core.tasks.queue import AgentTask, TaskQueue, TaskStatus  # noqa: E402
+from src.schemas.agents.agents import AgentResponse  # noqa: E402
+
+
+class SimulatedModel:
+    """One model shared by all agents, running a single call at a time"""
+
+    def __init__(self, prompt_seconds: float, generate_seconds: float):
+        self.prompt_seconds = prompt_seconds
+        self.generate_seconds = generate_seconds
+        self.lock = asyncio.Lock()
+        self.calls = 0
+
+    async def call(self, answered: int):
+        async with self.lock:
+            self.calls += 1
+            await asyncio.sleep(self.prompt_seconds + self.generate_seconds * answered)
+
+
+class SyntheticAgent:
+    """Stands in for Agent.process_request and Agent.process_batch"""
+
+    def __init__(self, agent_id: str, model: SimulatedModel):
+        self.agent_id = agent_id
+        self.model = model
+        self.state = type("State", (), {"name": agent_id})()
+
+    def _respond(self, request) -> AgentResponse:
+        return AgentResponse(
+            success=True,
+            content=f"answer to {request.message}",
+            agent_id=self.agent_id,
+            task_type=request.task_type,
+            timestamp=datetime.now(timezone.utc).isoformat(),
+        )
+
+    async def process_request(self, request):
+        await self.model.call(1)
+        return self._respond(request)
+
+    async def process_batch(self, requests):
+        await self.model.call(len(requests))
+        return [self._respond(request) for request in requests], 1
+
+
+class SyntheticRegistry:
+    """The part of AgentRegistry that AgentTaskExecutor uses"""
+
+    def __init__(self, agents: dict[str, SyntheticAgent]):
+        self.agents = agents
+
+    def get_agent(self, agent_id: str):
+        return self.agents.get(agent_id)
+
+
+async def run(agent_count: int, tasks_per_agent: int, batch_windows: dict, batch_size: int, model: SimulatedModel):
+    """Queue every task, wait for all of them and return (elapsed, executor, all answered correctly)"""
+    agents = {f"agent-{i:03d}": SyntheticAgent(f"agent-{i:03d}", model) for i in range(agent_count)}
+
+    queue = TaskQueue(max_tasks=agent_count * tasks_per_agent * 2)
+    executor = AgentTaskExecutor(SyntheticRegistry(agents), batch_windows=batch_windows, max_batch_size=batch_size)
+    queue.register_executor("agent_operation", executor)
+    await queue.start_worker()
+
+    start = time.perf_counter()
+    submitted = []
+    for sequence in range(tasks_per_agent):
+        for agent_id in agents:
+            message = f"{agent_id}/{sequence}"
+            task = AgentTask.create(agent_id, {"message": message, "task_type": "conversation"})
+            submitted.append((queue.queue_task(task), message))
+
+    while any(not queue.tasks[task_id].is_terminal for task_id, _ in submitted):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    await queue.stop_worker()
+
+    correct = all(
+        queue.tasks[task_id].status == TaskStatus.COMPLETED
+        and queue.tasks[task_id].result["content"] == f"answer to {message}"
+        for task_id, message in submitted
+    )
+    return elapsed, executor, correct
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=8, help="Number of agents")
+    parser.add_argument("--tasks", type=int, default=12, help="Tasks per agent")
+    parser.add_argument("--window", type=float, default=0.01, help="Conversation batch window in seconds")
+    parser.add_argument("--batch-size", type=int, default=4, help="Most tasks merged into one call")
+    parser.add_argument("--prompt-ms", type=float, default=40.0, help="Simulated prompt evaluation per call")
+    parser.add_argument("--generate-ms", type=float, default=10.0, help="Simulated generation per answer")
+    args = parser.parse_args()
+
+    # Task completion logs go to WORKSPACE_ROOT; keep them out of the real workspace
+    os.environ.setdefault("WORKSPACE_ROOT", tempfile.mkdtemp())
+
+    total = args.agents * args.tasks
+    print(f"{args.agents} agents x {args.tasks} conversation tasks, batches of up to {args.batch_size}\n")
+    ok = True
+    baseline = None
+    for label, windows in (("unbatched", {}), (f"window {args.window}s", {"conversation": args.window})):
+        model = SimulatedModel(args.prompt_ms / 1000, args.generate_ms / 1000)
+        elapsed, executor, correct = asyncio.run(run(args.agents, args.tasks, windows, args.batch_size, model))
+        ok = ok and correct and model.calls == total - executor.llm_calls_saved
+        baseline = baseline or elapsed
+        print(
+            f"{label:<14} {model.calls:>5} LLM calls  {executor.llm_calls_saved:>5} saved  "
+            f"{elapsed:>7.2f}s  {baseline / elapsed:>4.1f}x  {'answers ok' if correct else 'WRONG ANSWERS'}"
+        )
+
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Benchmark: agent registry startup with many agents
+
+Writes N synthetic agents (default 1,000) with metadata and conversation
+history into a temporary workspace, then measures:
+
+- lazy startup: AgentRegistry construction, which only indexes metadata
+- first use: building one agent on demand
+- full hydration: building every agent, which is what startup used to do
+
+For each it reports wall-clock time, peak traced memory and open file
+descriptors (Linux only).
+
+Usage: python scripts/bench_registry_startup.py [--agents 1000] [--history 50]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def open_fds() -> int:
+    """Number of open file descriptors, or -1 where /proc is unavailable"""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1
+
+
+def write_agents(agents_dir: Path, count: int, history: int) -> list[str]:
+    """Create `count` agents on disk in the layout Agent persists"""
+    now = datetime.now(timezone.utc).isoformat()
+    agent_ids = []
+    for i in range(count):
+        agent_id = str(uuid.uuid4())
+        agent_dir = agents_dir / agent_id
+        agent_dir.mkdir(parents=True)
+
+        metadata = {
+            "agent_id": agent_id,
+            "name": f"agent-{i:05d}",
+            "description": f"Synthetic agent {i}",
+            "managed_files": [f"src/module_{i}.py"],
+            "created_at": now,
+            "last_updated": now,
+            "interaction_count": history // 2,
+            "success_rate": 1.0,
+            "total_tasks_completed": history // 2,
+            "recent_interactions": [],
+        }
+        (agent_dir / "metadata.json").write_text(json.dumps(metadata, indent=2))
+
+        conversation = [
+            {"role": "user" if n % 2 == 0 else "assistant", "content": f"message {n} " * 20, "timestamp": now}
+            for n in range(history)
+        ]
+        (agent_dir / "conversation.jsonl").write_text("".join(json.dumps(entry) + "\n" for entry in conversation))
+        agent_ids.append(agent_id)
+    return agent_ids
+
+
+def measure(label: str, func):
+    """Run func, printing time, peak memory and file descriptor growth"""
+    gc.collect()
+    fds_before = open_fds()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    fds_after = open_fds()
+
+    print(
+        f"{label:<16} {elapsed * 1000:>10.1f} ms  peak {peak / (1024 * 1024):>8.1f} MB  "
+        f"fds +{fds_after - fds_before}"
+    )
+    return result, elapsed
+
+
+async def run(agent_count: int, history: int):
+    with tempfile.TemporaryDirectory() as workspace:
+        # ConfigManager picks the workspace up from WORKSPACE_PATH
+        os.environ["WORKSPACE_PATH"] = workspace
+        agents_dir = Path(workspace) / ".mcp-agents"
+        print(f"Writing {agent_count:,} agents with {history} conversation entries each...")
+        agent_ids = write_agents(agents_dir, agent_count, history)
+
+        from src.core.agents.registry.registry import AgentRegistry
+        from src.core.config.manager.manager import ConfigManager
+
+        config_manager = ConfigManager()
+        print()
+        # No hydration cap, so "hydrate all" keeps every agent built as startup once did
+        registry, lazy_time = measure(
+            "lazy startup", lambda: AgentRegistry(config_manager, max_hydrated_agents=agent_count)
+        )
+        assert len(registry.agent_index) == agent_count and not registry.agents
+
+        measure("first use", lambda: registry.get_agent(agent_ids[0]))
+        _, eager_time = measure("hydrate all", registry.list_agents)
+        assert len(registry.agents) == agent_count
+
+        print()
+        print(f"Startup is {eager_time / lazy_time:.1f}x faster than hydrating every agent")
+        await registry.task_queue.stop_worker()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=1_000, help="Number of synthetic agents")
+    parser.add_argument("--history", type=int, default=50, help="Conversation entries per agent")
+    args = parser.parse_args()
+    asyncio.run(run(args.agents, args.history))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Benchmark: tool calls dispatched while the model is still generating
+
+A simulated model emits a completion holding --calls fenced tool calls
+separated by prose and followed by a closing remark, one token every
+--token-ms. Each tool call takes --tool-ms to execute. End-to-end latency
+(prompt to every tool call finished) is measured for:
+
+- batch: generate_with_tools, which parses the completion once generation
+  ends and only then executes the calls
+- streaming: generate_with_tools_streaming, which dispatches each call as
+  soon as its fence closes
+
+Both are run with direct tool execution and through a TaskQueue. Queued
+calls already run concurrently with each other, so there streaming only
+gains the generation time after each call. Each run checks that the same
+tool calls are executed with the same arguments. A final run fails the
+generation halfway, and checks that no dispatched call is left running or
+queued.
+
+Usage: python scripts/bench_streaming_dispatch.py [--calls 4] [--token-ms 20] [--tool-ms 300]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.llm.manager.manager import LLMManager  # noqa: E402
+from src.core.tasks.queue.queue import TaskQueue  # noqa: E402
+
+TOOLS = [
+    {
+        "name": "workspace",
+        "description": "Workspace file operations",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"action": {"type": "string"}, "path": {"type": "string"}},
+            "required": ["action"],
+        },
+    }
+]
+TOKEN_CHARS = 4  # Characters per simulated token
+
+
+def completion(calls: int) -> str:
+    """Prose followed by a fenced tool call, `calls` times, then a closing remark"""
+    parts = []
+    for i in range(calls):
+        parts.append(f"Step {i + 1}: I will update module_{i}.py so it matches the metadata.\n\n")
+        call = {"tool_name": "workspace", "parameters": {"action": "write", "path": f"module_{i}.py"}}
+        parts.append(f"```json\n{json.dumps(call)}\n```\n\n")
+    parts.append("All modules now match their metadata. Run the validation tool next to confirm the tests still pass.\n")
+    return "".join(parts)
+
+
+class SimulatedModel:
+    """Stands in for the llama-cpp model: one token per token_seconds"""
+
+    def __init__(self, text: str, token_seconds: float, fail_at: int = None):
+        self.tokens = [text[i:i + TOKEN_CHARS] for i in range(0, len(text), TOKEN_CHARS)]
+        self.token_seconds = token_seconds
+        self.fail_at = fail_at  # Token index at which generation raises
+
+    def _generate(self):
+        for index, token in enumerate(self.tokens):
+            if index == self.fail_at:
+                raise RuntimeError("simulated generation failure")
+            time.sleep(self.token_seconds)
+            yield {"choices": [{"text": token}]}
+
+    def __call__(self, prompt, stream=False, **kwargs):
+        if stream:
+            return self._generate()
+        return {"choices": [{"text": "".join(chunk["choices"][0]["text"] for chunk in self._generate())}]}
+
+
+class SimulatedTools:
+    """Stands in for ConsolidatedToolExecutor, recording what ran and what is running"""
+
+    def __init__(self, tool_seconds: float):
+        self.tool_seconds = tool_seconds
+        self.executed = []
+        self.running = 0
+
+    async def execute_tool(self, tool_name, arguments):
+        self.running += 1
+        try:
+            await asyncio.sleep(self.tool_seconds)
+        finally:
+            self.running -= 1
+        self.executed.append((tool_name, arguments))
+        return {"success": True, "content": [{"type": "text", "text": f"wrote {arguments['path']}"}]}
+
+
+async def run(text: str, args, streaming: bool, queued: bool, fail_at: int = None):
+    """One generation with tools; returns (seconds until every tool call finished, result, tools)"""
+    tools = SimulatedTools(args.tool_ms / 1000)
+    task_queue = TaskQueue(tool_executor=tools) if queued else None
+    manager = LLMManager(tool_executor=tools, task_queue=task_queue)
+    manager.register_tools(TOOLS)
+    manager.llm = SimulatedModel(text, args.token_ms / 1000, fail_at)
+    manager.model_loaded = True
+    if task_queue:
+        await task_queue.start_worker()
+
+    start = time.perf_counter()
+    if streaming:
+        result = await manager.generate_with_tools_streaming("update the modules")
+    else:
+        result = await manager.generate_with_tools("update the modules")
+    while task_queue and not task_queue.is_idle():
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+
+    if task_queue:
+        await task_queue.stop_worker()
+    return elapsed, result, tools
+
+
+async def main_async(args) -> bool:
+    text = completion(args.calls)
+    tokens = -(-len(text) // TOKEN_CHARS)
+    print(
+        f"{args.calls} tool calls in {tokens} tokens: {tokens * args.token_ms / 1000:.2f}s generation, "
+        f"{args.calls * args.tool_ms / 1000:.2f}s of tool execution\n"
+    )
+
+    ok = True
+    for queued in (False, True):
+        label = "queued" if queued else "direct"
+        batch_time, batch_result, batch_tools = await run(text, args, streaming=False, queued=queued)
+        stream_time, stream_result, stream_tools = await run(text, args, streaming=True, queued=queued)
+        same = (
+            batch_result["tool_calls"] == stream_result["tool_calls"]
+            and batch_tools.executed == stream_tools.executed
+            and len(stream_tools.executed) == args.calls
+        )
+        ok = ok and same
+        print(f"{label:<7} batch      {batch_time:>6.2f}s")
+        print(
+            f"{label:<7} streaming  {stream_time:>6.2f}s  {batch_time / stream_time:>4.2f}x  "
+            f"{'same calls' if same else 'DIFFERENT CALLS'}"
+        )
+
+    # Generation fails halfway: nothing dispatched may still be queued or running
+    fail_at = -(-len(text) // TOKEN_CHARS) // 2
+    for queued in (False, True):
+        _, result, tools = await run(text, args, streaming=True, queued=queued, fail_at=fail_at)
+        await asyncio.sleep(args.tool_ms / 1000 * 2)
+        cancelled = sum(1 for entry in result.get("cancelled", []) if entry["cancelled"])
+        clean = result["type"] == "error" and tools.running == 0 and cancelled + len(tools.executed) == len(
+            result.get("cancelled", [])
+        )
+        ok = ok and clean
+        print(
+            f"\n{'queued' if queued else 'direct'} failed generation: {len(result.get('cancelled', []))} dispatched, "
+            f"{cancelled} cancelled, {len(tools.executed)} finished before the failure"
+            f"{'' if clean else '  CALLS LEFT RUNNING'}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=4, help="Tool calls per completion")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="Simulated time per generated token")
+    parser.add_argument("--tool-ms", type=float, default=300.0, help="Simulated time per tool call")
+    args = parser.parse_args()
+
+    # Queued task completion logs go to WORKSPACE_ROOT; keep them out of the real workspace
+    os.environ.setdefault("WORKSPACE_ROOT", tempfile.mkdtemp())
+    logging.disable(logging.ERROR)  # Every call and task is logged
+
+    ok = asyncio.run(main_async(args))
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Benchmark: task record memory and throughput
+
+Creates and completes N tool-call tasks (default one million) with the current
+slotted ToolCallTask and with the previous dataclass layout, reporting
+wall-clock throughput and peak traced memory for each.
+
+Usage: python scripts/bench_task_records.py [--count 1000000]
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.tasks.queue.task import TaskStatus, ToolCallTask  # noqa: E402
+
+
+# Previous task layout, kept here verbatim for comparison
+
+
+@dataclass
+class LegacyTask:
+    task_id: str
+    task_type: str
+    status: TaskStatus
+    created_at: str
+    completed_at: Optional[str] = None
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    priority: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "task_id": self.task_id,
+            "task_type": self.task_type,
+            "status": self.status.value,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+            "result": self.result,
+            "error": self.error,
+            "priority": self.priority,
+        }
+
+
+@dataclass
+class LegacyToolCallTask(LegacyTask):
+    tool_name: str = ""
+    tool_args: dict[str, Any] = field(default_factory=dict)
+    parent_task_id: Optional[str] = None
+    agent_id: Optional[str] = None
+
+    def __init__(self, **kwargs):
+        tool_args = kwargs.pop("tool_args", {})
+        tool_name = kwargs.pop("tool_name", "")
+        parent_task_id = kwargs.pop("parent_task_id", None)
+        agent_id = kwargs.pop("agent_id", None)
+        kwargs["task_type"] = "tool_call"
+        super().__init__(**kwargs)
+        self.tool_name = tool_name
+        self.tool_args = tool_args
+        self.parent_task_id = parent_task_id
+        self.agent_id = agent_id
+
+    @classmethod
+    def create(cls, tool_name: str, tool_args: dict[str, Any], parent_task_id: Optional[str] = None, priority: int = 1):
+        return cls(
+            task_id=str(uuid.uuid4())[:8],
+            status=TaskStatus.QUEUED,
+            created_at=datetime.now(timezone.utc).isoformat(),
+            tool_name=tool_name,
+            tool_args=tool_args,
+            parent_task_id=parent_task_id,
+            priority=priority,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        base_dict = super().to_dict()
+        base_dict.update({"tool_name": self.tool_name, "tool_args": self.tool_args, "parent_task_id": self.parent_task_id})
+        return base_dict
+
+
+def complete_legacy(task: LegacyToolCallTask, result: dict[str, Any]):
+    task.status = TaskStatus.RUNNING
+    task.result = result
+    task.status = TaskStatus.COMPLETED
+    task.completed_at = datetime.now(timezone.utc).isoformat()
+
+
+def complete_current(task: ToolCallTask, result: dict[str, Any]):
+    task.start()
+    task.result = result
+    task.finish(TaskStatus.COMPLETED)
+
+
+def run(label: str, factory, complete, count: int, listings: int) -> dict[str, float]:
+    """Create, complete and list `count` tasks, returning timings and peak memory"""
+    args = {"action": "read", "path": "src/main.py"}
+    result = {"success": True}
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    tasks = {}
+    for _ in range(count):
+        task = factory("workspace", args)
+        tasks[task.task_id] = task
+    created = time.perf_counter()
+
+    for task in tasks.values():
+        complete(task, result)
+    completed = time.perf_counter()
+
+    # Repeated listings of the most recent tasks, as list_tasks does on every poll
+    recent = list(tasks.values())[-100:]
+    for _ in range(listings):
+        [task.to_dict() for task in recent]
+    listed = time.perf_counter()
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks, recent
+    gc.collect()
+
+    stats = {
+        "create_per_s": count / (created - start),
+        "complete_per_s": count / (completed - created),
+        "to_dict_per_s": (listings * 100) / (listed - completed),
+        "peak_mb": peak / (1024 * 1024),
+        "bytes_per_task": peak / count,
+    }
+    print(
+        f"{label:<10} create {stats['create_per_s']:>12,.0f}/s  "
+        f"complete {stats['complete_per_s']:>12,.0f}/s  "
+        f"to_dict {stats['to_dict_per_s']:>12,.0f}/s  "
+        f"peak {stats['peak_mb']:>8.1f} MB ({stats['bytes_per_task']:.0f} B/task)"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000, help="Number of tool-call tasks")
+    parser.add_argument("--listings", type=int, default=1_000, help="Number of 100-task listings")
+    args = parser.parse_args()
+
+    print(f"Creating and completing {args.count:,} tool-call tasks\n")
+    legacy = run("legacy", LegacyToolCallTask.create, complete_legacy, args.count, args.listings)
+    current = run("current", ToolCallTask.create, complete_current, args.count, args.listings)
+
+    print()
+    print(f"Memory:     {legacy['peak_mb'] / current['peak_mb']:.2f}x smaller")
+    print(f"Create:     {current['create_per_s'] / legacy['create_per_s']:.2f}x faster")
+    print(f"Complete:   {current['complete_per_s'] / legacy['complete_per_s']:.2f}x faster")
+    print(f"to_dict:    {current['to_dict_per_s'] / legacy['to_dict_per_s']:.2f}x faster")
+
+
+if __name__ == "__main__":
+    main()
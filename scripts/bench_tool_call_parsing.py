@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Benchmark: unfenced tool-call extraction in UnifiedToolCallParser
+
+Times the direct (unfenced) extraction path over model outputs from 1 KB to
+1 MB:
+
+- before: the two-level JSON_BLOCK_RE regex the parser used to match
+- after: the single pass decoding candidate objects in place with raw_decode
+
+Outputs come from --corpus (a directory of captured model outputs, one per
+.txt file) or, by default, are assembled from the shapes the tool-calling
+prompt produces: prose, Python snippets with dict literals and format
+strings, and tool calls whose parameters nest metadata from
+examples/CalculatorClaude/.meta. A "stray braces" output (prose full of
+unclosed braces, the regex's worst case) is included for each size.
+
+For every output the tool calls found are compared: the scanner must find
+every call the regex found, plus the nested ones the regex could not match.
+
+Usage: python scripts/bench_tool_call_parsing.py [--sizes 1 10 100 1000] [--corpus DIR] [--repeat 5]
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.core.mcp.bridge.unified_parser import UnifiedToolCallParser  # noqa: E402
+
+# The pattern the parser used before the scanner
+JSON_BLOCK_RE = re.compile(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', re.DOTALL)
+
+
+def regex_extract(text: str) -> list[dict]:
+    """Direct extraction as it was: regex matches, json.loads each"""
+    calls = []
+    for match in JSON_BLOCK_RE.finditer(text):
+        try:
+            parsed = json.loads(match.group().strip())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict) and "tool_name" in parsed:
+            calls.append(parsed)
+    return calls
+
+
+def load_metadata() -> list[dict]:
+    """Nested metadata documents used as realistic json_content values"""
+    meta_dir = ROOT / "examples" / "CalculatorClaude" / ".meta"
+    return [json.loads(path.read_text()) for path in sorted(meta_dir.glob("*.json"))]
+
+
+def tool_call_fragments(metadata: list[dict]) -> list[str]:
+    """Pieces a tool-calling model emits: prose, code, flat and nested tool calls"""
+    return [
+        "I'll create the metadata first, then render the module from it.\n\n",
+        "The calculator keeps a history of results and raises ValueError on division by zero.\n",
+        'def describe(op):\n    return {"name": op.__name__, "doc": f"{op.__doc__}"}\n\n',
+        json.dumps({
+            "tool_name": "workspace",
+            "parameters": {"action": "generate_from_metadata", "path": "calculator.py"},
+        }) + "\n",
+        json.dumps({
+            "tool_name": "file_metadata",
+            "parameters": {"action": "create", "path": "calculator.py", "json_content": metadata[0]},
+        }) + "\n",
+        json.dumps({
+            "tool_name": "workspace",
+            "parameters": {
+                "action": "write",
+                "path": "config.py",
+                "content": 'SETTINGS = {"precision": 10, "mode": "float"}\nprint(f"{SETTINGS}")\n',
+            },
+        }) + "\n",
+        json.dumps({
+            "tool_name": "file_metadata",
+            "parameters": {"action": "create", "path": "test_calculator.py", "json_content": metadata[-1]},
+        }) + "\n",
+    ]
+
+
+def build_output(fragments: list[str], size: int, rng: random.Random) -> str:
+    """Concatenate random fragments up to `size` characters"""
+    parts, length = [], 0
+    while length < size:
+        part = rng.choice(fragments)
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def stray_braces(size: int) -> str:
+    """Prose with many unclosed braces followed by one tool call"""
+    call = json.dumps({"tool_name": "validation", "parameters": {"action": "run", "path": "calculator.py"}})
+    filler = "use {name and {value in the template " * (size // 36 + 1)
+    return filler[: max(0, size - len(call))] + call
+
+
+def time_call(function, text: str, repeat: int) -> tuple[float, list]:
+    """Best-of-repeat time and the result of the last run"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000], help="Output sizes in KB")
+    parser.add_argument("--corpus", type=Path, help="Directory of captured model outputs (*.txt)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per output (best is reported)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)  # parse() logs every call
+    scanner = UnifiedToolCallParser()
+    scan_extract = lambda text: scanner._extract_json_direct(text)[0]  # noqa: E731
+
+    if args.corpus:
+        outputs = [(path.name, path.read_text()) for path in sorted(args.corpus.glob("*.txt"))]
+    else:
+        rng = random.Random(42)
+        fragments = tool_call_fragments(load_metadata())
+        outputs = []
+        for size_kb in args.sizes:
+            outputs.append((f"model output {size_kb} KB", build_output(fragments, size_kb * 1024, rng)))
+            outputs.append((f"stray braces {size_kb} KB", stray_braces(size_kb * 1024)))
+
+    ok = True
+    print(f"{'output':<26} {'before':>10} {'after':>10} {'speedup':>8}  calls before/after")
+    for name, text in outputs:
+        before, regex_calls = time_call(regex_extract, text, args.repeat)
+        after, scanned_calls = time_call(scan_extract, text, args.repeat)
+        missing = [call for call in regex_calls if call not in scanned_calls]
+        ok = ok and not missing
+        print(
+            f"{name:<26} {before * 1000:>8.2f}ms {after * 1000:>8.2f}ms {before / after:>7.1f}x"
+            f"  {len(regex_calls)}/{len(scanned_calls)}{'  MISSING CALLS' if missing else ''}"
+        )
+
+    no_brace = "plain prose without any objects " * 32_768
+    start = time.perf_counter()
+    scanner.parse(no_brace)
+    print(f"\nfast path, {len(no_brace) // 1024} KB without braces: {(time.perf_counter() - start) * 1000:.3f}ms")
+
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Benchmark: tool call validation in ToolPromptFormatter
+
+Validates a mix of model tool calls against the ConsolidatedToolExecutor
+tool schemas, plus --extra-tools synthetic tools (copies of those schemas
+under other names, listed first) to show how lookup scales with the tool
+count:
+
+- before: validate_tool_call as it was, a linear scan of the tool list that
+  only checks required parameters are present (its debug line formatted
+  the whole call even with debug logging off)
+- after: the validators compiled once from each inputSchema, looked up by
+  tool name
+
+The calls are half valid and half wrong in the ways models get them wrong:
+an action outside the enum, a string where a boolean or an array is
+expected, a non-string list item, a missing required parameter. Reports
+calls validated per second and how many of the wrong calls each version
+rejects before they would be queued.
+
+Usage: python scripts/bench_tool_validation.py [--calls 100000] [--extra-tools 0 50 500]
+"""
+
+import argparse
+import asyncio
+import copy
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.mcp.bridge.formatter import ToolPromptFormatter  # noqa: E402
+from src.mcp.tools.executor.executor import ConsolidatedToolExecutor  # noqa: E402
+
+logger = logging.getLogger("src.core.mcp.bridge.formatter.ToolPromptFormatter")
+
+VALID_CALLS = [
+    {"tool_name": "workspace", "parameters": {"action": "write", "path": "calculator.py", "content": "x = 1\n"}},
+    {"tool_name": "workspace", "parameters": {"action": "list", "path": ".", "recursive": True}},
+    {"tool_name": "file_metadata", "parameters": {"action": "add_function", "path": "calculator.py", "name": "add",
+                                                  "parameters": [{"name": "a", "type": "float"}]}},
+    {"tool_name": "git_operations", "parameters": {"operation": "commit", "message": "Add add()", "files": ["a.py"]}},
+    {"tool_name": "validation", "parameters": {"action": "file-length", "file_paths": ["calculator.py"]}},
+    {"tool_name": "agent_operations", "parameters": {"operation": "queue_task", "agent_id": "a1", "message": "hi",
+                                                     "timeout": 30}},
+]
+INVALID_CALLS = [
+    {"tool_name": "workspace", "parameters": {"action": "remove", "path": "calculator.py"}},
+    {"tool_name": "workspace", "parameters": {"action": "list", "recursive": "true"}},
+    {"tool_name": "git_operations", "parameters": {"operation": "commit", "files": "calculator.py"}},
+    {"tool_name": "validation", "parameters": {"action": "file-length", "file_paths": ["calculator.py", 3]}},
+    {"tool_name": "local_model", "parameters": {"operation": "generate", "max_tokens": "512"}},
+    {"tool_name": "agent_operations", "parameters": {"agent_id": "a1", "message": "hi"}},
+]
+
+
+def validate_linear(tools: list[dict], tool_call: dict) -> tuple[bool, str]:
+    """validate_tool_call as it was: scan for the tool, check required parameters only"""
+    logger.debug(f"ENTRY validate_tool_call: {tool_call}")
+    tool_name = tool_call.get("tool_name") or tool_call.get("name")
+    if not tool_name:
+        return False, "No tool_name specified"
+    matching_tool = None
+    for tool in tools:
+        if tool.get("name") == tool_name:
+            matching_tool = tool
+            break
+    if not matching_tool:
+        return False, f"Tool '{tool_name}' not available"
+    arguments = tool_call.get("parameters", tool_call.get("arguments", {}))
+    if not isinstance(arguments, dict):
+        return False, f"Arguments must be a dictionary, got {type(arguments)}"
+    for param in matching_tool.get("inputSchema", {}).get("required", []):
+        if param not in arguments:
+            return False, f"Required parameter '{param}' missing"
+    logger.debug("EXIT validate_tool_call: valid")
+    return True, "Valid tool call"
+
+
+def with_extra_tools(tools: list[dict], count: int) -> list[dict]:
+    """`count` renamed copies of the tools, listed before the real ones"""
+    extra = []
+    for i in range(count):
+        tool = copy.deepcopy(tools[i % len(tools)])
+        tool["name"] = f"{tool['name']}_{i}"
+        extra.append(tool)
+    return extra + tools
+
+
+def throughput(validate, calls: list[dict]) -> float:
+    start = time.perf_counter()
+    for tool_call in calls:
+        validate(tool_call)
+    return len(calls) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100_000, help="Tool calls validated per measurement")
+    parser.add_argument("--extra-tools", type=int, nargs="+", default=[0, 50, 500], help="Synthetic tools added")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    executor = ConsolidatedToolExecutor()
+    tools = asyncio.run(executor.get_available_tools())
+    rng = random.Random(42)
+    calls = [rng.choice(VALID_CALLS + INVALID_CALLS) for _ in range(args.calls)]
+
+    print(f"{'tools':>6} {'before':>14} {'after':>14} {'speedup':>8}")
+    for extra in args.extra_tools:
+        listed = with_extra_tools(tools, extra)
+        formatter = ToolPromptFormatter(listed, executor.tool_validators)
+        before = throughput(lambda tool_call: validate_linear(listed, tool_call), calls)
+        after = throughput(formatter.validate_tool_call, calls)
+        print(f"{len(listed):>6} {before:>10,.0f}/s {after:>10,.0f}/s {after / before:>7.1f}x")
+
+    formatter = ToolPromptFormatter(tools, executor.tool_validators)
+    ok = all(formatter.validate_tool_call(tool_call)[0] for tool_call in VALID_CALLS)
+    rejected_before = sum(not validate_linear(tools, tool_call)[0] for tool_call in INVALID_CALLS)
+    rejected_after = 0
+    print("\nWrong calls:")
+    for tool_call in INVALID_CALLS:
+        valid, error = formatter.validate_tool_call(tool_call)
+        rejected_after += not valid
+        print(f"  {'accepted' if valid else error}")
+    print(f"rejected before queuing: {rejected_before}/{len(INVALID_CALLS)} before, "
+          f"{rejected_after}/{len(INVALID_CALLS)} after; valid calls {'all accepted' if ok else 'REJECTED'}")
+
+    ok = ok and rejected_after == len(INVALID_CALLS)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
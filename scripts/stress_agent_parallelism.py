@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Stress test: per-agent serialization with cross-agent parallelism
+
+Queues T tasks for each of N agents (default 50 x 20) through a real
+TaskQueue and AgentTaskExecutor. Synthetic agents sleep for a random time
+in process_request and record what they see. The run fails unless:
+
+- no agent ever runs two requests at once
+- every agent processes its requests in submission order
+- no more than --parallel agents run at the same time
+- the queue never counts more than --parallel tasks as running (tasks
+  waiting for their agent or a slot are still queued)
+- every task completes
+
+Usage: python scripts/stress_agent_parallelism.py [--agents 50] [--tasks 20] [--parallel 4]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.agents.registry.registry import AgentTaskExecutor  # noqa: E402
+from src.core.tasks.queue import AgentTask, TaskQueue, TaskStatus  # noqa: E402
+from src.schemas.agents.agents import AgentResponse  # noqa: E402
+
+
+class Tracker:
+    """Shared observations across all synthetic agents"""
+
+    def __init__(self):
+        self.running = 0
+        self.peak_running = 0
+        self.overlaps = []
+        self.out_of_order = []
+        self.queue = None
+        self.peak_counted = 0  # Highest TaskQueue.running_count seen
+
+
+class SyntheticAgent:
+    """Stands in for Agent.process_request, checking exclusivity and order"""
+
+    def __init__(self, agent_id: str, tracker: Tracker, max_delay: float):
+        self.agent_id = agent_id
+        self.tracker = tracker
+        self.max_delay = max_delay
+        self.busy = False
+        self.last_sequence = -1
+        self.state = type("State", (), {"name": agent_id})()
+
+    async def process_request(self, request):
+        if self.busy:
+            self.tracker.overlaps.append(self.agent_id)
+        self.busy = True
+        self.tracker.running += 1
+        self.tracker.peak_running = max(self.tracker.peak_running, self.tracker.running)
+        self.tracker.peak_counted = max(self.tracker.peak_counted, self.tracker.queue.running_count)
+
+        sequence = int(request.message)
+        if sequence != self.last_sequence + 1:
+            self.tracker.out_of_order.append((self.agent_id, self.last_sequence, sequence))
+        self.last_sequence = sequence
+
+        await asyncio.sleep(random.uniform(0, self.max_delay))
+
+        self.tracker.running -= 1
+        self.busy = False
+        return AgentResponse(
+            success=True,
+            content=f"done {sequence}",
+            agent_id=self.agent_id,
+            task_type=request.task_type,
+            timestamp=datetime.now(timezone.utc).isoformat(),
+        )
+
+
+class SyntheticRegistry:
+    """The part of AgentRegistry that AgentTaskExecutor uses"""
+
+    def __init__(self, agents: dict[str, SyntheticAgent]):
+        self.agents = agents
+
+    def get_agent(self, agent_id: str):
+        return self.agents.get(agent_id)
+
+
+async def run(agent_count: int, tasks_per_agent: int, parallel: int, max_delay: float) -> bool:
+    tracker = Tracker()
+    agents = {f"agent-{i:03d}": SyntheticAgent(f"agent-{i:03d}", tracker, max_delay) for i in range(agent_count)}
+
+    queue = TaskQueue(max_tasks=agent_count * tasks_per_agent * 2)
+    tracker.queue = queue
+    executor = AgentTaskExecutor(SyntheticRegistry(agents), max_parallel_agents=parallel)
+    queue.register_executor("agent_operation", executor)
+    await queue.start_worker()
+
+    start = time.perf_counter()
+    task_ids = []
+    # Interleave submissions so every agent has a backlog at once
+    for sequence in range(tasks_per_agent):
+        for agent_id in agents:
+            task = AgentTask.create(agent_id, {"message": str(sequence), "task_type": "conversation"})
+            task_ids.append(queue.queue_task(task))
+
+    while any(not queue.tasks[task_id].is_terminal for task_id in task_ids):
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    await queue.stop_worker()
+
+    completed = sum(1 for task_id in task_ids if queue.tasks[task_id].status == TaskStatus.COMPLETED)
+    total = agent_count * tasks_per_agent
+    serial_estimate = total * max_delay / 2
+
+    print(f"{agent_count} agents x {tasks_per_agent} tasks, parallel limit {parallel}")
+    print(f"completed         {completed}/{total} in {elapsed:.2f}s (serial would take ~{serial_estimate:.1f}s)")
+    print(f"peak parallel     {tracker.peak_running}")
+    print(f"peak counted      {tracker.peak_counted} running (queue.running_count, {queue.running_count} at the end)")
+    print(f"overlaps          {len(tracker.overlaps)}")
+    print(f"out of order      {len(tracker.out_of_order)}")
+    print(f"locks left        {executor.active_agents()}")
+
+    return (
+        completed == total
+        and not tracker.overlaps
+        and not tracker.out_of_order
+        and tracker.peak_running <= parallel
+        and tracker.peak_counted <= parallel
+        and queue.running_count == 0
+        and executor.active_agents() == 0
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=50, help="Number of agents")
+    parser.add_argument("--tasks", type=int, default=20, help="Tasks per agent")
+    parser.add_argument("--parallel", type=int, default=4, help="Maximum agents running at once")
+    parser.add_argument("--max-delay", type=float, default=0.02, help="Maximum simulated processing time")
+    args = parser.parse_args()
+
+    # Task completion logs go to WORKSPACE_ROOT; keep them out of the real workspace
+    os.environ.setdefault("WORKSPACE_ROOT", tempfile.mkdtemp())
+    ok = asyncio.run(run(args.agents, args.tasks, args.parallel, args.max_delay))
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
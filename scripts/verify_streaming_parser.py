@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Check: StreamingToolCallParser agrees with UnifiedToolCallParser
+
+Feeds model outputs to StreamingToolCallParser in random chunkings (down to
+one character at a time, as a token stream may deliver them) and checks,
+for every output and chunking, that:
+
+- close() returns the same tool calls, errors and strategy as parse()
+- the calls returned by feed(), less `superseded`, plus `late_calls` are
+  exactly those calls (in the order they completed, which can differ from
+  the final order when fences and unfenced objects interleave)
+- with hold_unfenced=True, the same holds and nothing is superseded
+- the text held between chunks stays bounded by the longest unfinished
+  object or fence rather than growing with the output
+
+Outputs are assembled from the fragments used by bench_tool_call_parsing.py
+(prose, code with dict literals, flat and nested tool calls) plus fenced
+calls, broken fences and objects, escapes and stray braces.
+
+Usage: python scripts/verify_streaming_parser.py [--outputs 200] [--size 20] [--chunkings 5]
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from bench_tool_call_parsing import build_output, load_metadata, tool_call_fragments  # noqa: E402
+from src.core.mcp.bridge.unified_parser import StreamingToolCallParser, UnifiedToolCallParser  # noqa: E402
+
+MAX_HELD_CHARS = 64 * 1024  # Far above the largest single tool call in the corpus, far below 1 MB
+
+
+def edge_fragments() -> list[str]:
+    """Fences, malformed objects and text that splits awkwardly across chunks"""
+    call = {"tool_name": "workspace", "parameters": {"action": "read", "path": "calculator.py"}}
+    escaped = {"tool_name": "workspace", "parameters": {"action": "write", "content": 'a "quoted" \\ {brace} }\n'}}
+    return [
+        f"```json\n{json.dumps(call)}\n```\n",
+        f"```JSON {json.dumps(escaped)}```",
+        f"```\n{json.dumps(call, indent=2)}\n```\n\n",
+        "```python\nprint({'a': 1})\n```\n",
+        "```json\n{\"tool_name\": \"broken\", \"parameters\": {\n```\n",
+        "```json\n{\"parameters\": {\"action\": \"list\"}}\n```\n",
+        "```\n```",
+        json.dumps(escaped) + " ",
+        '{"tool_name": "workspace", "parameters": {"action": "read"',
+        '{ "tool_name" "missing colon"} ',
+        '{"no_tool": true} {"tool_name": "validation"}',
+        "{   \n  ",
+        "}}} {{{ ",
+        '"lone quote ',
+        "`",
+        "``",
+        "\\",
+    ]
+
+
+def chunkings(text: str, rng: random.Random, count: int):
+    """One character at a time, then random chunk sizes"""
+    yield list(text)
+    for _ in range(count):
+        chunks, position = [], 0
+        limit = rng.choice([4, 16, 64, 512])
+        while position < len(text):
+            size = rng.randint(1, limit)
+            chunks.append(text[position:position + size])
+            position += size
+        yield chunks
+
+
+def canonical(call: dict) -> str:
+    return json.dumps(call, sort_keys=True)
+
+
+def check(text: str, chunks: list[str], parser: UnifiedToolCallParser, hold_unfenced: bool) -> tuple[list[str], int]:
+    """Problems found streaming `text` in `chunks` (empty if it agrees with parse()) and the most text held"""
+    expected = parser.parse(text)
+    stream = StreamingToolCallParser(parser, hold_unfenced=hold_unfenced)
+    emitted, held = [], 0
+    for chunk in chunks:
+        emitted.extend(stream.feed(chunk))
+        held = max(held, stream.pending_chars)
+    result = stream.close()
+
+    problems = []
+    if result.tool_calls != expected.tool_calls:
+        problems.append(f"calls differ: {len(result.tool_calls)} streamed, {len(expected.tool_calls)} batch")
+    if result.errors != expected.errors:
+        problems.append(f"errors differ: {result.errors[:3]} vs {expected.errors[:3]}")
+    if result.strategy_used != expected.strategy_used:
+        problems.append(f"strategy differs: {result.strategy_used} vs {expected.strategy_used}")
+
+    if hold_unfenced and stream.superseded:
+        problems.append(f"{len(stream.superseded)} calls superseded while holding unfenced calls")
+    kept = list(emitted)
+    for call in stream.superseded:
+        kept.remove(call)
+    kept += stream.late_calls
+    if sorted(map(canonical, kept)) != sorted(map(canonical, expected.tool_calls)):
+        problems.append(
+            f"emitted calls differ: {len(kept)} kept of {len(emitted)} emitted and {len(stream.late_calls)} late, "
+            f"{len(expected.tool_calls)} batch"
+        )
+    return problems, held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--outputs", type=int, default=200, help="Random outputs to check")
+    parser.add_argument("--size", type=int, default=20, help="Approximate output size in KB")
+    parser.add_argument("--chunkings", type=int, default=5, help="Random chunkings per output (besides 1 char)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)  # parse() logs every call
+    rng = random.Random(args.seed)
+    batch_parser = UnifiedToolCallParser()
+    fragments = tool_call_fragments(load_metadata())
+    edges = edge_fragments()
+
+    outputs = ["", "plain prose", "```", "{", '{"tool_name": "x"}', "```json\n{}\n```"]
+    outputs += ["".join(rng.choice(edges) for _ in range(rng.randint(1, 12))) for _ in range(args.outputs)]
+    outputs += [build_output(fragments + edges, args.size * 1024, rng) for _ in range(args.outputs // 20)]
+    outputs += [build_output(fragments, args.size * 1024, rng) for _ in range(args.outputs // 20)]
+
+    failures = 0
+    checked = 0
+    start = time.perf_counter()
+    for text in outputs:
+        for chunks in chunkings(text, rng, args.chunkings):
+            for hold_unfenced in (False, True):
+                problems, held = check(text, chunks, batch_parser, hold_unfenced)
+                checked += 1
+                if not problems:
+                    continue
+                failures += 1
+                if failures <= 5:
+                    print(f"MISMATCH ({len(text)} chars, {len(chunks)} chunks, hold_unfenced={hold_unfenced}): "
+                          f"{'; '.join(problems)}")
+                    print(f"  output: {text[:200]!r}")
+
+    print(f"{checked:,} streams over {len(outputs)} outputs checked in {time.perf_counter() - start:.1f}s")
+
+    big = build_output(fragments, 1024 * 1024, rng)
+    start = time.perf_counter()
+    batch_parser.parse(big)
+    batch_time = time.perf_counter() - start
+    start = time.perf_counter()
+    stream = StreamingToolCallParser(batch_parser)
+    held = 0
+    for position in range(0, len(big), 16):
+        stream.feed(big[position:position + 16])
+        held = max(held, stream.pending_chars)
+    stream.close()
+    stream_time = time.perf_counter() - start
+    bounded = held <= MAX_HELD_CHARS
+    print(
+        f"1 MB output in 16-char chunks: at most {held:,} chars held, "
+        f"{stream_time * 1000:.0f}ms streamed vs {batch_time * 1000:.0f}ms batch"
+    )
+
+    ok = not failures and bounded
+    print("PASS" if ok else f"FAIL ({failures} mismatches{'' if bounded else ', unbounded buffering'})")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -64,6 +64,7 @@ class APIEndpoints:
                     "endpoints": {
                         "mcp_protocol": "POST /mcp",
                         "system_status": "GET /api/system/status",
+                        "queue_metrics": "GET /api/system/metrics",
                         "health_check": "GET /health",
                         "documentation": "GET /",
                     },
@@ -73,3 +74,17 @@ class APIEndpoints:
         except Exception as e:
             logger.error(f"Failed to get system status: {e}")
             return JSONResponse({"error": f"System status failed: {e!s}"}, status_code=500)
+
+    async def queue_metrics(self, request: Request) -> JSONResponse:
+        """GET /api/system/metrics - Get task queue statistics"""
+        try:
+            return JSONResponse(
+                {
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "queue": self.agent_registry.get_queue_stats(),
+                }
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to get queue metrics: {e}")
+            return JSONResponse({"error": f"Queue metrics failed: {e!s}"}, status_code=500)
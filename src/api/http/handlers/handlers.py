@@ -205,6 +205,7 @@ def _get_endpoint_info() -> dict[str, str]:
         "mcp": "POST/GET /mcp (MCP Streamable HTTP transport)",
         "health": "GET /health",
         "system": "GET /api/system/status",
+        "metrics": "GET /api/system/metrics",
         "orchestrator": "GET /orchestrator (Secure UI)",
         "websocket": "WS /ws",
     }
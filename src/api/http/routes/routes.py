@@ -47,6 +47,7 @@ def _build_core_routes(handlers: RouteHandlers) -> list:
         Route("/mcp-legacy", handlers.legacy_handler_wrapper, methods=["POST"]),
         # System endpoint only (agent endpoints removed)
         Route("/api/system/status", handlers.api_endpoints.system_status, methods=["GET"]),
+        Route("/api/system/metrics", handlers.api_endpoints.queue_metrics, methods=["GET"]),
         # WebSocket
         WebSocketRoute("/ws", handlers.websocket_endpoint),
     ]
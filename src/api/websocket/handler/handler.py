@@ -62,7 +62,7 @@ class WebSocketHandler:
                 "connection_id": connection_id,
                 "message": "Connected to Standardized Agent LLM Server",
                 "features": ["real_time_chat", "streaming_responses", "agent_management"],
-                "agents_available": len(self.agent_registry.agents),
+                "agents_available": len(self.agent_registry.agent_index),
             }
         )
 
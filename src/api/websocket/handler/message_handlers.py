@@ -38,18 +38,17 @@ class WebSocketMessageHandlers:
 
     async def _handle_list_agents(self, websocket, connection_id: str, data: dict):
         """Handle list agents request"""
-        agents = self.agent_registry.list_agents()
-        await websocket.send_json({"type": "agents_list", "agents": [agent.to_dict() for agent in agents]})
+        states = self.agent_registry.list_agent_states()
+        await websocket.send_json({"type": "agents_list", "agents": [state.to_dict() for state in states]})
 
     async def _handle_get_agent_info(self, websocket, connection_id: str, data: dict):
         """Handle get agent info request"""
         agent_id = data.get("agent_id")
-        agent = self.agent_registry.get_agent(agent_id)
-
-        if agent:
-            await websocket.send_json({"type": "agent_info", "agent": agent.to_dict()})
-        else:
-            await websocket.send_json({"type": "error", "message": f"Agent not found: {agent_id}"})
+        with self.agent_registry.agent_in_use(agent_id) as agent:
+            if agent:
+                await websocket.send_json({"type": "agent_info", "agent": agent.to_dict()})
+            else:
+                await websocket.send_json({"type": "error", "message": f"Agent not found: {agent_id}"})
 
     async def _handle_unknown(self, websocket, connection_id: str, message_type: str):
         """Handle unknown message type"""
@@ -0,0 +1,136 @@
+"""Incremental LLM Context Builder
+
+Builds the agent context block for prompts from three sections:
+
+- a stable prefix (agent header and managed files) that only changes when
+  the agent's identity or files change, so the model runtime can reuse its
+  evaluated prefix across requests
+- the conversation summary, written by the background compactor, standing
+  in for entries that have left the window
+- a conversation window of the most recent entries, maintained entry by
+  entry as the conversation grows instead of re-sliced on every request
+
+Each section is cached as rendered text along with its token count.
+"""
+
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from src.schemas.agents.agents import AgentState, ConversationEntry
+
+CONVERSATION_WINDOW = 10  # Entries shown in the context
+ENTRY_PREVIEW_CHARS = 200  # Characters of each entry shown
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for when no tokenizer is available (~4 chars per token)"""
+    return (len(text) + 3) // 4
+
+
+class ContextBuilder:
+    """Caches the agent context prefix and maintains the conversation window"""
+
+    def __init__(
+        self,
+        state: AgentState,
+        workspace_root,
+        managed_files: Iterable[str],
+        count_tokens: Callable[[str], int] = estimate_tokens,
+        window: int = CONVERSATION_WINDOW,
+    ):
+        self.state = state
+        self.workspace_root = workspace_root
+        self.count_tokens = count_tokens
+        self._managed_files = sorted(managed_files)
+
+        self._prefix: Optional[str] = None
+        self._prefix_tokens = 0
+        self._prefix_key: Optional[Tuple[str, str]] = None
+
+        self._window: Deque[Tuple[str, int]] = deque(maxlen=window)  # (rendered line, tokens)
+        self._window_tokens = 0
+        self._conversation: Optional[str] = None
+
+        self._summary = ""
+        self._summary_tokens = 0
+
+    @property
+    def window_size(self) -> int:
+        """Number of recent entries shown verbatim"""
+        return self._window.maxlen
+
+    def set_summary(self, summary: str):
+        """Replace the conversation summary section"""
+        self._summary = f"Conversation summary: {summary}" if summary else ""
+        self._summary_tokens = self.count_tokens(self._summary) if summary else 0
+
+    def set_managed_files(self, managed_files: Iterable[str]):
+        """Replace the managed file list, invalidating the prefix"""
+        self._managed_files = sorted(managed_files)
+        self._prefix = None
+
+    def add_entry(self, entry: ConversationEntry):
+        """Append a conversation entry to the window, evicting the oldest if full"""
+        line = f"{entry.role}: {entry.content[:ENTRY_PREVIEW_CHARS]}..."
+        tokens = self.count_tokens(line)
+        if len(self._window) == self._window.maxlen:
+            self._window_tokens -= self._window[0][1]
+        self._window.append((line, tokens))
+        self._window_tokens += tokens
+        self._conversation = None
+
+    def reset_conversation(self, entries: Iterable[ConversationEntry]):
+        """Rebuild the window from a conversation history (e.g. after loading)"""
+        self._window.clear()
+        self._window_tokens = 0
+        for entry in list(entries)[-self._window.maxlen:]:
+            self.add_entry(entry)
+        self._conversation = None
+
+    @property
+    def prefix(self) -> str:
+        """Agent header and managed files, rebuilt only when they change"""
+        key = (self.state.name, self.state.description)
+        if self._prefix is None or key != self._prefix_key:
+            parts = [
+                f"Agent: {self.state.name}",
+                f"Description: {self.state.description}",
+                f"Workspace: {self.workspace_root}",
+            ]
+            if self._managed_files:
+                parts.append(f"Managed files: {', '.join(self._managed_files)}")
+            self._prefix = "\n".join(parts)
+            self._prefix_tokens = self.count_tokens(self._prefix)
+            self._prefix_key = key
+        return self._prefix
+
+    @property
+    def conversation(self) -> str:
+        """Recent conversation section, empty when there is no history"""
+        if self._conversation is None:
+            if self._window:
+                self._conversation = "\n".join(["Recent conversation:", *(line for line, _ in self._window)])
+            else:
+                self._conversation = ""
+        return self._conversation
+
+    @property
+    def summary(self) -> str:
+        """Summary of older conversation, empty until the compactor writes one"""
+        return self._summary
+
+    def build(self) -> str:
+        """Full context: stable prefix first, then the summary and conversation window"""
+        return "\n".join(section for section in (self.prefix, self._summary, self.conversation) if section)
+
+    def token_counts(self) -> Dict[str, int]:
+        """Token counts per section"""
+        self.prefix  # Make sure the prefix count is current
+        header_tokens = self.count_tokens("Recent conversation:") if self._window else 0
+        conversation_tokens = self._window_tokens + header_tokens
+        return {
+            "prefix": self._prefix_tokens,
+            "summary": self._summary_tokens,
+            "conversation": conversation_tokens,
+            "total": self._prefix_tokens + self._summary_tokens + conversation_tokens,
+        }
@@ -0,0 +1,135 @@
+"""Append-only Conversation Log
+
+Stores an agent's conversation as JSON Lines: every entry is one buffered
+append, so nothing is lost between periodic saves. The file is compacted
+down to the newest `max_entries` lines once that many entries have been
+appended since the last compaction, which bounds it at twice the limit.
+Loading reads only the tail of the file by seeking backwards from the end.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+_READ_BLOCK_SIZE = 64 * 1024
+
+
+class ConversationLog:
+    """JSONL conversation log with tail reads and size-bounded compaction"""
+
+    def __init__(self, path: Path, max_entries: int = 200):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._handle: Optional[TextIO] = None
+        self._appended_since_compaction = 0
+
+    def append(self, entry: dict[str, Any]):
+        """Append one entry and flush it to the OS"""
+        if self._handle is None:
+            self._open_for_append()
+
+        self._handle.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._handle.flush()
+
+        self._appended_since_compaction += 1
+        if self._appended_since_compaction >= self.max_entries:
+            self.compact()
+
+    def tail(self, count: Optional[int] = None) -> list[dict[str, Any]]:
+        """Read the newest `count` entries (default max_entries), oldest first"""
+        entries, _ = self._read_tail(count or self.max_entries)
+        return entries
+
+    def load(self) -> list[dict[str, Any]]:
+        """Read the newest max_entries entries, compacting first if the file holds more"""
+        entries, whole_file = self._read_tail(self.max_entries)
+        if not whole_file:
+            self._rewrite(entries)
+        return entries
+
+    def compact(self):
+        """Rewrite the log keeping only the newest max_entries entries"""
+        entries, whole_file = self._read_tail(self.max_entries)
+        if not whole_file:
+            self._rewrite(entries)
+        self._appended_since_compaction = 0
+
+    def flush(self):
+        """Flush buffered appends"""
+        if self._handle is not None:
+            self._handle.flush()
+
+    def close(self):
+        """Close the append handle; the next append reopens it"""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _open_for_append(self):
+        """Open the append handle, terminating a torn final line left by a crash"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        needs_newline = False
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+
+        self._handle = open(self.path, "a", encoding="utf-8")
+        if needs_newline:
+            self._handle.write("\n")
+
+    def _read_tail(self, count: int) -> tuple[list[dict[str, Any]], bool]:
+        """Read up to `count` trailing entries
+
+        Returns:
+            (entries oldest first, whether the whole file was read)
+        """
+        if not self.path.exists():
+            return [], True
+
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b""
+            # One extra newline marks the start of the oldest wanted line
+            while position > 0 and data.count(b"\n") <= count:
+                read_size = min(_READ_BLOCK_SIZE, position)
+                position -= read_size
+                f.seek(position)
+                data = f.read(read_size) + data
+
+        lines = data.splitlines()
+        whole_file = position == 0 and len(lines) <= count
+        if position > 0:
+            # The first line may be cut off mid-way
+            lines = lines[1:]
+
+        entries = []
+        for line in lines[-count:]:
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A torn final write from a crash - skip it
+                logger.warning(f"Skipping unreadable conversation log line in {self.path}")
+        return entries, whole_file
+
+    def _rewrite(self, entries: list[dict[str, Any]]):
+        """Atomically replace the log with the given entries"""
+        self.close()
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        logger.debug(f"Compacted {self.path} to {len(entries)} entries")
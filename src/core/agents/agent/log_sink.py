@@ -0,0 +1,179 @@
+"""Shared Agent Log Sink
+
+All agent loggers hand their records to one queue (logging.handlers.QueueHandler)
+and a single QueueListener thread writes them to the per-agent log files, so
+logging never does file I/O on the event loop and agents hold no file
+descriptors of their own.
+
+The writer keeps at most `max_open_files` log files open (least recently
+written closed first) and batches writes: records are buffered per file and
+written together whenever the queue runs dry or the buffer fills. Log
+directories are created (and their permissions set) on the writer thread the
+first time a file is opened.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import stat
+import threading
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import IO, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_OPEN_LOG_FILES = 32
+MAX_BUFFERED_RECORDS = 256  # Records buffered before a write even if more are queued
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_DIR_MODE = stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH
+
+
+class _AgentQueueHandler(QueueHandler):
+    """Queues an agent logger's records, tagged with the agent's log file"""
+
+    def __init__(self, log_queue: queue.SimpleQueue, log_file: Path):
+        super().__init__(log_queue)
+        self.log_file = log_file
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        record.agent_log_file = self.log_file
+        return record
+
+
+class _AgentFileWriter(logging.Handler):
+    """Runs on the listener thread: buffers records per file and writes them in batches"""
+
+    def __init__(self, log_queue: queue.SimpleQueue, max_open_files: int):
+        super().__init__()
+        self.log_queue = log_queue
+        self.max_open_files = max_open_files
+        self._handles: "OrderedDict[Path, IO[str]]" = OrderedDict()
+        self._pending: Dict[Path, List[str]] = {}
+        self._pending_count = 0
+        self._unwritable: set[Path] = set()
+        self.batches = 0  # Buffered writes performed
+        self.records = 0  # Records written
+
+    def emit(self, record: logging.LogRecord):
+        log_file = getattr(record, "agent_log_file", None)
+        if log_file is None or log_file in self._unwritable:
+            return
+        self._pending.setdefault(log_file, []).append(self.format(record) + "\n")
+        self._pending_count += 1
+        if self._pending_count >= MAX_BUFFERED_RECORDS or self.log_queue.empty():
+            self.flush()
+
+    def flush(self):
+        """Write every buffered record, one write per file"""
+        pending, self._pending, self._pending_count = self._pending, {}, 0
+        for log_file, lines in pending.items():
+            handle = self._open(log_file)
+            if handle is None:
+                continue
+            try:
+                handle.write("".join(lines))
+                handle.flush()
+                self.batches += 1
+                self.records += len(lines)
+            except OSError as e:
+                logger.warning(f"Could not write agent log {log_file}: {e}")
+
+    def _open(self, log_file: Path) -> Optional[IO[str]]:
+        """Open handle for the file, closing the least recently used beyond the pool size"""
+        handle = self._handles.get(log_file)
+        if handle is not None:
+            self._handles.move_to_end(log_file)
+            return handle
+
+        try:
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                # Keep log directories readable across container users
+                os.chmod(log_file.parent, LOG_DIR_MODE)
+            except OSError:
+                pass
+            handle = open(log_file, "a", encoding="utf-8")
+        except OSError as e:
+            # Records still reach the console through propagation
+            logger.warning(f"Could not open agent log {log_file}: {e}. Agent will use console logging only.")
+            self._unwritable.add(log_file)
+            return None
+
+        self._handles[log_file] = handle
+        while len(self._handles) > self.max_open_files:
+            _, oldest = self._handles.popitem(last=False)
+            oldest.close()
+        return handle
+
+    def open_files(self) -> int:
+        """Number of log files currently open"""
+        return len(self._handles)
+
+    def close(self):
+        self.flush()
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
+        super().close()
+
+
+class AgentLogSink:
+    """Routes agent loggers through one queue to a single writer thread"""
+
+    def __init__(self, max_open_files: int = MAX_OPEN_LOG_FILES):
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.writer = _AgentFileWriter(self.queue, max_open_files)
+        self.writer.setFormatter(logging.Formatter(LOG_FORMAT))
+        self._listener: Optional[QueueListener] = None
+        self._lock = threading.Lock()
+
+    def attach(self, agent_logger: logging.Logger, log_file: Path):
+        """Send the logger's records to log_file (replacing an earlier attachment)"""
+        self.detach(agent_logger)
+        agent_logger.addHandler(_AgentQueueHandler(self.queue, log_file))
+        self.start()
+
+    def detach(self, agent_logger: logging.Logger):
+        """Stop sending the logger's records to its file; queued records are still written"""
+        for handler in list(agent_logger.handlers):
+            if isinstance(handler, _AgentQueueHandler) and handler.queue is self.queue:
+                agent_logger.removeHandler(handler)
+
+    def start(self):
+        """Start the writer thread (idempotent)"""
+        with self._lock:
+            if self._listener is None:
+                self._listener = QueueListener(self.queue, self.writer)
+                self._listener.start()
+
+    def stop(self):
+        """Write everything queued, then stop the writer thread and close open files"""
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener = None
+            self.writer.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Open files and write counters of the writer thread"""
+        return {
+            "open_files": self.writer.open_files(),
+            "batches": self.writer.batches,
+            "records": self.writer.records,
+        }
+
+
+_agent_log_sink: Optional[AgentLogSink] = None
+
+
+def get_agent_log_sink() -> AgentLogSink:
+    """Process-wide sink shared by all agents, stopped (and flushed) at exit"""
+    global _agent_log_sink
+    if _agent_log_sink is None:
+        _agent_log_sink = AgentLogSink()
+        atexit.register(_agent_log_sink.stop)
+    return _agent_log_sink
@@ -0,0 +1,130 @@
+"""Write-behind Agent Metadata Persistence
+
+Agents mark their state dirty instead of writing metadata.json on every
+change. A background task flushes dirty states on a short interval, so a
+burst of updates to one agent costs a single write, and the file I/O runs
+in a worker thread instead of on the event loop. Every write goes through a
+temporary file and an atomic rename, so readers never see a partial file.
+
+Writes are serialized under one lock, and each carries the generation of
+the flush that took it: a write still running in a worker thread when a
+later flush starts (the flusher cancelled by stop(), or a sync flush()
+meanwhile) can finish first or last, but never replaces a newer file with
+an older state.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from src.schemas.agents.agents import AgentState
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 0.5  # seconds
+
+
+def write_json_atomic(path: Path, data: Any):
+    """Write JSON to a temporary file in the same directory and rename it into place"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class AgentStateStore:
+    """Coalesces AgentState writes and flushes them in the background"""
+
+    def __init__(self, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._dirty: Dict[Path, AgentState] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._generation = 0  # Bumped by every snapshot taken; later snapshots hold newer states
+        self._written: Dict[Path, int] = {}  # path -> generation of the state last written there
+        self._write_lock = threading.Lock()
+        self._writing: Optional[asyncio.Future] = None  # Latest write started from a worker thread
+        self.writes = 0  # Files actually written
+        self.coalesced = 0  # Updates absorbed by an already pending write
+
+    def mark_dirty(self, path: Path, state: AgentState):
+        """Schedule the state to be written to path on the next flush"""
+        if path in self._dirty:
+            self.coalesced += 1
+        self._dirty[path] = state
+
+    def discard(self, path: Path):
+        """Drop a pending write, e.g. for a removed agent"""
+        self._dirty.pop(path, None)
+
+    def _take_snapshot(self) -> Tuple[int, Dict[Path, dict]]:
+        """Serialize and clear pending states (on the caller's thread, so state is consistent)"""
+        snapshot = {path: state.to_dict() for path, state in self._dirty.items()}
+        self._dirty.clear()
+        self._generation += 1
+        return self._generation, snapshot
+
+    def _write_snapshot(self, generation: int, snapshot: Dict[Path, dict]):
+        with self._write_lock:
+            for path, data in snapshot.items():
+                if self._written.get(path, 0) > generation:
+                    continue  # A later snapshot already wrote a newer state
+                try:
+                    write_json_atomic(path, data)
+                    self._written[path] = generation
+                    self.writes += 1
+                except OSError as e:
+                    logger.error(f"Failed to write agent metadata {path}: {e}")
+
+    def flush(self):
+        """Write all pending states now (waits for a write running in a worker thread)"""
+        if self._dirty:
+            self._write_snapshot(*self._take_snapshot())
+
+    async def flush_async(self):
+        """Write all pending states from a worker thread, and wait for any write still running"""
+        if self._dirty:
+            self._writing = asyncio.ensure_future(asyncio.to_thread(self._write_snapshot, *self._take_snapshot()))
+        writing = self._writing
+        if writing:
+            try:
+                # Shielded: cancelling the caller must not leave a write running unseen
+                await asyncio.shield(writing)
+            finally:
+                if self._writing is writing and writing.done():
+                    self._writing = None
+
+    async def start(self):
+        """Start the background flusher"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+            logger.info(f"Agent metadata flusher started ({self.flush_interval}s interval)")
+
+    async def stop(self):
+        """Stop the background flusher and write anything still pending"""
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush_async()
+        logger.info("Agent metadata flusher stopped")
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush_async()
+            except Exception as e:
+                logger.error(f"Agent metadata flush failed: {e}")
@@ -0,0 +1,169 @@
+"""Background Conversation Summarization
+
+Folds conversation entries that have left an agent's prompt window into a
+short summary written by the local model. The summary is stored in the
+agent's state and rendered in the prompt in place of the raw history, so
+prompts stay the same size however long an agent lives.
+
+Compaction only runs once the task queue has been idle for a while, and
+folds one span per tick. Generation runs in a worker thread through
+generate_offloaded; the model's generation lock keeps it from overlapping a
+request's inference, and a request arriving mid-compaction waits for at
+most one bounded generation. Agents with tasks running or waiting, or held
+by another caller (debug chat, websocket), are skipped; one that becomes busy
+while its summary is generated keeps its history and is tried again later.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, ContextManager, Iterable, Optional
+
+from src.schemas.agents.agents import ConversationEntry
+
+logger = logging.getLogger(__name__)
+
+MIN_PENDING_ENTRIES = 10  # Entries outside the window before an agent is worth summarizing
+ENTRY_CHARS = 300  # Characters of each entry given to the model
+SPAN_CHARS = 900  # Characters of entries folded per pass (keeps the prompt under its limit)
+SUMMARY_MAX_CHARS = 600  # Longest summary kept
+SUMMARY_MAX_TOKENS = 160
+IDLE_SECONDS = 15.0  # Queue idle time before compaction starts
+POLL_INTERVAL = 5.0  # seconds
+
+
+def _plain(text: str) -> str:
+    """Swap braces so code in the conversation is not read as prompt placeholders"""
+    return text.replace("{", "(").replace("}", ")")
+
+
+class ConversationCompactor:
+    """Summarizes older conversation spans of hydrated agents while the queue is idle"""
+
+    def __init__(
+        self,
+        agents: Callable[[], Iterable],
+        is_idle: Callable[[], bool],
+        idle_seconds: float = IDLE_SECONDS,
+        poll_interval: float = POLL_INTERVAL,
+        in_use: Optional[Callable[[str], ContextManager]] = None,
+        busy: Optional[Callable[[str, int], bool]] = None,
+    ):
+        self.agents = agents
+        self.is_idle = is_idle
+        self.in_use = in_use  # agent ID -> context keeping the agent loaded while it is summarized
+        self.busy = busy  # (agent ID, in_use blocks held here) -> whether other work is using the agent
+        self.idle_seconds = idle_seconds
+        self.poll_interval = poll_interval
+        self._idle_since: Optional[float] = None
+        self._runner: Optional[asyncio.Task] = None
+        self.summaries = 0  # Summaries written
+        self.entries_summarized = 0  # Entries folded into summaries
+
+    def _next_agent(self):
+        """Hydrated agent with the most entries waiting to be summarized, if any qualify"""
+        best, best_pending = None, MIN_PENDING_ENTRIES - 1
+        for agent in self.agents():
+            llm_manager = agent.llm_manager
+            if not llm_manager or not getattr(llm_manager, "model_loaded", False):
+                continue
+            if self._is_busy(agent, pinned=0):
+                continue
+            pending = len(agent.pending_summary_entries())
+            if pending > best_pending:
+                best, best_pending = agent, pending
+        return best
+
+    async def summarize(self, agent, pinned: int = 0) -> bool:
+        """Fold the oldest pending span of an agent's conversation into its summary
+
+        `pinned` is the number of agent_in_use blocks the caller holds on the
+        agent, which do not count as other work using it.
+        """
+        pending = agent.pending_summary_entries()
+        if not pending:
+            return False
+
+        span: list[ConversationEntry] = []
+        lines = []
+        used = 0
+        for entry in pending:
+            line = _plain(f"{entry.role}: {entry.content[:ENTRY_CHARS]}")
+            if span and used + len(line) + 1 > SPAN_CHARS:
+                break
+            span.append(entry)
+            lines.append(line)
+            used += len(line) + 1
+
+        prompt = agent.prompt_manager.format_prompt(
+            "agents",
+            "conversation_summary",
+            summary=agent.state.conversation_summary or "(none)",
+            entries="\n".join(lines),
+        )
+        result = await agent.llm_manager.generate_offloaded(prompt, max_tokens=SUMMARY_MAX_TOKENS, temperature=0.2)
+        if not result["success"]:
+            logger.warning(f"Conversation summary failed for {agent.state.name}: {result['error']}")
+            return False
+
+        summary = _plain(" ".join(result["response"].split()))[:SUMMARY_MAX_CHARS]
+        if not summary:
+            return False
+        if self._is_busy(agent, pinned):
+            logger.debug(f"Discarding conversation summary for {agent.state.name}: agent became busy")
+            return False
+
+        agent.apply_summary(summary, span[-1].seq)
+        self.summaries += 1
+        self.entries_summarized += len(span)
+        logger.info(f"📝 Summarized {len(span)} older entries for {agent.state.name} ({len(summary)} chars)")
+        return True
+
+    def _is_busy(self, agent, pinned: int) -> bool:
+        """Whether a request or another caller is using the agent"""
+        return bool(self.busy and self.busy(agent.state.agent_id, pinned))
+
+    async def run_once(self) -> bool:
+        """Summarize one span if the queue has been idle long enough"""
+        if not self.is_idle():
+            self._idle_since = None
+            return False
+
+        now = time.monotonic()
+        if self._idle_since is None:
+            self._idle_since = now
+        if now - self._idle_since < self.idle_seconds:
+            return False
+
+        agent = self._next_agent()
+        if not agent:
+            return False
+        if not self.in_use:
+            return await self.summarize(agent)
+        with self.in_use(agent.state.agent_id):
+            return await self.summarize(agent, pinned=1)
+
+    async def start(self):
+        """Start the background compaction loop"""
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+            logger.info(f"Conversation compactor started (after {self.idle_seconds}s idle)")
+
+    async def stop(self):
+        """Stop the background compaction loop"""
+        if self._runner:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+            logger.info("Conversation compactor stopped")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Conversation compaction failed: {e}")
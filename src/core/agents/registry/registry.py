@@ -2,69 +2,270 @@
 
 Responsibilities:
 - Track and manage all active agents  
-- Load agents from disk on startup
+- Index agents from disk on startup, building full agents on first use
 - Provide agent lookup and statistics
 - Handle agent creation and removal
 - Use unified task queue for all operations
+- Summarize older agent conversations while the queue is idle
 """
 
 import asyncio
+import json
 import logging
+import os
 import shutil
-from datetime import datetime, timezone
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from src.core.agents.agent.agent import Agent, AgentCreateParams
+from src.core.agents.agent.state_store import AgentStateStore
+from src.core.agents.agent.summarizer import ConversationCompactor
+from src.core.agents.registry.snapshot import RegistrySnapshot
+from src.core.agents.registry.stats import RegistryStats
 from src.core.config.manager.manager import ConfigManager
-from src.core.tasks.queue import AgentTask, TaskExecutor, TaskQueue, TaskStatus
-from src.schemas.agents.agents import TaskType, create_standard_request
+from src.core.exceptions import FileOwnershipConflict
+from src.core.tasks.queue import AdmissionPolicy, AgentTask, ResultStore, TaskExecutor, TaskQueue, TaskStatus
+from src.schemas.agents.agents import AgentState, TaskType, create_standard_request
 
 logger = logging.getLogger(__name__)
 
+# Outstanding (queued + running) task limits per task type. Agent tasks come from
+# MCP clients that can back off on a retry hint; tool calls are issued mid-conversation
+# by agents, so they wait briefly for a slot instead of failing the conversation.
+TASK_CAPACITY = {"agent_operation": 25, "tool_call": 50}
+ADMISSION_POLICIES = {"agent_operation": AdmissionPolicy.REJECT, "tool_call": AdmissionPolicy.WAIT}
+
+# Agents whose tasks may run at the same time; each agent runs one task at a time
+MAX_PARALLEL_AGENTS = 4
+
+# Micro-batching: seconds a task of each listed request type waits for more requests
+# to the same agent before they are merged into one LLM call. Off by default.
+BATCHABLE_TASK_TYPES = ("conversation", "code_generation")
+BATCH_WINDOWS: Dict[str, float] = {}
+MAX_BATCH_SIZE = 4  # Tasks merged into one LLM call at most
+
+# Request type strings to task types
+TASK_TYPES = {
+    "conversation": TaskType.CONVERSATION,
+    "file_edit": TaskType.FILE_EDIT,
+    "code_generation": TaskType.CODE_GENERATION,
+    "system_query": TaskType.SYSTEM_QUERY,
+}
+
+# Fully built agents kept in memory; the least recently used beyond this are unloaded
+MAX_HYDRATED_AGENTS = 64
+
+# Stale-file cleanup lists directories in a thread pool once there are this many
+PARALLEL_SCAN_THRESHOLD = 16
+SCAN_WORKERS = 8
+
+
+def _list_directory(directory: str) -> Set[str]:
+    """Names in a directory that exist (broken symlinks excluded); empty if it is missing"""
+    try:
+        with os.scandir(directory) as entries:
+            return {
+                entry.name for entry in entries if not entry.is_symlink() or os.path.exists(entry.path)
+            }
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
 
-class AgentTaskExecutor(TaskExecutor):
-    """Executor for agent tasks in the unified queue system"""
 
-    def __init__(self, agent_registry):
+def _existing_files(workspace_root: Path, file_paths: Iterable[str]) -> Set[str]:
+    """Which of the workspace-relative paths exist, listing each directory once"""
+    by_directory: Dict[str, List[Tuple[str, str]]] = {}  # directory -> (file path, name)
+    for file_path in file_paths:
+        directory, name = os.path.split(os.path.normpath(os.path.join(workspace_root, file_path)))
+        by_directory.setdefault(directory, []).append((file_path, name))
+
+    directories = list(by_directory)
+    if len(directories) >= PARALLEL_SCAN_THRESHOLD:
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+            listings = list(pool.map(_list_directory, directories))
+    else:
+        listings = [_list_directory(directory) for directory in directories]
+
+    return {
+        file_path
+        for directory, names in zip(directories, listings)
+        for file_path, name in by_directory[directory]
+        if name in names
+    }
+
+
+class AgentTaskExecutor(TaskExecutor):
+    """Executor for agent tasks in the unified queue system
+
+    The queue dispatches tasks concurrently, so each agent gets a lock acting
+    as its mailbox: tasks for the same agent run strictly one after another in
+    dispatch order (asyncio.Lock wakes waiters FIFO), while tasks for
+    different agents run in parallel up to `max_parallel_agents`.
+
+    Micro-batching is opt-in per task type through `batch_windows`: a task of
+    a listed type waits that many seconds once it holds its agent's lock,
+    then takes the tasks of the same type queued right behind it for that
+    agent (up to `max_batch_size` in all) and has the agent answer them with
+    one LLM call. Merged tasks are completed by the batch; when their turn
+    comes they find themselves finished and return. A task the batch could
+    not finish (the batch failed, or it timed out meanwhile) simply runs on
+    its own turn.
+
+    A task counts as running (TaskQueue.running_count, its run time in the
+    queue statistics) only once it holds its agent's lock and a parallel
+    slot; until then it is still queued. A task merged into another's batch
+    is marked started, from the batch's start, only when the batch answers
+    it; otherwise it stays queued until its own turn. Its timeout runs from
+    creation, so it includes that wait.
+    """
+
+    starts_tasks = True
+
+    def __init__(
+        self,
+        agent_registry,
+        max_parallel_agents: int = MAX_PARALLEL_AGENTS,
+        batch_windows: Optional[Dict[str, float]] = None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+    ):
+        if max_parallel_agents < 1:
+            raise ValueError(f"max_parallel_agents must be at least 1, got {max_parallel_agents}")
+        batch_windows = dict(BATCH_WINDOWS if batch_windows is None else batch_windows)
+        for task_type, window in batch_windows.items():
+            if task_type not in BATCHABLE_TASK_TYPES:
+                raise ValueError(f"Task type {task_type!r} cannot be batched; use one of {BATCHABLE_TASK_TYPES}")
+            if window < 0:
+                raise ValueError(f"Batch window for {task_type!r} must not be negative, got {window}")
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {max_batch_size}")
         self.agent_registry = agent_registry
+        self.max_parallel_agents = max_parallel_agents
+        self.batch_windows = batch_windows
+        self.max_batch_size = max_batch_size
+        self._parallel = asyncio.Semaphore(max_parallel_agents)
+        self._agent_locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}  # Tasks holding or waiting on each lock
+        self._waiting: Dict[str, List[AgentTask]] = {}  # Tasks waiting on each lock, in arrival order
+        self.batches = 0  # Merged LLM requests made
+        self.batched_tasks = 0  # Tasks answered through a batch
+        self.llm_calls_saved = 0  # LLM calls avoided by batching
 
     async def execute(self, task: AgentTask):
-        """Execute an agent task"""
+        """Execute an agent task once its agent is free and a parallel slot is available"""
+        lock = self._agent_locks.get(task.agent_id)
+        if lock is None:
+            lock = self._agent_locks[task.agent_id] = asyncio.Lock()
+            self._waiting[task.agent_id] = []
+        self._lock_users[task.agent_id] = self._lock_users.get(task.agent_id, 0) + 1
+        waiting = self._waiting[task.agent_id]
+        waiting.append(task)
+
+        try:
+            # Agent lock first so a busy agent's backlog does not hold parallel slots
+            async with lock:
+                waiting.remove(task)
+                if task.is_terminal:
+                    return  # Already answered as part of an earlier task's batch
+                batch = await self._collect_batch(task, waiting)
+                async with self._parallel:
+                    self.task_started(task)
+                    if len(batch) > 1:
+                        await self._process_batch(batch)
+                    else:
+                        await self._process(task)
+        finally:
+            if task in waiting:
+                waiting.remove(task)  # Cancelled or timed out before its turn
+            self._lock_users[task.agent_id] -= 1
+            if not self._lock_users[task.agent_id]:
+                # No one else queued for this agent - drop its lock
+                del self._lock_users[task.agent_id]
+                del self._agent_locks[task.agent_id]
+                del self._waiting[task.agent_id]
+
+    def active_agents(self) -> int:
+        """Number of agents with a task running or waiting"""
+        return len(self._agent_locks)
+
+    def is_busy(self, agent_id: str) -> bool:
+        """Whether the agent has a task running or waiting"""
+        return agent_id in self._agent_locks
+
+    @staticmethod
+    def _request_type(task: AgentTask) -> Optional[str]:
+        """The task's request type if the task could be merged with others, else None"""
+        if not isinstance(task.request, dict) or len(task.request.get("files") or []) > 1:
+            return None  # Multi-file requests already batch their files
+        return task.request.get("task_type", "conversation")
+
+    async def _collect_batch(self, task: AgentTask, waiting: List[AgentTask]) -> List[AgentTask]:
+        """The task plus compatible tasks waiting for the same agent, after the type's batch window"""
+        request_type = self._request_type(task)
+        window = self.batch_windows.get(request_type)
+        if window is None or self.max_batch_size < 2:
+            return [task]
+
+        if window > 0:
+            await asyncio.sleep(window)  # Let more requests for this agent arrive
+
+        # Only the run of compatible tasks right behind this one, so the agent's order is kept
+        batch = [task]
+        for other in waiting:
+            if len(batch) >= self.max_batch_size:
+                break
+            if other.is_terminal:
+                continue
+            if self._request_type(other) != request_type:
+                break
+            batch.append(other)
+        return batch
+
+    def _build_request(self, task: AgentTask, task_type: TaskType):
+        """AgentRequest for a task's request"""
+        if isinstance(task.request, dict):
+            return create_standard_request(
+                task.request.get("message", ""),
+                task_type,
+                task.agent_id,
+                files=task.request.get("files"),
+            )
+        # Request is already a proper AgentRequest object
+        return task.request
+
+    @staticmethod
+    def _task_type(task: AgentTask) -> TaskType:
+        """Map the task's request type string to its enum"""
+        return TASK_TYPES.get(task.request.get("task_type", "conversation"), TaskType.CONVERSATION)
+
+    @staticmethod
+    def _store_result(task: AgentTask, response):
+        """Record an agent response as the task's result and complete it"""
+        task.result = {
+            "success": response.success,
+            "content": response.content,
+            "task_type": response.task_type.value,
+            "timestamp": response.timestamp,
+            "files_modified": response.files_modified or [],
+            "metadata": response.metadata or {},
+        }
+        task.finish(TaskStatus.COMPLETED)
+
+    async def _process(self, task: AgentTask):
+        """Run an agent task against its agent"""
         try:
             logger.info(f"🤖 Executing agent task {task.task_id}")
-            task.status = TaskStatus.RUNNING
 
             # Get agent
-            agent = self.agent_registry.agents.get(task.agent_id)
+            agent = self.agent_registry.get_agent(task.agent_id)
             if not agent:
                 raise ValueError(f"Agent not found: {task.agent_id}")
 
             logger.info(f"🤖 Found agent: {agent.state.name} (ID: {task.agent_id})")
 
-            # Map task type string to enum
-            task_type_map = {
-                "conversation": TaskType.CONVERSATION,
-                "file_edit": TaskType.FILE_EDIT,
-                "code_generation": TaskType.CODE_GENERATION,
-                "system_query": TaskType.SYSTEM_QUERY,
-            }
-
-            task_type = task_type_map.get(
-                task.request.get("task_type", "conversation"),
-                TaskType.CONVERSATION
-            )
-
             # Create standard request if needed
-            if isinstance(task.request, dict):
-                request = create_standard_request(
-                    task.request.get("message", ""),
-                    task_type,
-                    task.agent_id
-                )
-            else:
-                # Request is already a proper AgentRequest object
-                request = task.request
+            request = self._build_request(task, self._task_type(task))
 
             # Process request
             response = await agent.process_request(request)
@@ -75,65 +276,246 @@ class AgentTaskExecutor(TaskExecutor):
             )
 
             # Store result
-            task.result = {
-                "success": response.success,
-                "content": response.content,
-                "task_type": response.task_type.value,
-                "timestamp": response.timestamp,
-                "files_modified": response.files_modified or [],
-            }
-            task.status = TaskStatus.COMPLETED
-            task.completed_at = datetime.now(timezone.utc).isoformat()
+            self._store_result(task, response)
 
             logger.info(f"Agent task {task.task_id} completed successfully")
 
         except Exception as e:
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
-            task.completed_at = datetime.now(timezone.utc).isoformat()
+            task.finish(TaskStatus.FAILED, error=str(e))
             logger.error(f"Agent task {task.task_id} failed: {e}")
 
+    async def _process_batch(self, batch: List[AgentTask]):
+        """Answer the tasks with one merged agent request
 
-class AgentRegistry:
-    """Central registry for managing all agents"""
+        Only the leading task fails if the batch does; the others were never
+        touched and run on their own turn.
+        """
+        leader = batch[0]
+        try:
+            logger.info(f"🤖 Executing agent task {leader.task_id} merged with {len(batch) - 1} waiting tasks")
+
+            agent = self.agent_registry.get_agent(leader.agent_id)
+            if not agent:
+                raise ValueError(f"Agent not found: {leader.agent_id}")
+
+            task_type = self._task_type(leader)
+            requests = [self._build_request(task, task_type) for task in batch]
+            responses, llm_calls = await agent.process_batch(requests)
+
+            for task, response in zip(batch, responses):
+                if not task.is_terminal:  # A merged task may have timed out or been cancelled meanwhile
+                    self.task_started(task, leader.started_ns)  # Ran as part of the batch
+                    self._store_result(task, response)
+
+            self.batches += 1
+            self.batched_tasks += len(batch)
+            self.llm_calls_saved += len(batch) - llm_calls
+            logger.info(
+                f"🧩 Batch of {len(batch)} tasks for {agent.state.name} used {llm_calls} LLM calls"
+            )
+
+        except Exception as e:
+            leader.finish(TaskStatus.FAILED, error=str(e))
+            logger.error(f"Agent task {leader.task_id} failed: {e}")
 
-    def __init__(self, config_manager: ConfigManager, llm_manager=None, tool_executor=None):
+
+class AgentRegistry:
+    """Central registry for managing all agents
+
+    Startup only reads each agent's metadata into `agent_index` (ID, name,
+    managed files and statistics). The full Agent - conversation history,
+    prompt manager, file handler - is built the first time it is needed and
+    kept in `agents`, which therefore holds hydrated agents only. A hydrated
+    agent shares its AgentState with the index, so both stay in sync.
+
+    At most `max_hydrated_agents` stay built: beyond that the least recently
+    used agents without pending tasks are flushed and unloaded back to their
+    index entries, and get_agent builds them again on next use. Callers
+    should look agents up when needed rather than hold on to them; one that
+    keeps an agent across an await outside the task queue takes it through
+    agent_in_use, which keeps it loaded until the block exits.
+
+    Reverse indexes map each managed file to its single owning agent and each
+    name to an agent, so ownership checks and name lookups are O(1). They are
+    maintained by create_agent, remove_agent and the file assignment methods.
+
+    save_registry also writes a single-file snapshot of every agent state,
+    which the next startup reads instead of parsing each metadata.json.
+
+    Aggregate statistics are kept as running totals in `stats`, updated when
+    an agent is indexed or removed and whenever a hydrated agent saves its
+    metadata, so get_registry_stats never walks the agents.
+
+    Queued requests to the same agent can be merged into one LLM call per
+    request type through `batch_windows` (see AgentTaskExecutor); without the
+    argument they come from the model configuration (BATCH_WINDOWS).
+    """
+
+    def __init__(
+        self,
+        config_manager: ConfigManager,
+        llm_manager=None,
+        tool_executor=None,
+        max_parallel_agents: int = MAX_PARALLEL_AGENTS,
+        max_hydrated_agents: int = MAX_HYDRATED_AGENTS,
+        batch_windows: Optional[Dict[str, float]] = None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+    ):
         self.config_manager = config_manager
         self.llm_manager = llm_manager
         self.tool_executor = tool_executor
-        self.agents: Dict[str, Agent] = {}
+        self.agent_index: Dict[str, AgentState] = {}  # Every registered agent
+        self.agents: "OrderedDict[str, Agent]" = OrderedDict()  # Hydrated agents, least recently used first
+        self.max_hydrated_agents = max_hydrated_agents
+        self.dehydrated_count = 0  # Agents unloaded to stay within max_hydrated_agents
+        self._in_use: Dict[str, int] = {}  # agent ID -> agent_in_use blocks holding it
+        self.file_owners: Dict[str, str] = {}  # file path -> owning agent ID
+        self.agent_ids_by_name: Dict[str, str] = {}  # name -> agent ID (first registered wins)
+        self.stats = RegistryStats(self.agent_index)
         self.system_config = config_manager.system
-        self.task_queue = TaskQueue(max_tasks=100, tool_executor=tool_executor)
+        self.state_store = AgentStateStore()
+        self.snapshot = RegistrySnapshot(self.system_config.state_dir / "registry.snapshot")
+        self.task_queue = TaskQueue(
+            max_tasks=100,
+            tool_executor=tool_executor,
+            capacity=TASK_CAPACITY,
+            admission_policies=ADMISSION_POLICIES,
+            result_store=ResultStore(self.system_config.state_dir / "results"),
+        )
 
         # Create and register agent task executor
-        agent_executor = AgentTaskExecutor(self)
-        self.task_queue.register_executor("agent_operation", agent_executor)
+        if batch_windows is None:
+            batch_windows = getattr(config_manager.model, "batch_windows", None)
+        self.agent_executor = AgentTaskExecutor(self, max_parallel_agents, batch_windows, max_batch_size)
+        self.task_queue.register_executor("agent_operation", self.agent_executor)
+
+        # Folds older conversation into agent summaries while no tasks are running
+        self.compactor = ConversationCompactor(
+            lambda: list(self.agents.values()),
+            self.task_queue.is_idle,
+            in_use=self.agent_in_use,
+            busy=self.agent_busy,
+        )
 
-        # Load existing agents from disk
+        # Index existing agents from disk
         self._load_agents_from_disk()
 
-        # Start task queue worker
+        # Start task queue worker, metadata flusher and conversation compactor
         asyncio.create_task(self.task_queue.start_worker())
+        asyncio.create_task(self.state_store.start())
+        asyncio.create_task(self.compactor.start())
 
     def _load_agents_from_disk(self):
-        """Load all agents from the agents directory"""
-        if not self.system_config.agents_dir.exists():
+        """Index all agents in the agents directory from their metadata only
+
+        States come from the registry snapshot where an agent's metadata.json
+        is unchanged since the snapshot was written; only new or changed
+        agents (or all of them, without a valid snapshot) are parsed.
+        """
+        agents_dir = self.system_config.agents_dir
+        if not agents_dir.exists():
             logger.info("No agents directory found, starting with empty registry")
             return
 
+        cached = self.snapshot.load()
         loaded_count = 0
-        for agent_dir in self.system_config.agents_dir.iterdir():
-            if agent_dir.is_dir():
+        from_snapshot = 0
+        with os.scandir(agents_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
                 try:
-                    agent = Agent.load_from_disk(
-                        agent_dir.name, self.system_config, self.llm_manager, self.tool_executor
-                    )
-                    self.agents[agent.state.agent_id] = agent
+                    metadata_path = os.path.join(entry.path, "metadata.json")
+                    stat = os.stat(metadata_path)
+                    snapshot_entry = cached.get(entry.name)
+                    if (
+                        snapshot_entry
+                        and snapshot_entry.mtime_ns == stat.st_mtime_ns
+                        and snapshot_entry.size == stat.st_size
+                    ):
+                        state = snapshot_entry.state
+                        from_snapshot += 1
+                    else:
+                        with open(metadata_path) as f:
+                            state = AgentState(**json.load(f))
+                    self.agent_index[state.agent_id] = state
+                    self._index_agent(state)
+                    self.stats.update(state)
                     loaded_count += 1
                 except Exception as e:
-                    logger.warning(f"Failed to load agent from {agent_dir}: {e}")
+                    logger.warning(f"Failed to load agent from {entry.path}: {e}")
+
+        logger.info(f"Indexed {loaded_count} agents from disk ({from_snapshot} from snapshot)")
+
+    def _index_agent(self, state: AgentState):
+        """Add an agent's name and managed files to the reverse indexes"""
+        self.agent_ids_by_name.setdefault(state.name, state.agent_id)
+        for file_path in state.managed_files:
+            owner = self.file_owners.setdefault(file_path, state.agent_id)
+            if owner != state.agent_id:
+                # Only possible with metadata written before ownership was enforced
+                logger.warning(f"File {file_path} claimed by both {owner} and {state.agent_id}; keeping {owner}")
+
+    def _unindex_agent(self, state: AgentState):
+        """Remove an agent's name and managed files from the reverse indexes"""
+        for file_path in state.managed_files:
+            if self.file_owners.get(file_path) == state.agent_id:
+                del self.file_owners[file_path]
+
+        if self.agent_ids_by_name.get(state.name) == state.agent_id:
+            del self.agent_ids_by_name[state.name]
+            # Fall back to another agent with the same name, if any (rare, removal only)
+            for other in self.agent_index.values():
+                if other.name == state.name:
+                    self.agent_ids_by_name[state.name] = other.agent_id
+                    break
+
+    def _check_file_available(self, file_path: str, agent_id: Optional[str] = None):
+        """Raise FileOwnershipConflict if another agent already manages the file"""
+        owner = self.file_owners.get(file_path)
+        if owner is not None and owner != agent_id:
+            raise FileOwnershipConflict(file_path, owner, agent_id)
+
+    def _hydrate(self, agent_id: str) -> Optional[Agent]:
+        """Build the full Agent for an indexed agent, or return it if already built"""
+        agent = self.agents.get(agent_id)
+        if agent:
+            self.agents.move_to_end(agent_id)
+            return agent
+
+        state = self.agent_index.get(agent_id)
+        if not state:
+            return None
 
-        logger.info(f"Loaded {loaded_count} agents from disk")
+        agent = Agent(
+            state, self.system_config, self.llm_manager, self.tool_executor, self.state_store, self.stats.update
+        )
+        self.agents[agent_id] = agent
+        logger.debug(f"Hydrated agent {state.name} (ID: {agent_id})")
+        self._evict_idle_agents()
+        return agent
+
+    def _evict_idle_agents(self):
+        """Unload least recently used agents beyond the cap, skipping any with pending tasks or in use"""
+        excess = len(self.agents) - self.max_hydrated_agents
+        if excess <= 0:
+            return
+
+        # The most recently used agent is the one just requested, so it is never a candidate
+        for agent_id in list(self.agents)[:-1]:
+            if excess <= 0:
+                break
+            if self.agent_busy(agent_id):
+                continue
+            self._dehydrate(agent_id)
+            excess -= 1
+
+    def _dehydrate(self, agent_id: str):
+        """Flush an agent and drop it back to its index entry"""
+        agent = self.agents.pop(agent_id)
+        agent.close()
+        self.dehydrated_count += 1
+        logger.debug(f"Dehydrated agent {agent.state.name} (ID: {agent_id})")
 
     def update_toolchain(self, llm_manager=None, tool_executor=None):
         """Update all agents with new LLM manager and tool executor"""
@@ -145,15 +527,22 @@ class AgentRegistry:
             self.task_queue.tool_executor = self.tool_executor
             logger.info("✅ Updated TaskQueue with consolidated tool executor")
 
-        # Update existing agents
+        # Update hydrated agents - the rest pick up the toolchain when built
         for agent in self.agents.values():
             agent.llm_manager = self.llm_manager
             agent.tool_executor = self.tool_executor
 
-        logger.info(f"Updated {len(self.agents)} agents with consolidated toolchain")
+        logger.info(f"Updated {len(self.agents)} hydrated agents with consolidated toolchain")
 
     def create_agent(self, name: str, description: str, specialized_files: list[str] = None) -> Agent:
-        """Create a new agent and register it"""
+        """Create a new agent and register it
+
+        Raises:
+            FileOwnershipConflict: If another agent already manages one of the files
+        """
+        for file_path in specialized_files or []:
+            self._check_file_available(file_path)
+
         params = AgentCreateParams(
             name=name,
             description=description,
@@ -161,70 +550,130 @@ class AgentRegistry:
             specialized_files=specialized_files or [],
         )
 
-        agent = Agent.create(params, self.llm_manager, self.tool_executor)
+        agent = Agent.create(params, self.llm_manager, self.tool_executor, self.state_store, self.stats.update)
+        self.agent_index[agent.state.agent_id] = agent.state
         self.agents[agent.state.agent_id] = agent
+        self._index_agent(agent.state)
+        self.stats.update(agent.state)
+        self._evict_idle_agents()
 
         logger.info(f"Created new agent: {name} (ID: {agent.state.agent_id})")
         return agent
 
     def get_agent(self, agent_id: str) -> Optional[Agent]:
-        """Get agent by ID"""
-        return self.agents.get(agent_id)
+        """Get agent by ID, building it on first use"""
+        return self._hydrate(agent_id)
+
+    @contextmanager
+    def agent_in_use(self, agent_id: str) -> Iterator[Optional[Agent]]:
+        """Get agent by ID and keep it loaded until the block exits (None if not registered)
+
+        For callers that use an agent across awaits without going through the
+        task queue: unloading it meanwhile would close it under them, and the
+        next lookup would build a second Agent with its own history.
+        """
+        agent = self._hydrate(agent_id)
+        if agent is None:
+            yield None
+            return
+        self._in_use[agent_id] = self._in_use.get(agent_id, 0) + 1
+        try:
+            yield agent
+        finally:
+            self._in_use[agent_id] -= 1
+            if not self._in_use[agent_id]:
+                del self._in_use[agent_id]
+
+    def agent_busy(self, agent_id: str, pinned: int = 0) -> bool:
+        """Whether the agent has tasks running or waiting, or more than `pinned` agent_in_use blocks hold it"""
+        return self.agent_executor.is_busy(agent_id) or self._in_use.get(agent_id, 0) > pinned
 
     def get_agent_by_name(self, name: str) -> Optional[Agent]:
-        """Get agent by name (returns first match)"""
-        for agent in self.agents.values():
-            if agent.state.name == name:
-                return agent
-        return None
+        """Get agent by name (returns the first registered match)"""
+        agent_id = self.agent_ids_by_name.get(name)
+        return self._hydrate(agent_id) if agent_id else None
+
+    def list_agent_states(self) -> list[AgentState]:
+        """Get metadata of all registered agents without building them"""
+        return list(self.agent_index.values())
 
     def list_agents(self) -> list[Agent]:
-        """Get list of all registered agents"""
-        return list(self.agents.values())
+        """Get list of all registered agents (builds any that are not yet hydrated)
+
+        With more agents than max_hydrated_agents, earlier agents in the list
+        are unloaded again as later ones are built; prefer list_agent_states.
+        """
+        return [self._hydrate(agent_id) for agent_id in list(self.agent_index)]
 
     def remove_agent(self, agent_id: str) -> bool:
         """Remove agent from registry"""
-        if agent_id in self.agents:
-            agent = self.agents.pop(agent_id)
-            logger.info(f"Removed agent: {agent.state.name} (ID: {agent_id})")
+        if agent_id in self.agent_index:
+            state = self.agent_index.pop(agent_id)
+            agent = self.agents.pop(agent_id, None)
+            if agent:
+                agent.close()
+            self._unindex_agent(state)
+            self.stats.remove(state)
+            self.state_store.discard(self.system_config.agents_dir / agent_id / "metadata.json")
+            logger.info(f"Removed agent: {state.name} (ID: {agent_id})")
             return True
         return False
 
+    def get_file_owner(self, file_path: str) -> Optional[str]:
+        """Get the ID of the agent managing a file, if any"""
+        return self.file_owners.get(file_path)
+
     def get_agents_for_file(self, file_path: str) -> list[Agent]:
-        """Get all agents that manage a specific file"""
-        return [agent for agent in self.agents.values() if file_path in agent.managed_files]
+        """Get all agents that manage a specific file (at most one)"""
+        agent_id = self.file_owners.get(file_path)
+        return [self._hydrate(agent_id)] if agent_id else []
 
     def assign_file_to_agent(self, agent_id: str, file_path: str) -> bool:
-        """Assign a file to an agent"""
+        """Assign a file to an agent
+
+        Raises:
+            FileOwnershipConflict: If another agent already manages the file
+        """
+        if agent_id not in self.agent_index:
+            return False
+
+        self._check_file_available(file_path, agent_id)
         agent = self.get_agent(agent_id)
-        if agent:
-            agent.add_managed_file(file_path)
-            return True
-        return False
+        agent.add_managed_file(file_path)
+        self.file_owners[file_path] = agent_id
+        return True
 
     def unassign_file_from_agent(self, agent_id: str, file_path: str) -> bool:
         """Unassign a file from an agent"""
         agent = self.get_agent(agent_id)
         if agent:
             agent.remove_managed_file(file_path)
+            if self.file_owners.get(file_path) == agent_id:
+                del self.file_owners[file_path]
             return True
         return False
 
     def cleanup_invalid_files(self) -> int:
-        """Remove references to files that no longer exist"""
-        workspace_root = self.system_config.workspace_root
+        """Remove references to files that no longer exist
+
+        Each directory holding managed files is listed once (in a thread pool
+        for large workspaces) and every agent losing files saves its metadata once.
+        """
+        all_files = {file_path for state in self.agent_index.values() for file_path in state.managed_files}
+        existing = _existing_files(self.system_config.workspace_root, all_files)
         cleanup_count = 0
 
-        for agent in self.agents.values():
-            files_to_remove = []
-            for file_path in agent.managed_files:
-                full_path = workspace_root / file_path
-                if not full_path.exists():
-                    files_to_remove.append(file_path)
+        for agent_id, state in list(self.agent_index.items()):
+            files_to_remove = [file_path for file_path in state.managed_files if file_path not in existing]
+            if not files_to_remove:
+                continue
 
+            # Only agents that actually lose files need to be built
+            self.get_agent(agent_id).remove_managed_files(files_to_remove)
             for file_path in files_to_remove:
-                agent.remove_managed_file(file_path)
-                cleanup_count += 1
+                if self.file_owners.get(file_path) == agent_id:
+                    del self.file_owners[file_path]
+            cleanup_count += len(files_to_remove)
 
         if cleanup_count > 0:
             logger.info(f"Cleaned up {cleanup_count} invalid file references")
@@ -234,36 +683,59 @@ class AgentRegistry:
     def save_registry(self):
         """Save registry state to disk"""
         try:
-            # Each agent already saves its own state
-            # This method ensures all agents persist their current state
+            # Agents mark their metadata dirty; write out anything not yet flushed.
+            # Agents that were never built have nothing newer than what is on disk
+            self.state_store.flush()
             for agent in self.agents.values():
-                agent._save_metadata()
                 agent._save_conversation_history()
 
-            logger.info(f"Saved registry with {len(self.agents)} agents")
+            # Taken after the flush so each record matches its metadata.json
+            snapshot_count = self.snapshot.write(self.agent_index.values(), self.system_config.agents_dir)
+
+            logger.info(
+                f"Saved registry with {len(self.agents)} hydrated agents ({snapshot_count} agents in snapshot)"
+            )
         except Exception as e:
             logger.error(f"Failed to save registry: {e}")
 
-    def queue_task(self, agent_id: str, request: Dict) -> str:
+    def queue_task(
+        self,
+        agent_id: str,
+        request: Dict,
+        timeout: Optional[float] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> str:
         """Queue a new agent task for async execution
         
         Args:
             agent_id: ID of the agent to execute the task
             request: Dictionary containing message and task_type
+            timeout: Optional seconds after which the task is abandoned as timed out
+            idempotency_key: Optional key; resubmitting it for the same agent within
+                the queue's TTL returns the original task ID instead of queueing a duplicate
             
         Returns:
             Task ID string
+
+        Raises:
+            TaskQueueFull: If the agent task capacity is exhausted
         """
         # Ensure request is a dictionary
         if not isinstance(request, dict):
             raise TypeError(f"Request must be a dictionary, got {type(request)}")
             
         # Create the AgentTask with proper structure
-        task = AgentTask.create(agent_id=agent_id, request=request)
+        task = AgentTask.create(
+            agent_id=agent_id, request=request, timeout=timeout, idempotency_key=idempotency_key
+        )
         
         # Queue the task - task.task_id is guaranteed to be a string from create()
         return self.task_queue.queue_task(task)
 
+    def cancel_task(self, task_id: str) -> bool:
+        """Cancel a queued or running task"""
+        return self.task_queue.cancel_task(task_id)
+
     def get_task_status(self, task_id: str) -> Optional[Dict]:
         """Get task status"""
         return self.task_queue.get_task_status(task_id)
@@ -279,42 +751,41 @@ class AgentRegistry:
             return [t for t in all_tasks if t.get("agent_id") == agent_id]
         return all_tasks
 
-    def get_registry_stats(self) -> dict:
-        """Get statistics about the agent registry including task queue"""
-        if not self.agents:
-            return {
-                "total_agents": 0,
-                "managed_files": 0,
-                "total_interactions": 0,
-                "average_success_rate": 0.0,
-                "most_active_agent": None,
-                "queued_tasks": len(self.task_queue.tasks),
-                "active_tasks": sum(1 for t in self.task_queue.tasks.values() if t.status.value == "running"),
-            }
+    def get_queue_stats(self) -> dict:
+        """Get per-type task queue statistics (depth, wait/run histograms, outcomes)"""
+        return self.task_queue.get_queue_stats()
 
-        total_interactions = sum(agent.state.interaction_count for agent in self.agents.values())
-        total_files = sum(len(agent.managed_files) for agent in self.agents.values())
-
-        # Calculate average success rate
-        success_rates = [
-            agent.state.success_rate for agent in self.agents.values() if agent.state.interaction_count > 0
-        ]
-        avg_success_rate = sum(success_rates) / len(success_rates) if success_rates else 0.0
-
-        # Find most active agent
-        most_active = max(self.agents.values(), key=lambda a: a.state.interaction_count, default=None)
+    def get_registry_stats(self) -> dict:
+        """Get statistics about the agent registry including task queue
 
+        Agent totals come from running totals; only the hydrated agents (at
+        most max_hydrated_agents) are visited, for their resident memory.
+        """
+        resident = {agent_id: agent.resident_bytes for agent_id, agent in self.agents.items()}
         return {
-            "total_agents": len(self.agents),
-            "managed_files": total_files,
-            "total_interactions": total_interactions,
-            "average_success_rate": round(avg_success_rate, 3),
-            "most_active_agent": most_active.state.name if most_active else None,
+            "total_agents": len(self.agent_index),
+            "hydrated_agents": len(self.agents),
+            "managed_files": self.stats.managed_files,
+            "total_interactions": self.stats.total_interactions,
+            "average_success_rate": round(self.stats.average_success_rate, 3),
+            "most_active_agent": self.stats.most_active_agent,
             "queued_tasks": len(self.task_queue.tasks),
-            "active_tasks": sum(1 for t in self.task_queue.tasks.values() if t.status.value == "running"),
+            "active_tasks": self.task_queue.running_count,
+            "timed_out_tasks": self.task_queue.metrics["timeouts"],
+            "deduplicated_submissions": self.task_queue.metrics["deduplicated"],
+            "rejected_tasks": self.task_queue.metrics["rejected"],
+            "conversation_summaries": self.compactor.summaries,
+            "batched_tasks": self.agent_executor.batched_tasks,
+            "llm_calls_saved": self.agent_executor.llm_calls_saved,
+            "max_hydrated_agents": self.max_hydrated_agents,
+            "dehydrated_agents": self.dehydrated_count,
+            "resident_bytes": sum(resident.values()),
+            "resident_bytes_by_agent": resident,
         }
 
     async def shutdown(self):
         """Shutdown registry and task queue"""
+        await self.compactor.stop()
         await self.task_queue.stop_worker()
+        await self.state_store.stop()
         self.save_registry()
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""Binary Agent Registry Snapshot
+
+Stores every indexed AgentState in a single file under .mcp-state so a cold
+start reads one file instead of parsing each agent's metadata.json.
+
+Layout: a fixed header (magic, format version, record count, payload length,
+CRC32 of the payload) followed by a marshal-encoded payload holding the
+AgentState field names and one record per agent. Each record carries the
+metadata.json mtime and size it was taken from, so the registry can tell
+which agents changed since the snapshot and re-read only those.
+
+A snapshot with the wrong magic, version, length, checksum or field list is
+ignored as a whole and startup falls back to scanning every agent directory.
+"""
+
+import logging
+import marshal
+import os
+import struct
+import tempfile
+import zlib
+from dataclasses import fields
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple
+
+from src.schemas.agents.agents import AgentState
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MCPREG"
+FORMAT_VERSION = 1
+HEADER = struct.Struct(">6sHIQI")  # magic, version, record count, payload length, crc32
+STATE_FIELDS = tuple(field.name for field in fields(AgentState))
+
+
+class SnapshotEntry(NamedTuple):
+    """An agent state and the metadata.json it was taken from"""
+
+    mtime_ns: int
+    size: int
+    state: AgentState
+
+
+class RegistrySnapshot:
+    """Reads and writes the single-file snapshot of all agent states"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def write(self, states: Iterable[AgentState], agents_dir: Path) -> int:
+        """Snapshot the given states (their metadata must already be on disk)
+
+        Returns:
+            Number of agents written; agents without a metadata file are left out
+        """
+        records = []
+        for state in states:
+            try:
+                stat = os.stat(agents_dir / state.agent_id / "metadata.json")
+            except OSError:
+                continue
+            values = tuple(getattr(state, name) for name in STATE_FIELDS)
+            records.append((state.agent_id, stat.st_mtime_ns, stat.st_size, values))
+
+        payload = marshal.dumps((STATE_FIELDS, records))
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, len(records), len(payload), zlib.crc32(payload))
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return len(records)
+
+    def load(self) -> Dict[str, SnapshotEntry]:
+        """Read the snapshot, keyed by agent ID; empty if it is missing or invalid"""
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return {}
+        except OSError as e:
+            logger.warning(f"Could not read registry snapshot {self.path}: {e}")
+            return {}
+
+        try:
+            magic, version, count, length, checksum = HEADER.unpack_from(data)
+            payload = data[HEADER.size:]
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"unsupported format {magic!r} v{version}")
+            if len(payload) != length or zlib.crc32(payload) != checksum:
+                raise ValueError("length or checksum mismatch")
+
+            state_fields, records = marshal.loads(payload)
+            if tuple(state_fields) != STATE_FIELDS:
+                raise ValueError("AgentState fields changed")
+            if len(records) != count:
+                raise ValueError(f"expected {count} records, found {len(records)}")
+
+            return {
+                agent_id: SnapshotEntry(mtime_ns, size, AgentState(*values))
+                for agent_id, mtime_ns, size, values in records
+            }
+        except (struct.error, ValueError, EOFError, TypeError) as e:
+            logger.warning(f"Ignoring registry snapshot {self.path}: {e}")
+            return {}
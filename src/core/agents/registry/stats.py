@@ -0,0 +1,80 @@
+"""Incremental Agent Registry Statistics
+
+Keeps running totals over every indexed agent state - interactions, managed
+files, the success-rate sum and the most active agent - so registry stats
+are O(1) instead of a pass over all agents on every status request.
+
+Each agent's last counted contribution is remembered, so an update
+subtracts the old values and adds the new ones whatever changed.
+"""
+
+from typing import Dict, Optional, Tuple
+
+from src.schemas.agents.agents import AgentState
+
+
+class RegistryStats:
+    """Running totals over the agent index, updated on every state change"""
+
+    def __init__(self, agent_index: Dict[str, AgentState]):
+        self.agent_index = agent_index  # Rescanned only when the most active agent is removed
+        # agent_id -> (interactions, managed files, success rate or None without interactions)
+        self._counted: Dict[str, Tuple[int, int, Optional[float]]] = {}
+        self.total_interactions = 0
+        self.managed_files = 0
+        self.success_rate_sum = 0.0
+        self.rated_agents = 0
+        self._most_active: Optional[AgentState] = None
+
+    def _add(self, agent_id: str, interactions: int, files: int, success_rate: Optional[float]):
+        self._counted[agent_id] = (interactions, files, success_rate)
+        self.total_interactions += interactions
+        self.managed_files += files
+        if success_rate is not None:
+            self.success_rate_sum += success_rate
+            self.rated_agents += 1
+
+    def _subtract(self, agent_id: str):
+        counted = self._counted.pop(agent_id, None)
+        if counted is None:
+            return
+        interactions, files, success_rate = counted
+        self.total_interactions -= interactions
+        self.managed_files -= files
+        if success_rate is not None:
+            self.success_rate_sum -= success_rate
+            self.rated_agents -= 1
+            if not self.rated_agents:
+                self.success_rate_sum = 0.0  # Drop accumulated rounding error
+
+    def update(self, state: AgentState):
+        """Count a new agent or recount one whose state changed"""
+        self._subtract(state.agent_id)
+        interactions = state.interaction_count
+        self._add(
+            state.agent_id,
+            interactions,
+            len(state.managed_files),
+            state.success_rate if interactions > 0 else None,
+        )
+        # Interaction counts only grow, so the leader changes only when overtaken
+        if self._most_active is None or interactions > self._most_active.interaction_count:
+            self._most_active = state
+
+    def remove(self, state: AgentState):
+        """Stop counting a removed agent (call after it leaves the index)"""
+        self._subtract(state.agent_id)
+        if self._most_active is state:
+            self._most_active = max(
+                self.agent_index.values(), key=lambda other: other.interaction_count, default=None
+            )
+
+    @property
+    def average_success_rate(self) -> float:
+        """Mean success rate over agents with at least one interaction"""
+        return self.success_rate_sum / self.rated_agents if self.rated_agents else 0.0
+
+    @property
+    def most_active_agent(self) -> Optional[str]:
+        """Name of the agent with the most interactions"""
+        return self._most_active.name if self._most_active else None
@@ -12,7 +12,7 @@ Workspace: Container /workspace or host-based paths with .mcp-agents/ structure
 
 import logging
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from src.core.utils.utils import get_workspace_root
@@ -46,6 +46,13 @@ class ModelConfig:
     repeat_penalty: float = 1.1
     max_tokens: int = 8192
 
+    # Dispatch fenced tool calls while code generation is still running (STREAM_TOOL_CALLS=true)
+    stream_tool_calls: bool = False
+
+    # Seconds queued requests of each type wait to be merged into one LLM call
+    # (BATCH_WINDOWS="conversation=0.05,code_generation=0.1"); empty = micro-batching off
+    batch_windows: dict[str, float] = field(default_factory=dict)
+
     def __post_init__(self):
         """Validate configuration after initialization"""
         # Only warn about missing model path, don't fail
@@ -133,6 +140,9 @@ class ConfigManager:
 
     def _create_model_config(self) -> ModelConfig:
         """Create model configuration with automatic path detection"""
+        stream_tool_calls = os.environ.get("STREAM_TOOL_CALLS") == "true"
+        batch_windows = self._parse_batch_windows(os.environ.get("BATCH_WINDOWS", ""))
+
         # Common model paths
         possible_paths = [
             Path("/app/models/Qwen2.5-7B-Instruct-Q6_K_L.gguf"),  # Container models mount
@@ -144,10 +154,26 @@ class ConfigManager:
 
         for path in possible_paths:
             if path.exists():
-                return ModelConfig(model_path=str(path))
+                return ModelConfig(
+                    model_path=str(path), stream_tool_calls=stream_tool_calls, batch_windows=batch_windows
+                )
 
         # Default path (may not exist)
-        return ModelConfig(model_path=str(possible_paths[0]))
+        return ModelConfig(
+            model_path=str(possible_paths[0]), stream_tool_calls=stream_tool_calls, batch_windows=batch_windows
+        )
+
+    @staticmethod
+    def _parse_batch_windows(value: str) -> dict[str, float]:
+        """Parse "type=seconds,type=seconds" into batch windows, skipping malformed entries"""
+        windows = {}
+        for entry in filter(None, (part.strip() for part in value.split(","))):
+            task_type, _, seconds = entry.partition("=")
+            try:
+                windows[task_type.strip()] = float(seconds)
+            except ValueError:
+                logging.getLogger(__name__).warning(f"Ignoring malformed BATCH_WINDOWS entry: {entry!r}")
+        return windows
 
     def _create_system_config(self) -> SystemConfig:
         """Create system configuration with workspace detection"""
@@ -210,6 +236,8 @@ class ConfigManager:
                 "context_size": self.model.n_ctx,
                 "batch_size": self.model.n_batch,
                 "temperature": self.model.temperature,
+                "stream_tool_calls": self.model.stream_tool_calls,
+                "batch_windows": self.model.batch_windows,
             },
             "server": {
                 "host": self.server.host,
@@ -20,8 +20,27 @@ class AgentNotFound(AgentSystemError):
 
 class TaskQueueFull(AgentSystemError):
     """Raised when task queue at capacity"""
-    def __init__(self, max_capacity: int):
-        super().__init__(f"Task queue at maximum capacity: {max_capacity}", "task_queue_full", {"max_capacity": max_capacity})
+    def __init__(self, max_capacity: int, task_type: str = None, retry_after: float = None):
+        message = f"Task queue at maximum capacity: {max_capacity}"
+        if task_type:
+            message += f" {task_type} tasks"
+        if retry_after is not None:
+            message += f", retry after {retry_after}s"
+        super().__init__(
+            message,
+            "task_queue_full",
+            {"max_capacity": max_capacity, "task_type": task_type, "retry_after": retry_after}
+        )
+
+
+class FileOwnershipConflict(AgentSystemError):
+    """Raised when a file is assigned to an agent while another agent manages it"""
+    def __init__(self, file_path: str, owner_agent_id: str, requested_agent_id: str = None):
+        super().__init__(
+            f"File {file_path} is already managed by agent {owner_agent_id}",
+            "file_ownership_conflict",
+            {"file_path": file_path, "owner_agent_id": owner_agent_id, "requested_agent_id": requested_agent_id}
+        )
 
 
 class MaxDepthExceeded(AgentSystemError):
@@ -7,14 +7,21 @@ Responsibilities:
 - Provide model information and statistics
 """
 
+import asyncio
 import logging
+import threading
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
 
 from src.core.mcp.bridge.bridge import MCPBridge
 
 logger = logging.getLogger(__name__)
 
+# Stop tokens for tool-calling generations
+TOOL_STOP_TOKENS = ["```\n\nassistant", "assistant:", "Human:"]
+
+_STREAM_END = object()  # Marks the end of a stream handed over from the generation thread
+
 
 class LLMManager:
     """Core language model manager"""
@@ -25,6 +32,10 @@ class LLMManager:
         self.model_path = model_config.model_path if model_config else None
         self.performance_stats = {"total_requests": 0, "successful_requests": 0, "average_response_time": 0.0}
 
+        # The model runs one generation at a time; held around every call into it so
+        # generations offloaded to worker threads never overlap
+        self.generation_lock = threading.Lock()
+
         # Initialize MCP Bridge with tool executor and task queue
         self.mcp_bridge = None
         self.tool_executor = tool_executor
@@ -139,9 +150,10 @@ class LLMManager:
             self.performance_stats["total_requests"] += 1
 
             # Generate response
-            response = self.llm(
-                prompt, max_tokens=max_tokens, temperature=temperature, stop=stop_tokens or [], echo=False
-            )
+            with self.generation_lock:
+                response = self.llm(
+                    prompt, max_tokens=max_tokens, temperature=temperature, stop=stop_tokens or [], echo=False
+                )
 
             # Calculate response time
             response_time = time.time() - start_time
@@ -167,6 +179,40 @@ class LLMManager:
             logger.error(f"Model inference failed: {e}")
             return {"success": False, "error": str(e), "response": None}
 
+    def stream_response(
+        self, prompt: str, max_tokens: int = 512, temperature: float = 0.7, stop_tokens: list = None
+    ) -> Iterator[str]:
+        """Generate a response from the loaded model, yielding text as it is produced
+
+        The generation lock is held until the stream is exhausted or closed.
+        Errors are raised rather than returned, since text may already have
+        been yielded when they happen.
+        """
+        if not self.is_ready():
+            raise RuntimeError("Model not loaded. Call load_model() first.")
+
+        import time
+
+        start_time = time.time()
+        self.performance_stats["total_requests"] += 1
+
+        with self.generation_lock:
+            stream = self.llm(
+                prompt, max_tokens=max_tokens, temperature=temperature, stop=stop_tokens or [], echo=False, stream=True
+            )
+            for chunk in stream:
+                text = chunk["choices"][0]["text"]
+                if text:
+                    yield text
+
+        response_time = time.time() - start_time
+        self.performance_stats["successful_requests"] += 1
+        total_successful = self.performance_stats["successful_requests"]
+        current_avg = self.performance_stats["average_response_time"]
+        self.performance_stats["average_response_time"] = (
+            (current_avg * (total_successful - 1)) + response_time
+        ) / total_successful
+
     def is_ready(self) -> bool:
         """Check if model is ready for inference"""
         return self.model_loaded and hasattr(self, "llm") and self.llm is not None
@@ -225,40 +271,68 @@ class LLMManager:
             return ""
         return self.mcp_bridge.get_tools_prompt()
 
-    async def generate_with_tools(self, prompt: str, max_tokens: int = 512,
-                                 temperature: float = 0.7, tools_enabled: bool = True) -> Dict[str, Any]:
-        """Generate response with tool calling capability"""
-        logger.debug(f"generate_with_tools called with tools_enabled={tools_enabled}")
-        if not self.model_loaded:
-            logger.debug(f"Model not loaded, returning error")
-            return {
-                "success": False,
-                "error": "Model not loaded",
-                "type": "error"
-            }
-
-        # Enhance prompt with tool definitions if available
-        enhanced_prompt = prompt
+    def build_tools_prompt(self, prompt: str, tools_enabled: bool = True) -> str:
+        """Prefix the prompt with the tool definitions when tools are available"""
         if tools_enabled and self.mcp_bridge:
             tools_prompt = self._format_tools_for_qwen()
             logger.debug(f"Tools available, enhanced prompt with {len(tools_prompt)} chars")
             logger.debug(f"Tools prompt preview: {tools_prompt[:200]}...")
             logger.info(f"🔧 TOOLS AVAILABLE: Enhanced prompt with {len(tools_prompt)} character tool definitions")
             logger.info(f"🔧 TOOLS PROMPT: {tools_prompt[:200]}...")
-            enhanced_prompt = f"{tools_prompt}\n\nUser request: {prompt}\n\nResponse:"
-        else:
-            logger.debug(f"NO TOOLS - tools_enabled={tools_enabled}, mcp_bridge={self.mcp_bridge is not None}")
-            logger.warning("🚨 NO TOOLS AVAILABLE: mcp_bridge not configured or tools_enabled=False")
+            return f"{tools_prompt}\n\nUser request: {prompt}\n\nResponse:"
 
-        # Generate response using existing method with refined stop tokens
-        stop_tokens = ["```\n\nassistant", "assistant:", "Human:"]
-        result = self.generate_response(
-            enhanced_prompt,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            stop_tokens=stop_tokens
-        )
+        logger.debug(f"NO TOOLS - tools_enabled={tools_enabled}, mcp_bridge={self.mcp_bridge is not None}")
+        logger.warning("🚨 NO TOOLS AVAILABLE: mcp_bridge not configured or tools_enabled=False")
+        return prompt
 
+    async def generate_offloaded(
+        self, prompt: str, max_tokens: int = 512, temperature: float = 0.7, stop_tokens: list = None
+    ) -> dict:
+        """generate_response in a worker thread, leaving the event loop free meanwhile"""
+        return await asyncio.to_thread(self.generate_response, prompt, max_tokens, temperature, stop_tokens)
+
+    async def stream_offloaded(
+        self, prompt: str, max_tokens: int = 512, temperature: float = 0.7, stop_tokens: list = None
+    ) -> AsyncIterator[str]:
+        """stream_response in a worker thread, yielding its text on the event loop
+
+        Closing the iterator early stops the generation at the next token.
+        """
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def produce():
+            stream = None
+            try:
+                stream = self.stream_response(prompt, max_tokens, temperature, stop_tokens)
+                for text in stream:
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(chunks.put_nowait, text)
+                loop.call_soon_threadsafe(chunks.put_nowait, _STREAM_END)
+            except Exception as e:
+                logger.error(f"Model inference failed: {e}")
+                loop.call_soon_threadsafe(chunks.put_nowait, e)
+            finally:
+                if stream is not None:
+                    stream.close()  # Releases the generation lock
+
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                item = await chunks.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            await asyncio.wait({producer})
+
+    async def process_tool_output(self, result: dict, tools_enabled: bool = True) -> Dict[str, Any]:
+        """Turn a generate_response result into a text or tool_calls result, dispatching any tool calls"""
         if not result["success"]:
             return {
                 "success": False,
@@ -297,3 +371,59 @@ class LLMManager:
             "usage": result.get("usage", {}),
             "response_time": result.get("response_time", 0.0)
         }
+
+    async def generate_with_tools(self, prompt: str, max_tokens: int = 512,
+                                 temperature: float = 0.7, tools_enabled: bool = True) -> Dict[str, Any]:
+        """Generate response with tool calling capability"""
+        logger.debug(f"generate_with_tools called with tools_enabled={tools_enabled}")
+        if not self.model_loaded:
+            logger.debug(f"Model not loaded, returning error")
+            return {
+                "success": False,
+                "error": "Model not loaded",
+                "type": "error"
+            }
+
+        # Enhance prompt with tool definitions if available
+        enhanced_prompt = self.build_tools_prompt(prompt, tools_enabled)
+
+        # Generate in a worker thread with refined stop tokens; the loop stays free meanwhile
+        result = await self.generate_offloaded(
+            enhanced_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stop_tokens=TOOL_STOP_TOKENS
+        )
+
+        return await self.process_tool_output(result, tools_enabled)
+
+    async def generate_with_tools_streaming(self, prompt: str, max_tokens: int = 512,
+                                            temperature: float = 0.7, tools_enabled: bool = True) -> Dict[str, Any]:
+        """generate_with_tools, dispatching each tool call while the rest is still generated
+
+        Same result shape as generate_with_tools; see MCPBridge.process_model_stream
+        for how calls dispatched before a failed generation are cancelled.
+        """
+        if not (tools_enabled and self.mcp_bridge):
+            return await self.generate_with_tools(prompt, max_tokens, temperature, tools_enabled)
+        if not self.is_ready():
+            return {
+                "success": False,
+                "error": "Model not loaded",
+                "type": "error"
+            }
+
+        import time
+
+        start_time = time.time()
+        enhanced_prompt = self.build_tools_prompt(prompt, tools_enabled)
+        stream = self.stream_offloaded(enhanced_prompt, max_tokens, temperature, TOOL_STOP_TOKENS)
+        processed = await self.mcp_bridge.process_model_stream(stream)
+
+        if processed.get("type") == "tool_calls":
+            logger.info(f"✅ TOOL CALLS DETECTED: {len(processed.get('tool_calls', []))} calls (dispatched while generating)")
+
+        processed["success"] = processed.get("type") != "error"
+        processed["usage"] = {}
+        processed["response_time"] = time.time() - start_time
+        return processed
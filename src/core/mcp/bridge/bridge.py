@@ -1,12 +1,21 @@
-"""MCP Bridge for Local Model Tool Calling"""
+"""MCP Bridge for Local Model Tool Calling
+
+process_model_output handles a finished completion. process_model_stream
+handles one still being generated: each tool call is validated and
+dispatched as soon as the streaming parser completes it, so tool execution
+overlaps the rest of the generation. Only fenced calls are dispatched early:
+an unfenced call could still be superseded by a fence later in the output,
+so it waits for generation to end. Calls dispatched from a generation that
+then fails are cancelled.
+"""
 
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import AsyncGenerator, Dict, List, Any, Optional
 import asyncio
 
 from .formatter import ToolPromptFormatter
-from .unified_parser import UnifiedToolCallParser, ParsingStrategy
+from .unified_parser import ParsingStrategy, StreamingToolCallParser, UnifiedToolCallParser
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +29,7 @@ class MCPBridge:
 
         # Use JSON-only parser strategy
         self.parser = UnifiedToolCallParser(ParsingStrategy.JSON_PRIMARY)
-        self.formatter = ToolPromptFormatter(self.available_tools)
+        self.formatter = ToolPromptFormatter(self.available_tools, self._tool_validators())
 
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.logger.info(f"MCPBridge initialized with {len(self.available_tools)} tools (JSON-only mode)")
@@ -60,31 +69,7 @@ class MCPBridge:
             # Validate and execute tool calls
             results = []
             for i, tool_call in enumerate(tool_calls):
-                self.logger.info(f"Processing tool call {i+1}: {tool_call}")
-
-                # Validate tool call
-                is_valid, validation_error = self.formatter.validate_tool_call(tool_call)
-                if not is_valid:
-                    self.logger.error(f"Invalid tool call: {validation_error}")
-                    results.append({
-                        "success": False,
-                        "error": validation_error,
-                        "tool_call": tool_call
-                    })
-                    continue
-
-                # Execute tool call
-                try:
-                    result = await self._execute_tool_call(tool_call, parent_task_id)
-                    results.append(result)
-                    self.logger.info(f"Tool call {i+1} executed: {result.get('success', False)}")
-                except Exception as e:
-                    self.logger.exception(f"Error executing tool call {i+1}: {e}")
-                    results.append({
-                        "success": False,
-                        "error": str(e),
-                        "tool_call": tool_call
-                    })
+                results.append(await self._process_tool_call(i, tool_call, parent_task_id))
 
             self.logger.debug(f"EXIT process_model_output: {len(results)} results")
             return {
@@ -103,6 +88,169 @@ class MCPBridge:
             }
 
 
+    async def process_model_stream(
+        self, chunks: AsyncGenerator[str, None], parent_task_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Parse model output as it streams in, dispatching each tool call once complete
+
+        Returns the same shape as process_model_output. Fenced calls run one
+        after another, in the order they completed, while generation goes on;
+        unfenced calls are only dispatched once the stream ends without a
+        fenced call, as process_model_output would then keep them. If the
+        stream raises, dispatched calls are cancelled and an error is returned
+        with what happened to each ("cancelled"). `chunks` is always closed
+        before returning, so its generation does not outlive the call. A
+        dispatched call that the final parse does not keep is cancelled.
+
+        Cancelling stops queued tool tasks before they start and interrupts
+        running ones; a call that already finished cannot be undone and is
+        reported with cancelled=False.
+        """
+        self.logger.debug("ENTRY process_model_stream")
+        stream_parser = StreamingToolCallParser(self.parser, hold_unfenced=True)
+        dispatched: List[tuple] = []  # (tool_call, asyncio.Task) in dispatch order
+        previous: Optional[asyncio.Task] = None
+        text_parts = []
+
+        def dispatch(tool_call: Dict[str, Any]):
+            nonlocal previous
+            index = len(dispatched)
+            self.logger.info(f"⚡ Dispatching tool call {index + 1} while generating: {tool_call.get('tool_name')}")
+            previous = asyncio.create_task(self._process_tool_call(index, tool_call, parent_task_id, after=previous))
+            dispatched.append((tool_call, previous))
+
+        try:
+            try:
+                async for chunk in chunks:
+                    text_parts.append(chunk)
+                    for tool_call in stream_parser.feed(chunk):
+                        dispatch(tool_call)
+            finally:
+                # Stops the generation (and frees the model) if we leave early
+                await chunks.aclose()
+        except asyncio.CancelledError:
+            for tool_call, task in dispatched:
+                await self._cancel_dispatched(tool_call, task)
+            raise
+        except Exception as e:
+            model_output = "".join(text_parts)
+            self.logger.error(f"Generation failed after {len(dispatched)} dispatched tool calls: {e}")
+            cancelled = [await self._cancel_dispatched(tool_call, task) for tool_call, task in dispatched]
+            return {
+                "type": "error",
+                "content": model_output,
+                "error": str(e),
+                "cancelled": cancelled
+            }
+
+        model_output = "".join(text_parts)
+        try:
+            parse_result = stream_parser.close()
+            self.logger.info(f"Parsing strategy: {parse_result.strategy_used}")
+            for error in parse_result.errors:
+                self.logger.warning(f"Parser warning: {error}")
+
+            for tool_call in stream_parser.late_calls:
+                dispatch(tool_call)
+
+            # Results in final order, which can differ from completion order
+            results = []
+            for tool_call in parse_result.tool_calls:
+                for entry in dispatched:
+                    if entry[0] == tool_call:
+                        dispatched.remove(entry)
+                        results.append(await entry[1])
+                        break
+
+            # Anything left was dispatched but is not in the final parse
+            for tool_call, task in dispatched:
+                self.logger.warning(
+                    f"Dispatched tool call {tool_call.get('tool_name')} is not in the parsed output; cancelling it"
+                )
+                await self._cancel_dispatched(tool_call, task)
+            dispatched.clear()
+
+            if not parse_result.tool_calls:
+                self.logger.info("No tool calls detected in model output")
+                return {
+                    "type": "text",
+                    "content": model_output,
+                    "tool_calls": []
+                }
+
+            self.logger.debug(f"EXIT process_model_stream: {len(results)} results")
+            return {
+                "type": "tool_calls",
+                "content": model_output,
+                "tool_calls": parse_result.tool_calls,
+                "results": results
+            }
+
+        except Exception as e:
+            self.logger.exception(f"Error processing model stream: {e}")
+            for tool_call, task in dispatched:
+                await self._cancel_dispatched(tool_call, task)
+            return {
+                "type": "error",
+                "content": model_output,
+                "error": str(e)
+            }
+
+    async def _process_tool_call(
+        self,
+        index: int,
+        tool_call: Dict[str, Any],
+        parent_task_id: Optional[str] = None,
+        after: Optional[asyncio.Task] = None,
+    ) -> Dict[str, Any]:
+        """Validate and execute one tool call, once `after` (the call before it) is done"""
+        if after is not None:
+            # wait() rather than await: the call before may have been cancelled
+            await asyncio.wait({after})
+
+        self.logger.info(f"Processing tool call {index+1}: {tool_call}")
+
+        # Validate tool call
+        is_valid, validation_error = self.formatter.validate_tool_call(tool_call)
+        if not is_valid:
+            self.logger.error(f"Invalid tool call: {validation_error}")
+            return {
+                "success": False,
+                "error": validation_error,
+                "tool_call": tool_call
+            }
+
+        # Execute tool call
+        try:
+            result = await self._execute_tool_call(tool_call, parent_task_id)
+            self.logger.info(f"Tool call {index+1} executed: {result.get('success', False)}")
+            return result
+        except Exception as e:
+            self.logger.exception(f"Error executing tool call {index+1}: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "tool_call": tool_call
+            }
+
+    async def _cancel_dispatched(self, tool_call: Dict[str, Any], task: asyncio.Task) -> Dict[str, Any]:
+        """Cancel a dispatched tool call: its dispatch if still pending, else its queued task"""
+        tool_name = tool_call.get('tool_name') or tool_call.get('name')
+        if not task.done():
+            task.cancel()
+            await asyncio.wait({task})
+        if task.cancelled():
+            self.logger.info(f"🚫 Cancelled dispatched tool call {tool_name}")
+            return {"tool_call": tool_call, "cancelled": True}
+
+        result = task.result()
+        cancelled = bool(result.get("queued") and self.task_queue and self.task_queue.cancel_task(result["task_id"]))
+        if cancelled:
+            self.logger.info(f"🚫 Cancelled queued tool call {tool_name} ({result['task_id']})")
+        else:
+            self.logger.warning(f"⚠️ Tool call {tool_name} already finished; it cannot be undone")
+        return {"tool_call": tool_call, "cancelled": cancelled, "result": result}
+
     async def _execute_tool_call(self, tool_call: Dict[str, Any], parent_task_id: Optional[str] = None) -> Dict[str, Any]:
         """Execute a single tool call - via queue if available, otherwise direct"""
         tool_name = tool_call.get('tool_name') or tool_call.get('name')
@@ -139,6 +287,7 @@ class MCPBridge:
 
     async def _execute_tool_call_queued(self, tool_name: str, arguments: Dict[str, Any], parent_task_id: Optional[str] = None) -> Dict[str, Any]:
         """Execute tool call through task queue with depth limiting"""
+        from src.core.exceptions import TaskQueueFull
         from src.core.tasks.queue.task import ToolCallTask
 
         self.logger.info(f"🔄 Queuing tool call: {tool_name} (parent: {parent_task_id})")
@@ -151,8 +300,18 @@ class MCPBridge:
             priority=1  # Tool calls get higher priority
         )
 
-        # Queue the task directly to generic queue
-        task_id = self.task_queue.queue_task(task)
+        # Queue the task directly to generic queue, waiting for capacity if the policy allows
+        try:
+            task_id = await self.task_queue.submit(task)
+        except TaskQueueFull as e:
+            self.logger.warning(f"🚧 Tool call {tool_name} rejected: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "error_type": e.error_type,
+                "retry_after": e.context.get("retry_after"),
+                "tool_name": tool_name,
+            }
 
         self.logger.info(f"📝 Tool call task queued: {task_id}")
 
@@ -184,9 +343,13 @@ class MCPBridge:
         """Register available tools"""
         self.logger.debug(f"ENTRY register_tools: {len(tools)} tools")
         self.available_tools = tools
-        self.formatter = ToolPromptFormatter(self.available_tools)
+        self.formatter = ToolPromptFormatter(self.available_tools, self._tool_validators())
         self.logger.info(f"Registered {len(tools)} tools: {[t.get('name') for t in tools]}")
 
+    def _tool_validators(self) -> Optional[Dict[str, Any]]:
+        """Argument validators the tool executor compiled from its tool schemas, if it has them"""
+        return getattr(self.tool_executor, "tool_validators", None)
+
     def is_ready(self) -> bool:
         """Check if bridge is ready to process tool calls"""
         ready = bool(self.available_tools and self.tool_executor)
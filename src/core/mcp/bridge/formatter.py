@@ -1,16 +1,25 @@
 """Tool Prompt Formatter for Local Model - JSON-Only with Prompt Manager"""
 
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from src.core.prompts.manager import PromptManager
 
+from .validators import Validator, compile_tool_validators
+
 logger = logging.getLogger(__name__)
 
 class ToolPromptFormatter:
     """Formats MCP tools for inclusion in model prompts - JSON-only with prompt manager"""
 
-    def __init__(self, tools: List[Dict[str, Any]]):
+    def __init__(self, tools: List[Dict[str, Any]], validators: Optional[Dict[str, Validator]] = None):
         self.tools = tools
+        # Argument validators by tool name: the ones supplied (compiled by the tool
+        # executor) are reused, any other tool's schema is compiled here
+        supplied = validators or {}
+        self.validators: Dict[str, Validator] = compile_tool_validators(
+            tool for tool in tools if tool.get('name') not in supplied
+        )
+        self.validators.update({tool['name']: supplied[tool['name']] for tool in tools if tool.get('name') in supplied})
         self.prompt_manager = PromptManager()
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
@@ -88,21 +97,14 @@ Parameters:
             return None
 
     def validate_tool_call(self, tool_call: Dict[str, Any]) -> tuple[bool, str]:
-        """Validate a tool call against available tools"""
-        self.logger.debug(f"ENTRY validate_tool_call: {tool_call}")
-
+        """Validate a tool call against available tools and its tool's inputSchema"""
         tool_name = tool_call.get('tool_name') or tool_call.get('name')
+        self.logger.debug(f"ENTRY validate_tool_call: {tool_name}")
         if not tool_name:
             return False, "No tool_name specified"
 
-        # Find matching tool
-        matching_tool = None
-        for tool in self.tools:
-            if tool.get('name') == tool_name:
-                matching_tool = tool
-                break
-
-        if not matching_tool:
+        validator = self.validators.get(tool_name)
+        if validator is None:
             available_tools = [tool.get('name', 'unknown') for tool in self.tools]
             return False, f"Tool '{tool_name}' not available. Available tools: {available_tools}"
 
@@ -111,13 +113,10 @@ Parameters:
         if not isinstance(arguments, dict):
             return False, f"Arguments must be a dictionary, got {type(arguments)}"
 
-        # Check required parameters
-        input_schema = matching_tool.get('inputSchema', {})
-        required_params = input_schema.get('required', [])
-
-        for param in required_params:
-            if param not in arguments:
-                return False, f"Required parameter '{param}' missing"
+        # Required parameters, types, enums and nested arrays/objects
+        error = validator(arguments)
+        if error:
+            return False, error
 
         self.logger.debug(f"EXIT validate_tool_call: valid")
-        return True, "Valid tool call"
\ No newline at end of file
+        return True, "Valid tool call"
@@ -1,6 +1,15 @@
 """Unified Tool Call Parser - JSON-Only
 
 This module provides JSON-only tool call parsing for the local-llm-mcp system.
+
+Unfenced tool calls are found in a single pass: json.JSONDecoder.raw_decode
+decodes each candidate object in place, so objects of any nesting depth are
+matched whole and strings (escapes included) are handled by the decoder
+rather than a regex.
+
+StreamingToolCallParser applies the same rules to output as it is generated,
+returning each tool call once it is complete, so calls can be handled while
+the model is still producing the rest.
 """
 
 import json
@@ -38,7 +47,9 @@ class UnifiedToolCallParser:
 
     # Regex patterns for JSON formats
     JSON_FENCE_RE = re.compile(r'```(?:json)?\s*\n?(.*?)\n?```', re.DOTALL | re.IGNORECASE)
-    JSON_BLOCK_RE = re.compile(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', re.DOTALL)
+    JSON_OBJECT_START_RE = re.compile(r'\{\s*"')  # Where an object with keys can start
+    JSON_DECODER = json.JSONDecoder()
+    DECODE_WINDOW = 64 * 1024  # Characters before an object that a failed decode may scan
 
     def __init__(self, strategy: ParsingStrategy = ParsingStrategy.JSON_PRIMARY):
         self.strategy = strategy
@@ -51,6 +62,10 @@ class UnifiedToolCallParser:
         if not text:
             return ParseResult([], "empty_input", ["Empty input text"])
 
+        if "{" not in text and "```" not in text:
+            # Fast path: nothing that could hold a JSON object
+            return ParseResult([], "json", [])
+
         return self._extract_json_tool_calls(text)
 
     def _extract_json_tool_calls(self, text: str) -> ParseResult:
@@ -103,24 +118,59 @@ class UnifiedToolCallParser:
         return calls, errors
 
     def _extract_json_direct(self, text: str) -> tuple[List[Dict[str, Any]], List[str]]:
-        """Extract JSON tool calls directly from text"""
+        """Extract JSON tool calls directly from text
+
+        One pass over the places an object with keys can start ('{' then '"').
+        Inside a JSON string a quote after '{' is always escaped, so these
+        never fall inside string values. Each is decoded in place; a tool
+        call is taken whole and scanning resumes after it, anything else
+        (prose, a wrapper object, a truncated call) is skipped by one
+        character so the objects nested inside it are still tried.
+        """
         calls = []
         errors = []
 
-        # Find JSON-like structures
-        matches = list(self.JSON_BLOCK_RE.finditer(text))
-
-        for match in matches:
-            json_content = match.group().strip()
-            parsed_call = self._parse_json_safely(json_content)
+        # Decode against a suffix of the text that starts at most DECODE_WINDOW
+        # before the object: a failed decode counts the lines before the error
+        # position, which from the start of a long output would be quadratic
+        window_start = 0
+        window = text
+        position = 0
+        while True:
+            match = self.JSON_OBJECT_START_RE.search(text, position)
+            if match is None:
+                break
+            start = match.start()
+            if start - window_start > self.DECODE_WINDOW:
+                window_start = start
+                window = text[start:]
+
+            parsed_call, end = self._decode_json_object(window, start - window_start)
             if parsed_call and "tool_name" in parsed_call:
                 calls.append(parsed_call)
-            elif json_content.strip().startswith('{') and json_content.strip().endswith('}'):
+                position = window_start + end
+            else:
                 # Looks like JSON but failed to parse or missing tool_name
                 errors.append(f"Failed to parse JSON block: invalid syntax or missing tool_name")
+                position = start + 1
 
         return calls, errors
 
+    def _decode_json_object(self, text: str, start: int) -> tuple[Optional[Dict[str, Any]], int]:
+        """Decode the object opening at text[start] in place
+
+        Returns:
+            (the object, or None if it is not valid JSON; position just past it)
+        """
+        try:
+            return self.JSON_DECODER.raw_decode(text, start)
+        except json.JSONDecodeError as e:
+            self.logger.debug(f"JSON parse failed: {e}")
+        except Exception as e:
+            self.logger.debug(f"JSON processing failed: {e}")
+
+        return None, start + 1
+
     def _parse_json_safely(self, json_text: str) -> Optional[Dict[str, Any]]:
         """Safely parse JSON with error handling"""
         try:
@@ -156,6 +206,277 @@ class UnifiedToolCallParser:
         return True
 
 
+class StreamingToolCallParser:
+    """Incremental UnifiedToolCallParser for streamed model output
+
+    feed(chunk) returns the tool calls completed by that chunk: a fenced
+    call as soon as its closing fence arrives, an unfenced one as soon as
+    its object closes. close() ends the stream and returns exactly the
+    ParseResult that UnifiedToolCallParser.parse would return for the whole
+    output.
+
+    Batch parsing ignores unfenced calls once any fence holds a JSON
+    object, which a stream cannot know in advance. Unfenced calls are
+    therefore returned as they close, and a fenced call equal to one
+    already returned is not returned again. Unfenced calls the final result
+    does not include end up in `superseded`. With the usual fenced output
+    every call comes back once, when its object closes. Unfenced calls that
+    can only be settled at the end of output (after an object left open)
+    are not returned by feed(); close() lists them in `late_calls`.
+
+    With hold_unfenced=True, feed() returns fenced calls only; unfenced
+    calls are held until close(), which lists them in `late_calls` when no
+    fence holds an object. Nothing is then ever superseded, which suits
+    callers that act on calls as they arrive.
+
+    The whole output is never held. Kept state is the unclosed fence (if
+    any), the unresolved object (if any), and a few characters of lookahead.
+    """
+
+    STRUCTURE_RE = re.compile(r'[{}"]')  # What matters inside an object
+    STRING_END_RE = re.compile(r'["\\]')  # End of a string, or an escape inside it
+    PROBE_MARGIN = 64  # A decode error this far before the end cannot be due to the object being unfinished
+    FIRST_PROBE = 512  # Unclosed object size at which it is first checked for a definite syntax error
+
+    def __init__(self, parser: Optional[UnifiedToolCallParser] = None, hold_unfenced: bool = False):
+        self.parser = parser or UnifiedToolCallParser()
+        self.hold_unfenced = hold_unfenced
+        self.received = 0  # Characters fed so far
+        self.superseded: List[Dict[str, Any]] = []  # Calls feed() returned that the final result excludes
+        self.late_calls: List[Dict[str, Any]] = []  # Calls in the final result feed() never returned
+
+        # Fence blocks: text after the last complete fence, or the open fence's content
+        self._fence_buffer = ""
+        self._fence_open = False
+        self._fence_scanned = 0  # Open fence content already searched for the closing fence
+        self._fence_calls: List[Dict[str, Any]] = []  # Fence contents that parsed to an object
+        self._fence_errors: List[str] = []
+
+        # Unfenced objects: the buffer starts at the next candidate or search position
+        self._direct_buffer = ""
+        self._direct_enabled = True  # Until a fence holds an object
+        self._candidate = False  # Whether the buffer starts with an unresolved object
+        self._scan_position = 0
+        self._depth = 0
+        self._in_string = False
+        self._next_probe = self.FIRST_PROBE
+        self._direct_calls: List[Dict[str, Any]] = []
+        self._direct_errors: List[str] = []
+
+        self._unclaimed: List[Dict[str, Any]] = []  # Unfenced calls returned but not matched by a fence
+        self._closed = False
+
+    @property
+    def pending_chars(self) -> int:
+        """Characters of output currently held"""
+        return len(self._fence_buffer) + len(self._direct_buffer)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Add the next piece of output; returns the tool calls it completed"""
+        if self._closed:
+            raise ValueError("feed() called after close()")
+        if not chunk:
+            return []
+        self.received += len(chunk)
+
+        completed = []
+        if self._direct_enabled:
+            self._direct_buffer += chunk
+            for call in self._resolve_direct(final=False):
+                if not self.hold_unfenced and self.parser._validate_tool_call(call):
+                    completed.append(call)
+                    self._unclaimed.append(call)
+
+        self._fence_buffer += chunk
+        completed.extend(self._resolve_fences())
+        return completed
+
+    def close(self) -> ParseResult:
+        """End of output: the same ParseResult as parsing the whole output at once"""
+        if not self._closed:
+            self._closed = True
+            if self._direct_enabled:
+                late_calls = self._resolve_direct(final=True)
+                if self.hold_unfenced:
+                    late_calls = self._direct_calls
+                self.late_calls = [call for call in late_calls if self.parser._validate_tool_call(call)]
+            self._fence_buffer = ""  # An unclosed fence holds no call
+            if self._fence_calls:
+                self.superseded = self._unclaimed
+            self._unclaimed = []
+
+        if not self.received:
+            return ParseResult([], "empty_input", ["Empty input text"])
+
+        tool_calls = self._fence_calls or self._direct_calls
+        errors = self._fence_errors + ([] if self._fence_calls else self._direct_errors)
+        valid_calls = []
+        for call in tool_calls:
+            if self.parser._validate_tool_call(call):
+                valid_calls.append(call)
+            else:
+                errors.append(f"Invalid JSON tool call: {call}")
+        return ParseResult(valid_calls, "json", errors)
+
+    def _resolve_fences(self) -> List[Dict[str, Any]]:
+        """Parse every fence closed so far; returns new valid calls not already returned"""
+        completed = []
+        while True:
+            if not self._fence_open:
+                opening = self._fence_buffer.find("```")
+                if opening == -1:
+                    # Keep a possible partial opening fence
+                    self._fence_buffer = self._fence_buffer[-2:]
+                    return completed
+                self._fence_buffer = self._fence_buffer[opening + 3:]
+                self._fence_open = True
+                self._fence_scanned = 0
+
+            closing = self._fence_buffer.find("```", max(0, self._fence_scanned - 2))
+            if closing == -1:
+                self._fence_scanned = len(self._fence_buffer)
+                return completed
+            content = self._fence_buffer[:closing]
+            self._fence_buffer = self._fence_buffer[closing + 3:]
+            self._fence_open = False
+
+            # Same content as UnifiedToolCallParser.JSON_FENCE_RE captures, once stripped
+            if content[:4].lower() == "json":
+                content = content[4:]
+            json_content = content.strip()
+            parsed_call = self.parser._parse_json_safely(json_content)
+            if not parsed_call:
+                if json_content:
+                    self._fence_errors.append(f"Failed to parse JSON fence block: invalid JSON syntax")
+                continue
+
+            self._fence_calls.append(parsed_call)
+            if self._direct_enabled:
+                # Unfenced calls no longer count; stop looking for them
+                self._direct_enabled = False
+                self._direct_buffer = ""
+            if not self.parser._validate_tool_call(parsed_call):
+                continue
+            if parsed_call in self._unclaimed:
+                self._unclaimed.remove(parsed_call)  # Already returned as an unfenced call
+            else:
+                completed.append(parsed_call)
+
+    def _resolve_direct(self, final: bool) -> List[Dict[str, Any]]:
+        """Settle unfenced candidates as far as the buffer allows; returns new tool calls
+
+        Mirrors UnifiedToolCallParser._extract_json_direct: a candidate is
+        decoded once its braces balance (or once a decode fails well before
+        the end of the buffer); at the end of output the rest is handed to
+        the batch extraction itself.
+        """
+        if final:
+            calls, errors = self.parser._extract_json_direct(self._direct_buffer)
+            self._direct_buffer = ""
+            self._direct_calls.extend(calls)
+            self._direct_errors.extend(errors)
+            return calls
+
+        calls = []
+        while True:
+            if not self._candidate and not self._find_candidate():
+                return calls
+
+            parsed_call, end = self._settle_candidate()
+            if end is None:
+                return calls  # Needs more output
+
+            if parsed_call and "tool_name" in parsed_call:
+                calls.append(parsed_call)
+                self._direct_calls.append(parsed_call)
+                self._direct_buffer = self._direct_buffer[end:]
+            else:
+                self._direct_errors.append(f"Failed to parse JSON block: invalid syntax or missing tool_name")
+                self._direct_buffer = self._direct_buffer[1:]
+            self._candidate = False
+
+    def _find_candidate(self) -> bool:
+        """Move the buffer to the next candidate object; False (keeping any partial start) if none yet"""
+        match = self.parser.JSON_OBJECT_START_RE.search(self._direct_buffer)
+        if match is None:
+            # A '{' followed only by whitespace may still become a candidate
+            brace = self._direct_buffer.rfind("{")
+            if brace != -1 and not self._direct_buffer[brace + 1:].strip():
+                self._direct_buffer = self._direct_buffer[brace:]
+            else:
+                self._direct_buffer = ""
+            return False
+
+        self._direct_buffer = self._direct_buffer[match.start():]
+        self._candidate = True
+        self._scan_position = 1
+        self._depth = 1
+        self._in_string = False
+        self._next_probe = self.FIRST_PROBE
+        return True
+
+    def _settle_candidate(self) -> tuple:
+        """Decode the candidate at the start of the buffer if its outcome is known
+
+        Returns:
+            (object or None, end) once settled, or (None, None) while it needs more output
+        """
+        buffer = self._direct_buffer
+        length = len(buffer)
+        position = self._scan_position
+        closed = False
+
+        while position < length:
+            if self._in_string:
+                match = self.STRING_END_RE.search(buffer, position)
+                if match is None:
+                    position = length
+                elif match.group() == '"':
+                    self._in_string = False
+                    position = match.end()
+                elif match.end() < length:
+                    position = match.end() + 1  # Skip the escaped character
+                else:
+                    position = match.start()  # Escape split across chunks
+                    break
+                continue
+
+            match = self.STRUCTURE_RE.search(buffer, position)
+            if match is None:
+                position = length
+                break
+            position = match.end()
+            char = match.group()
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if not self._depth:
+                    closed = True
+                    break
+        self._scan_position = position
+
+        if closed:
+            parsed_call, end = self.parser._decode_json_object(buffer, 0)
+            return parsed_call, end if parsed_call is not None else 1
+
+        if length >= self._next_probe:
+            # Give up early on an object whose syntax is already broken, so it is not held to the end
+            self._next_probe = 2 * length
+            try:
+                parsed_call, end = self.parser.JSON_DECODER.raw_decode(buffer, 0)
+                return parsed_call, end
+            except json.JSONDecodeError as e:
+                if not e.msg.startswith("Unterminated string") and e.pos < length - self.PROBE_MARGIN:
+                    return None, 1
+            except Exception:
+                return None, 1
+
+        return None, None
+
+
 def create_parser() -> UnifiedToolCallParser:
     """Factory function to create JSON-only parser"""
     return UnifiedToolCallParser(ParsingStrategy.JSON_PRIMARY)
@@ -0,0 +1,216 @@
+"""Precompiled Tool Argument Validators
+
+Each tool's inputSchema is compiled once into a validator: a function that
+takes the call's arguments and returns an error message, or None when they
+are valid. Compiling resolves the schema up front (types to isinstance
+checks, enums to sets, nested properties and array items to their own
+validators), so validating a call does no schema lookups.
+
+Covers the JSON Schema subset tool schemas use: type (one or a list), enum,
+properties, required, additionalProperties: false and items. Other keywords
+(description, default, ...) are ignored.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+Validator = Callable[[Any], Optional[str]]
+
+# Keywords of a property checked by its type alone
+TYPE_ONLY_KEYWORDS = frozenset({"type", "description", "default", "title", "examples"})
+
+# JSON Schema type -> Python types accepted for it
+JSON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list, tuple),
+    "object": (dict,),
+    "null": (type(None),),
+}
+
+
+def _json_type_name(value: Any) -> str:
+    """JSON Schema name of a value's type, for error messages"""
+    if isinstance(value, bool):
+        return "boolean"
+    for name, python_types in JSON_TYPES.items():
+        if isinstance(value, python_types):
+            return name
+    return type(value).__name__
+
+
+def _enum_key(value: Any) -> tuple:
+    """Key under which enum values compare equal: keeps True apart from 1, as JSON Schema does"""
+    return (isinstance(value, bool), value)
+
+
+def _type_spec(types: List[str]) -> Optional[tuple]:
+    """(python types, whether a bool would wrongly pass as int, expected names) for the schema's type(s)"""
+    known = [name for name in types if name in JSON_TYPES]
+    if not known:
+        return None
+    python_types = tuple(python_type for name in known for python_type in JSON_TYPES[name])
+    excludes_bool = int in python_types and "boolean" not in known
+    return python_types, excludes_bool, " or ".join(known)
+
+
+def _schema_types(schema: Dict[str, Any]) -> List[str]:
+    types = schema.get("type")
+    return types if isinstance(types, list) else [types]
+
+
+def _compile_type(types: List[str], path: str) -> Optional[Validator]:
+    """isinstance check for the schema's type(s); booleans only match "boolean" """
+    spec = _type_spec(types)
+    if spec is None:
+        return None
+    python_types, excludes_bool, expected = spec
+
+    def check(value: Any) -> Optional[str]:
+        if isinstance(value, python_types) and not (excludes_bool and isinstance(value, bool)):
+            return None
+        return f"Parameter '{path}' must be {expected}, got {_json_type_name(value)}"
+
+    return check
+
+
+def _compile_enum(enum: List[Any], path: str) -> Validator:
+    """Membership check against the schema's enum, as a set lookup"""
+    try:
+        allowed = frozenset(_enum_key(option) for option in enum)
+    except TypeError:
+        # Unhashable options (arrays, objects): compare one by one
+        allowed = [_enum_key(option) for option in enum]
+
+    def check(value: Any) -> Optional[str]:
+        try:
+            if _enum_key(value) in allowed:
+                return None
+        except TypeError:
+            pass  # Unhashable value: not among hashable options
+        return f"Parameter '{path}' must be one of {enum}, got {value!r}"
+
+    return check
+
+
+def _compile_properties(schema: Dict[str, Any], path: str) -> Optional[Validator]:
+    """Object type, required keys, disallowed extra keys and each present property
+
+    Properties constrained by type alone (most tool parameters) are checked
+    inline; others go through their own compiled validator. Only the keys
+    present in the value are visited, not every property in the schema.
+    """
+    prefix = f"{path}." if path else ""
+    object_only = _schema_types(schema) == ["object"]
+    required = tuple(schema.get("required", []))
+    closed = schema.get("additionalProperties") is False
+    known = frozenset(schema.get("properties", {}))
+
+    simple: Dict[str, tuple] = {}  # key -> _type_spec of a type-only property
+    nested: Dict[str, Validator] = {}
+    for key, property_schema in schema.get("properties", {}).items():
+        if isinstance(property_schema, dict) and not set(property_schema) - TYPE_ONLY_KEYWORDS:
+            spec = _type_spec(_schema_types(property_schema))
+            if spec is not None:
+                simple[key] = spec
+            continue
+        validator = compile_schema_validator(property_schema, f"{prefix}{key}")
+        if validator is not None:
+            nested[key] = validator
+
+    if not (object_only or required or simple or nested or closed):
+        return None
+
+    def check(value: Any) -> Optional[str]:
+        if not isinstance(value, dict):
+            if object_only:
+                return f"Parameter '{path}' must be object, got {_json_type_name(value)}"
+            return None  # Reported by the type check, if the schema has one
+        for key in required:
+            if key not in value:
+                return f"Required parameter '{prefix}{key}' missing"
+        for key, item in value.items():
+            spec = simple.get(key)
+            if spec is not None:
+                if isinstance(item, spec[0]) and not (spec[1] and isinstance(item, bool)):
+                    continue
+                return f"Parameter '{prefix}{key}' must be {spec[2]}, got {_json_type_name(item)}"
+            validator = nested.get(key)
+            if validator is not None:
+                error = validator(item)
+                if error:
+                    return error
+            elif closed and key not in known:
+                return f"Unexpected parameter '{prefix}{key}'"
+        return None
+
+    return check
+
+
+def _compile_items(item_schema: Dict[str, Any], path: str) -> Optional[Validator]:
+    """Validator applied to every element of an array"""
+    item_validator = compile_schema_validator(item_schema, f"{path}[]")
+    if item_validator is None:
+        return None
+
+    def check(value: Any) -> Optional[str]:
+        if not isinstance(value, (list, tuple)):
+            return None  # Reported by the type check, if the schema has one
+        for index, item in enumerate(value):
+            error = item_validator(item)
+            if error:
+                return f"{error} (item {index})"
+        return None
+
+    return check
+
+
+def compile_schema_validator(schema: Dict[str, Any], path: str = "") -> Optional[Validator]:
+    """Compile a JSON schema into a validator, or None if the schema constrains nothing
+
+    Args:
+        schema: The (sub)schema to compile
+        path: Dotted location of the value within the arguments, used in error messages
+    """
+    if not isinstance(schema, dict):
+        return None
+
+    checks = []
+    has_properties = "properties" in schema or "required" in schema or schema.get("additionalProperties") is False
+    if "type" in schema and not (has_properties and _schema_types(schema) == ["object"]):
+        checks.append(_compile_type(_schema_types(schema), path))  # Otherwise checked with the properties
+    if "enum" in schema:
+        checks.append(_compile_enum(schema["enum"], path))
+    if has_properties:
+        checks.append(_compile_properties(schema, path))
+    if isinstance(schema.get("items"), dict):
+        checks.append(_compile_items(schema["items"], path))
+    checks = tuple(check for check in checks if check is not None)
+
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(value: Any) -> Optional[str]:
+        for compiled_check in checks:
+            error = compiled_check(value)
+            if error:
+                return error
+        return None
+
+    return check
+
+
+def _accept(value: Any) -> Optional[str]:
+    return None
+
+
+def compile_tool_validators(tools: Iterable[Dict[str, Any]]) -> Dict[str, Validator]:
+    """Validators for the arguments of each tool, keyed by tool name"""
+    return {
+        tool["name"]: compile_schema_validator(tool.get("inputSchema", {})) or _accept
+        for tool in tools
+        if tool.get("name")
+    }
@@ -31,8 +31,7 @@ class ToolCallExecutor(TaskExecutor):
     async def execute(self, task: Task) -> None:
         """Execute a tool call task and update its status"""
         if not isinstance(task, ToolCallTask):
-            task.status = TaskStatus.FAILED
-            task.error = f"Invalid task type: {type(task).__name__}"
+            task.finish(TaskStatus.FAILED, error=f"Invalid task type: {type(task).__name__}")
             return
 
         start_time = time.time()
@@ -44,7 +43,7 @@ class ToolCallExecutor(TaskExecutor):
             if cache_key in self.result_cache:
                 logger.debug(f"Using cached result for {task.tool_name}")
                 task.result = self.result_cache[cache_key]
-                task.status = TaskStatus.COMPLETED
+                task.finish(TaskStatus.COMPLETED)
                 return
 
             # Execute tool call
@@ -53,7 +52,7 @@ class ToolCallExecutor(TaskExecutor):
 
             # Store result and update status
             task.result = result
-            task.status = TaskStatus.COMPLETED
+            task.finish(TaskStatus.COMPLETED)
 
             # Cache successful results
             if result.get("success"):
@@ -63,8 +62,7 @@ class ToolCallExecutor(TaskExecutor):
             logger.info(f"Tool call {task.tool_name} completed successfully")
 
         except Exception as e:
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
+            task.finish(TaskStatus.FAILED, error=str(e))
             self.performance_metrics["failed_executions"] += 1
             logger.error(f"Tool call {task.tool_name} failed: {e}")
 
@@ -8,6 +8,7 @@ import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 
+from src.core.exceptions import TaskQueueFull
 from src.core.tasks.queue import TaskQueue, ToolCallTask
 from .executor import ToolCallExecutor
 
@@ -74,7 +75,17 @@ class MCPRouter:
         )
 
         # Queue the task
-        task_id = self.task_queue.queue_task(task, parent_task_id)
+        try:
+            task_id = await self.task_queue.submit(task, parent_task_id)
+        except TaskQueueFull as e:
+            logger.warning(f"Tool call {tool_name} rejected: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "error_type": e.error_type,
+                "retry_after": e.context.get("retry_after"),
+                "tool_name": tool_name
+            }
         logger.info(f"Queued tool call {tool_name} with task_id {task_id}")
 
         # Wait for completion with timeout
@@ -140,10 +151,10 @@ class MCPRouter:
 
             status = task_status["status"]
             if status == "completed":
-                result = self.task_queue.get_task_result(task_id)
+                result = await self.task_queue.get_task_result_async(task_id)
                 return result or {"success": True, "content": "Task completed"}
 
-            elif status == "failed":
+            elif status in ("failed", "timed_out", "cancelled"):
                 error = task_status.get("error", "Unknown error")
                 return {
                     "success": False,
@@ -4,12 +4,20 @@ Exports the main task queue components for use throughout the application.
 Maintains backward compatibility with existing agent task queue.
 """
 
-from .queue import TaskQueue, TaskExecutor
+from .queue import AdmissionPolicy, TaskQueue, TaskExecutor
+from .metrics import LatencyHistogram, QueueStats
+from .results import ResultStore
+from .scheduler import FairScheduler
 from .task import Task, TaskStatus, AgentTask, ToolCallTask
 
 __all__ = [
     "TaskQueue",
     "TaskExecutor",
+    "AdmissionPolicy",
+    "FairScheduler",
+    "ResultStore",
+    "QueueStats",
+    "LatencyHistogram",
     "Task",
     "TaskStatus",
     "AgentTask",
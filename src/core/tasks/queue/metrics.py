@@ -0,0 +1,151 @@
+"""Task Queue Statistics
+
+Bounded per-task-type statistics for sizing concurrency limits: queue depth
+over time, enqueue-to-start wait, start-to-finish run time and outcome
+counts. Histograms use fixed buckets, and the depth history is a ring
+buffer, so memory stays constant no matter how many tasks pass through.
+"""
+
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds; anything slower lands in the overflow bucket
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+DEPTH_SAMPLE_INTERVAL = 1.0  # seconds between depth history samples
+DEPTH_HISTORY_SIZE = 300  # samples kept per task type (5 minutes at the default interval)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram with count, sum, min, max and estimated percentiles"""
+
+    __slots__ = ("bounds", "buckets", "count", "total", "min", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float):
+        """Record one sample"""
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Estimate a percentile as the upper bound of the bucket containing it"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.buckets):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                bound = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summary plus raw bucket counts keyed by upper bound"""
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 6) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": {
+                **{f"le_{bound}": count for bound, count in zip(self.bounds, self.buckets)},
+                "le_inf": self.buckets[-1],
+            },
+        }
+
+
+class _TypeStats:
+    """Statistics for a single task type"""
+
+    __slots__ = ("depth", "max_depth", "depth_history", "last_sample", "wait", "run", "outcomes")
+
+    def __init__(self):
+        self.depth = 0
+        self.max_depth = 0
+        self.depth_history: Deque[Tuple[float, int]] = deque(maxlen=DEPTH_HISTORY_SIZE)
+        self.last_sample = 0.0
+        self.wait = LatencyHistogram()
+        self.run = LatencyHistogram()
+        self.outcomes: Dict[str, int] = {}
+
+
+class QueueStats:
+    """Per-task-type queue statistics recorded by TaskQueue"""
+
+    def __init__(self, sample_interval: float = DEPTH_SAMPLE_INTERVAL):
+        self.sample_interval = sample_interval
+        self._types: Dict[str, _TypeStats] = {}
+
+    def _get(self, task_type: str) -> _TypeStats:
+        stats = self._types.get(task_type)
+        if stats is None:
+            stats = self._types[task_type] = _TypeStats()
+        return stats
+
+    def _change_depth(self, stats: _TypeStats, delta: int):
+        stats.depth = max(0, stats.depth + delta)
+        stats.max_depth = max(stats.max_depth, stats.depth)
+
+        # Sample at most once per interval, but always capture a new peak
+        now = time.time()
+        if now - stats.last_sample >= self.sample_interval or stats.depth == stats.max_depth:
+            stats.depth_history.append((now, stats.depth))
+            stats.last_sample = now
+
+    def task_queued(self, task_type: str):
+        """A task entered the waiting queue"""
+        self._change_depth(self._get(task_type), 1)
+
+    def task_dequeued(self, task_type: str):
+        """A task left the waiting queue (dispatched or cancelled before starting)"""
+        self._change_depth(self._get(task_type), -1)
+
+    def task_started(self, task_type: str, wait_seconds: float):
+        """A task began executing after waiting in the queue"""
+        self._get(task_type).wait.observe(wait_seconds)
+
+    def task_finished(self, task_type: str, status: str, run_seconds: Optional[float]):
+        """A task reached a terminal status; run time is None if it never started"""
+        stats = self._get(task_type)
+        stats.outcomes[status] = stats.outcomes.get(status, 0) + 1
+        if run_seconds is not None:
+            stats.run.observe(run_seconds)
+
+    def task_rejected(self, task_type: str):
+        """A task was refused admission"""
+        self.task_finished(task_type, "rejected", None)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Statistics for every task type seen so far"""
+        result = {}
+        for task_type, stats in self._types.items():
+            history: List[Dict[str, Any]] = [
+                {"timestamp": round(ts, 3), "depth": depth} for ts, depth in stats.depth_history
+            ]
+            result[task_type] = {
+                "depth": stats.depth,
+                "max_depth": stats.max_depth,
+                "depth_history": history,
+                "wait_seconds": stats.wait.snapshot(),
+                "run_seconds": stats.run.snapshot(),
+                "outcomes": dict(stats.outcomes),
+            }
+        return result
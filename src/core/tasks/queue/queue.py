@@ -6,18 +6,52 @@ with priority-based execution and nesting depth control.
 
 import asyncio
 import logging
+import math
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from datetime import datetime, timezone
+from enum import Enum
 from typing import Dict, List, Optional, Any
 
+from src.core.tasks.queue.metrics import QueueStats
+from src.core.tasks.queue.results import ResultStore
+from src.core.tasks.queue.scheduler import FairScheduler
 from src.core.tasks.queue.task import Task, TaskStatus, AgentTask, ToolCallTask
-from src.core.exceptions import MaxDepthExceeded
+from src.core.exceptions import MaxDepthExceeded, TaskQueueFull
 
 logger = logging.getLogger(__name__)
 
+# Weight of the newest sample in the per-type run time average used for retry hints
+_RUN_TIME_SMOOTHING = 0.2
+
+# Seconds before its deadline at which a TimeoutError still counts as the task timing out
+# (the loop may fire the wait_for timer up to its clock resolution early)
+_DEADLINE_SLACK = 0.01
+
+
+def _task_agent(task: Task) -> Optional[str]:
+    """Agent a task belongs to, which scopes its idempotency key (None for tasks without one)"""
+    return getattr(task, "agent_id", None)
+
+
+class AdmissionPolicy(Enum):
+    """What submit() does when a task type is at capacity"""
+    REJECT = "reject"  # Raise TaskQueueFull immediately
+    WAIT = "wait"  # Wait up to admission_timeout for a slot, then raise TaskQueueFull
+
 
 class TaskExecutor(ABC):
-    """Base class for task executors"""
+    """Base class for task executors
+
+    The queue counts a task as running from when it hands it to execute().
+    An executor that first waits for a turn of its own (an agent's lock, a
+    parallel slot) sets `starts_tasks`: the task then stays queued until the
+    executor calls task_started(task), so that wait is not counted as run time.
+    """
+
+    starts_tasks = False
+    task_started = staticmethod(Task.start)  # TaskQueue.mark_started once registered with a queue
 
     @abstractmethod
     async def execute(self, task: Task):
@@ -49,36 +83,79 @@ class ToolCallExecutor(TaskExecutor):
             )
 
             task.result = result
-            task.status = TaskStatus.COMPLETED
-            task.completed_at = datetime.now(timezone.utc).isoformat()
+            task.finish(TaskStatus.COMPLETED)
 
             logger.info(f"Tool call {task.task_id} completed successfully")
 
         except Exception as e:
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
-            task.completed_at = datetime.now(timezone.utc).isoformat()
+            task.finish(TaskStatus.FAILED, error=str(e))
             logger.error(f"Tool call {task.task_id} failed: {e}")
 
         logger.debug(f"EXIT ToolCallExecutor.execute: status={task.status.value}")
 
 
 class TaskQueue:
-    """Generic async task queue with priority support"""
-
-    def __init__(self, max_tasks: int = 100, max_nesting_depth: int = 3, tool_executor = None):
+    """Generic async task queue with priority support
+
+    Waiting tasks are dispatched fairly across agents (deficit round-robin, see
+    FairScheduler); priority and deadlines order tasks within each agent.
+
+    Admission is bounded per task type: `capacity` caps the number of queued plus
+    running tasks of each listed type. queue_task() always rejects over capacity;
+    submit() applies the type's AdmissionPolicy. Rejections raise TaskQueueFull
+    carrying a retry_after hint derived from recent run times of that type.
+
+    With a `result_store`, completed results above its size threshold are kept
+    on disk and only loaded again by get_task_result()/get_task_result_async().
+    """
+
+    def __init__(
+        self,
+        max_tasks: int = 100,
+        max_nesting_depth: int = 3,
+        tool_executor=None,
+        idempotency_ttl: float = 300.0,
+        agent_weights: Optional[Dict[str, float]] = None,
+        capacity: Optional[Dict[str, int]] = None,
+        admission_policies: Optional[Dict[str, AdmissionPolicy]] = None,
+        admission_timeout: float = 30.0,
+        result_store: Optional[ResultStore] = None,
+    ):
         self.tasks: Dict[str, Task] = {}
-        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.queue = FairScheduler(agent_weights)
         self.max_tasks = max_tasks
         self.max_nesting_depth = max_nesting_depth
         self.task_depth_tracking: Dict[str, int] = {}
         self._worker_task: Optional[asyncio.Task] = None
         self._executors: Dict[str, TaskExecutor] = {}
         self.tool_executor = tool_executor  # Store tool executor instance
+        self._running: Dict[str, asyncio.Task] = {}  # task_id -> asyncio.Task of dispatched tasks
+        self._started: Dict[str, Task] = {}  # task_id -> dispatched task marked started, until it is done
+        self.metrics: Dict[str, int] = {"timeouts": 0, "cancelled": 0, "deduplicated": 0, "rejected": 0}
+        # (agent_id, idempotency_key) -> (task_id, expires_at); insertion order == expiry order with a fixed TTL.
+        # Keys are scoped to the task's agent, so two agents' clients cannot collide on a key
+        self.idempotency_ttl = idempotency_ttl
+        self._idempotency_keys: "OrderedDict[tuple[Optional[str], str], tuple[str, float]]" = OrderedDict()
+        # Admission control: task_type -> max outstanding (queued + running) tasks
+        self.capacity: Dict[str, int] = dict(capacity or {})
+        self.admission_policies: Dict[str, AdmissionPolicy] = dict(admission_policies or {})
+        self.admission_timeout = admission_timeout
+        self._outstanding: Dict[str, int] = {}
+        self._capacity_freed: Dict[str, asyncio.Event] = {}
+        self._avg_run_seconds: Dict[str, float] = {}
+        self.result_store = result_store
+        self.stats = QueueStats()  # Per-type depth, wait/run histograms and outcomes
+
+    def set_agent_weight(self, agent_id: str, weight: float):
+        """Set an agent's relative dispatch share (default 1.0)"""
+        self.queue.set_weight(agent_id, weight)
+        logger.info(f"Scheduling weight for {agent_id} set to {weight}")
 
     def register_executor(self, task_type: str, executor: TaskExecutor):
         """Register an executor for a specific task type"""
         self._executors[task_type] = executor
+        if executor.starts_tasks:
+            executor.task_started = self.mark_started
         logger.debug(f"Registered executor for task type: {task_type}")
 
     async def start_worker(self):
@@ -102,20 +179,21 @@ class TaskQueue:
         """Background worker to process queued tasks concurrently"""
         while True:
             try:
-                # Priority queue returns (priority, task_id)
-                # We use negative priority for max-heap behavior
-                await asyncio.sleep(0.1)  # Small delay to prevent busy waiting
-                _, task_id = await self.queue.get()
+                # Fair scheduler picks the next agent's highest priority task
+                # (get() waits on an event when empty, so there is no busy loop)
+                task_id = await self.queue.get()
 
                 # Get task from storage by ID
                 task = self.tasks.get(task_id)
-                if task:
+                if task and task.status == TaskStatus.QUEUED:
+                    self.stats.task_dequeued(task.task_type)
                     # Execute task concurrently - don't wait for completion
-                    asyncio.create_task(self._execute_task(task))
+                    self._running[task_id] = asyncio.create_task(self._execute_task(task))
+                elif task:
+                    # Cancelled while waiting in the heap - entry is dropped lazily here
+                    logger.debug(f"Skipping task {task_id} with status {task.status.value}")
                 else:
                     logger.error(f"Task {task_id} not found in task storage")
-
-                self.queue.task_done()
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -127,8 +205,13 @@ class TaskQueue:
             # Validate task object
             if not task:
                 raise ValueError("Task object is None")
-                
-            task.status = TaskStatus.RUNNING
+
+            remaining = task.time_remaining()
+            if remaining is not None and remaining <= 0:
+                raise asyncio.TimeoutError()
+
+            if not getattr(self._executors.get(task.task_type), "starts_tasks", False):
+                self.mark_started(task)
             logger.info(f"Executing task {task.task_id} of type {task.task_type}")
 
             # Special handling for ToolCallTask
@@ -137,7 +220,7 @@ class TaskQueue:
                     raise ValueError("Tool executor not configured")
                     
                 executor = ToolCallExecutor(self.tool_executor)
-                await executor.execute(task)
+                await asyncio.wait_for(executor.execute(task), timeout=remaining)
                 return
 
             # For non-tool tasks, use registered executor
@@ -145,10 +228,10 @@ class TaskQueue:
             if not executor:
                 raise ValueError(f"No executor registered for task type: {task.task_type}")
 
-            await executor.execute(task)
+            await asyncio.wait_for(executor.execute(task), timeout=remaining)
 
             if task.status == TaskStatus.RUNNING:
-                task.status = TaskStatus.COMPLETED
+                task.finish(TaskStatus.COMPLETED)
 
             # Log successful completion with more details
             logger.info(f"✅ TASK COMPLETED: {task.task_id} ({task.task_type})")
@@ -165,37 +248,100 @@ class TaskQueue:
                     f.write(f"Tool: {task.tool_name}\n")
                 f.write("=" * 50 + "\n")
 
+        except asyncio.TimeoutError as e:
+            remaining = task.time_remaining()
+            if remaining is None or remaining > _DEADLINE_SLACK:
+                # Raised by the executor or a tool itself, not by our deadline
+                self._record_failure(task, e)
+            else:
+                task.finish(TaskStatus.TIMED_OUT, error=f"Task exceeded its timeout of {task.timeout}s")
+                self.metrics["timeouts"] += 1
+                logger.error(f"⏰ TASK TIMED OUT: {task.task_id} after {task.timeout}s")
+
+        except asyncio.CancelledError:
+            task.finish(TaskStatus.CANCELLED, error="Task cancelled while running")
+            self.metrics["cancelled"] += 1
+            logger.info(f"🚫 TASK CANCELLED: {task.task_id}")
+
         except Exception as e:
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
-            # Log to both main logger and a task-specific log file
-            logger.error(f"❌ TASK FAILED: {task.task_id} - {e}")
+            self._record_failure(task, e)
+
+        finally:
+            if task:
+                self._started.pop(task.task_id, None)
+                self._running.pop(task.task_id, None)
+                self._release_capacity(task)
+                self._record_outcome(task)
+                await self._spill_result(task)
+
+    def _record_failure(self, task: Task, error: BaseException):
+        """Mark a task FAILED and log it, to the main log and the failed task log"""
+        if task:
+            task.finish(TaskStatus.FAILED, error=str(error) or type(error).__name__)
+        # Log to both main logger and a task-specific log file
+        logger.error(f"❌ TASK FAILED: {task.task_id} - {error}")
+
+        # Create task-specific log entry for debugging
+        import os
+        task_logs_dir = os.environ.get("WORKSPACE_ROOT", "/workspace") + "/.mcp-logs/tasks"
+        os.makedirs(task_logs_dir, exist_ok=True)
+
+        with open(f"{task_logs_dir}/failed_tasks.log", "a") as f:
+            f.write(f"[{datetime.now(timezone.utc).isoformat()}] TASK FAILED: {task.task_id}\n")
+            f.write(f"Type: {task.task_type}\n")
+            f.write(f"Error: {error}\n")
+            f.write("=" * 50 + "\n")
+
+    @property
+    def running_count(self) -> int:
+        """Tasks marked started that have not reached a terminal status"""
+        return sum(1 for task in self._started.values() if not task.is_terminal)
+
+    def mark_started(self, task: Task, started_ns: Optional[int] = None):
+        """Mark a dispatched task as running: its wait ends and its run time starts here
+
+        started_ns backdates the start, for a task whose work began as part of another's.
+        """
+        if task.started_ns is not None or task.is_terminal:
+            return
+        task.start(started_ns)
+        self._started[task.task_id] = task
+        self.stats.task_started(task.task_type, (task.started_ns - task.created_ns) / 1_000_000_000)
 
-            # Create task-specific log entry for debugging
-            import os
-            task_logs_dir = os.environ.get("WORKSPACE_ROOT", "/workspace") + "/.mcp-logs/tasks"
-            os.makedirs(task_logs_dir, exist_ok=True)
+    def queue_task(self, task: Task, parent_task_id: Optional[str] = None) -> str:
+        """Queue a task for async execution with nesting control
 
-            with open(f"{task_logs_dir}/failed_tasks.log", "a") as f:
-                f.write(f"[{datetime.now(timezone.utc).isoformat()}] TASK FAILED: {task.task_id}\n")
-                f.write(f"Type: {task.task_type}\n")
-                f.write(f"Error: {e}\n")
-                f.write("=" * 50 + "\n")
+        If the task carries an idempotency key that was seen for the same agent
+        within the TTL window, the original task's ID is returned and the new
+        task is discarded.
 
-    def queue_task(self, task: Task, parent_task_id: Optional[str] = None) -> str:
-        """Queue a task for async execution with nesting control"""
+        Raises:
+            TaskQueueFull: If the task's type is at capacity (see submit() to wait instead)
+        """
         # Validate task_id is a string
         if not isinstance(task.task_id, str):
             raise TypeError(f"Task ID must be a string, got {type(task.task_id)}")
-            
+
+        if task.idempotency_key:
+            existing_task_id = self.resolve_idempotency_key(task.idempotency_key, _task_agent(task))
+            if existing_task_id:
+                self.metrics["deduplicated"] += 1
+                logger.info(
+                    f"Deduplicated task with idempotency key {task.idempotency_key!r} -> {existing_task_id}"
+                )
+                return existing_task_id
+
         # Check nesting depth
+        depth = 0
         if parent_task_id:
             parent_depth = self.task_depth_tracking.get(parent_task_id, 0)
             if parent_depth >= self.max_nesting_depth:
                 raise MaxDepthExceeded(parent_depth + 1, self.max_nesting_depth)
-            self.task_depth_tracking[task.task_id] = parent_depth + 1
-        else:
-            self.task_depth_tracking[task.task_id] = 0
+            depth = parent_depth + 1
+
+        # Bounded per-type capacity - raises TaskQueueFull before anything is recorded
+        self._admit(task)
+        self.task_depth_tracking[task.task_id] = depth
 
         # Clean up old tasks if needed
         if len(self.tasks) >= self.max_tasks:
@@ -203,15 +349,175 @@ class TaskQueue:
 
         # Store task by ID first
         self.tasks[task.task_id] = task
+        if task.idempotency_key:
+            # Re-insert at the end so the OrderedDict stays sorted by expiry
+            scoped_key = (_task_agent(task), task.idempotency_key)
+            self._idempotency_keys.pop(scoped_key, None)
+            self._idempotency_keys[scoped_key] = (task.task_id, time.monotonic() + self.idempotency_ttl)
 
-        # Queue task ID with priority (negative for max-heap)
-        # FIX: Queue the task_id string, not the task object
-        priority_value = -task.priority
-        asyncio.create_task(self.queue.put((priority_value, task.task_id)))
+        # Queue into the task's agent flow: priority, then earliest deadline, then FIFO
+        self.queue.put(task)
+        self.stats.task_queued(task.task_type)
 
         logger.info(f"Queued task {task.task_id} of type {task.task_type} with priority {task.priority}")
         return task.task_id
 
+    async def submit(self, task: Task, parent_task_id: Optional[str] = None) -> str:
+        """Queue a task, applying its type's admission policy when at capacity
+
+        Under AdmissionPolicy.WAIT this waits up to admission_timeout for a slot
+        to free before giving up; otherwise it behaves like queue_task().
+
+        Raises:
+            TaskQueueFull: If no capacity is available for the task's type
+        """
+        policy = self.admission_policies.get(task.task_type, AdmissionPolicy.REJECT)
+        resubmission = task.idempotency_key and self.resolve_idempotency_key(task.idempotency_key, _task_agent(task))
+        if policy == AdmissionPolicy.WAIT and not resubmission:
+            await self._wait_for_capacity(task.task_type)
+        return self.queue_task(task, parent_task_id)
+
+    def is_idle(self) -> bool:
+        """Whether no task is waiting or running"""
+        return not self._running and self.queue.empty()
+
+    def has_capacity(self, task_type: str) -> bool:
+        """Whether another task of this type would be admitted right now"""
+        limit = self.capacity.get(task_type)
+        return limit is None or self._outstanding.get(task_type, 0) < limit
+
+    def retry_after(self, task_type: str) -> int:
+        """Suggested seconds before resubmitting a rejected task of this type"""
+        return max(1, math.ceil(self._avg_run_seconds.get(task_type, 1.0)))
+
+    def _admit(self, task: Task):
+        """Reserve a capacity slot for the task, or raise TaskQueueFull"""
+        if not self.has_capacity(task.task_type):
+            self.metrics["rejected"] += 1
+            self.stats.task_rejected(task.task_type)
+            limit = self.capacity[task.task_type]
+            logger.warning(f"🚧 Rejected {task.task_type} task {task.task_id}: {limit} already outstanding")
+            raise TaskQueueFull(limit, task.task_type, self.retry_after(task.task_type))
+        self._outstanding[task.task_type] = self._outstanding.get(task.task_type, 0) + 1
+
+    async def _wait_for_capacity(self, task_type: str):
+        """Wait until a task of this type can be admitted or admission_timeout elapses"""
+        deadline = time.monotonic() + self.admission_timeout
+        event = self._capacity_freed.setdefault(task_type, asyncio.Event())
+        while not self.has_capacity(task_type):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Let _admit() record and raise the rejection
+                return
+            event.clear()
+            try:
+                await asyncio.wait_for(event.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return
+
+    def _release_capacity(self, task: Task):
+        """Free the task's capacity slot and update the run time average for retry hints"""
+        outstanding = self._outstanding.get(task.task_type, 0)
+        if outstanding <= 0:
+            return
+        self._outstanding[task.task_type] = outstanding - 1
+
+        if task.started_ns is not None and task.finished_ns is not None:
+            run_seconds = (task.finished_ns - task.started_ns) / 1_000_000_000
+            average = self._avg_run_seconds.get(task.task_type)
+            self._avg_run_seconds[task.task_type] = (
+                run_seconds if average is None
+                else average + _RUN_TIME_SMOOTHING * (run_seconds - average)
+            )
+
+        event = self._capacity_freed.get(task.task_type)
+        if event:
+            event.set()
+
+    async def _spill_result(self, task: Task):
+        """Move a large completed result to the result store, keeping only its handle
+
+        Serializing and writing the result runs in a worker thread, off the event loop.
+        """
+        if not self.result_store or task.result is None or task.status != TaskStatus.COMPLETED:
+            return
+        try:
+            handle = await asyncio.to_thread(self.result_store.spill, task.result)
+        except OSError as e:
+            logger.warning(f"Could not spill result of task {task.task_id}, keeping it in memory: {e}")
+            return
+        if handle:
+            if self.tasks.get(task.task_id) is not task:
+                self.result_store.release(handle)  # Cleaned up while its result was being written
+                return
+            task.spill_result(handle)
+            logger.debug(f"Result of task {task.task_id} spilled ({handle['size_bytes']} bytes)")
+
+    def _record_outcome(self, task: Task):
+        """Record a finished task's status and run time in the queue statistics"""
+        run_seconds = None
+        if task.started_ns is not None and task.finished_ns is not None:
+            run_seconds = (task.finished_ns - task.started_ns) / 1_000_000_000
+        self.stats.task_finished(task.task_type, task.status.value, run_seconds)
+
+    def resolve_idempotency_key(self, key: str, agent_id: Optional[str] = None) -> Optional[str]:
+        """Get the task ID an agent's task registered under an idempotency key, if still within its TTL"""
+        self._expire_idempotency_keys()
+        entry = self._idempotency_keys.get((agent_id, key))
+        if entry and entry[0] in self.tasks:
+            return entry[0]
+        return None
+
+    def _expire_idempotency_keys(self):
+        """Drop idempotency keys whose TTL has elapsed (oldest entries expire first)"""
+        now = time.monotonic()
+        while self._idempotency_keys:
+            key, (_, expires_at) = next(iter(self._idempotency_keys.items()))
+            if expires_at > now:
+                break
+            del self._idempotency_keys[key]
+
+    def cancel_task(self, task_id: str) -> bool:
+        """Cancel a task - queued tasks never start, running tasks are interrupted
+
+        Returns:
+            True if the task was cancelled, False if unknown or already finished
+        """
+        task = self.tasks.get(task_id)
+        if not task or task.is_terminal:
+            return False
+
+        running = self._running.get(task_id)
+        if running and not running.done():
+            # _execute_task records the CANCELLED status when the cancellation lands
+            running.cancel()
+            logger.info(f"Cancelling running task {task_id}")
+            return True
+
+        # Not dispatched yet: the worker skips non-QUEUED entries when they reach the top
+        task.finish(TaskStatus.CANCELLED, error="Task cancelled before it started")
+        self.metrics["cancelled"] += 1
+        self._release_capacity(task)
+        self.stats.task_dequeued(task.task_type)
+        self._record_outcome(task)
+        logger.info(f"Cancelled queued task {task_id}")
+        return True
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Get queue counters"""
+        return dict(self.metrics)
+
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Get per-type queue statistics alongside the global counters"""
+        return {
+            "waiting": self.queue.qsize(),
+            "running": self.running_count,
+            "outstanding": dict(self._outstanding),
+            "capacity": dict(self.capacity),
+            "counters": self.get_metrics(),
+            "by_type": self.stats.snapshot(),
+        }
+
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get task status"""
         task = self.tasks.get(task_id)
@@ -229,33 +535,54 @@ class TaskQueue:
                 "status": task.status.value
             }
 
+        if task.result_ref:
+            # Large results live on disk until asked for
+            try:
+                return self.result_store.load(task.result_ref)
+            except (OSError, ValueError) as e:
+                return self._result_unavailable(task, e)
+
         return task.result
 
+    async def get_task_result_async(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get task result if completed, reading a spilled result in a worker thread"""
+        task = self.tasks.get(task_id)
+        if not task or task.status != TaskStatus.COMPLETED or not task.result_ref:
+            return self.get_task_result(task_id)
+
+        try:
+            return await asyncio.to_thread(self.result_store.load, task.result_ref)
+        except (OSError, ValueError) as e:
+            return self._result_unavailable(task, e)
+
+    def _result_unavailable(self, task: Task, error: Exception) -> Dict[str, Any]:
+        """Describe a spilled result that could not be read back"""
+        logger.error(f"Failed to load spilled result of task {task.task_id}: {error}")
+        return {"error": f"Task result unavailable: {error}", "status": task.status.value}
+
     def list_tasks(self, task_type: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
-        """List all tasks or tasks of specific type"""
-        tasks = []
-        for task in self.tasks.values():
-            if task_type and task.task_type != task_type:
-                continue
-            tasks.append(task.to_dict())
+        """List all tasks or tasks of specific type (without result payloads)"""
+        tasks = [task for task in self.tasks.values() if not task_type or task.task_type == task_type]
 
-        # Sort by created_at descending
-        tasks.sort(key=lambda x: x["created_at"], reverse=True)
-        return tasks[:limit]
+        # Sort by creation time descending, then serialize only what is returned
+        tasks.sort(key=lambda t: t.created_ts, reverse=True)
+        return [task.to_summary_dict() for task in tasks[:limit]]
 
     def _cleanup_old_tasks(self):
         """Remove old completed/failed tasks"""
         completed_tasks = [
-            (t.task_id, t.completed_at)
+            (t.task_id, t.finished_ns)
             for t in self.tasks.values()
-            if t.status in [TaskStatus.COMPLETED, TaskStatus.FAILED]
+            if t.is_terminal
         ]
 
         if len(completed_tasks) > 50:
-            completed_tasks.sort(key=lambda x: x[1] or "")
+            completed_tasks.sort(key=lambda x: x[1] or 0)
             for task_id, _ in completed_tasks[:-50]:
                 if task_id in self.task_depth_tracking:
                     del self.task_depth_tracking[task_id]
-                del self.tasks[task_id]
+                task = self.tasks.pop(task_id)
+                if task.result_ref:
+                    self.result_store.release(task.result_ref)
 
             logger.debug(f"Cleaned up {len(completed_tasks) - 50} old tasks")
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""Task Result Store
+
+Content-addressed on-disk storage for large task results. Payloads above a
+size threshold are written once per distinct content under
+`<state_dir>/results/<digest[:2]>/<digest>.json`; tasks keep only a small
+handle and load the payload on demand.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPILL_THRESHOLD = 32 * 1024  # bytes of serialized JSON
+
+
+class ResultStore:
+    """Spill large results to content-addressed files with reference counting
+
+    Identical payloads share one file. A file is deleted when the last task
+    referencing it is released. Tasks are not persisted across restarts, so
+    anything left in the directory from a previous run is removed on startup.
+
+    spill() may run in a worker thread; reference counts and file creation and
+    deletion are kept consistent under a lock.
+    """
+
+    def __init__(self, root: Path, threshold: int = DEFAULT_SPILL_THRESHOLD):
+        self.root = Path(root)
+        self.threshold = threshold
+        self._refcounts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if self.root.exists():
+            shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def spill(self, result: Any) -> Optional[Dict[str, Any]]:
+        """Write the result to disk if it exceeds the threshold
+
+        Returns:
+            Handle {"digest", "size_bytes"} if spilled, None if the result should stay in memory
+        """
+        try:
+            payload = json.dumps(result, separators=(",", ":")).encode("utf-8")
+        except (TypeError, ValueError):
+            # Not plain JSON - keep it in memory rather than change its types
+            return None
+
+        if len(payload) <= self.threshold:
+            return None
+
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self._path(digest)
+        with self._lock:
+            if digest not in self._refcounts or not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Write to a temp file and rename so readers never see a partial payload
+                fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(payload)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+
+            self._refcounts[digest] = self._refcounts.get(digest, 0) + 1
+        logger.debug(f"Spilled {len(payload)} byte result to {path}")
+        return {"digest": digest, "size_bytes": len(payload)}
+
+    def load(self, handle: Dict[str, Any]) -> Any:
+        """Read a spilled result back from disk"""
+        with open(self._path(handle["digest"]), "rb") as f:
+            return json.loads(f.read())
+
+    def release(self, handle: Dict[str, Any]):
+        """Drop one reference to a spilled result, deleting the file when unused"""
+        digest = handle["digest"]
+        with self._lock:
+            remaining = self._refcounts.get(digest, 0) - 1
+            if remaining > 0:
+                self._refcounts[digest] = remaining
+                return
+
+            self._refcounts.pop(digest, None)
+            try:
+                self._path(digest).unlink()
+            except FileNotFoundError:
+                pass
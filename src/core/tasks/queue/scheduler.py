@@ -0,0 +1,129 @@
+"""Fair Task Scheduler
+
+Deficit round-robin (DRR) across per-agent flows so one agent flooding the
+queue cannot starve the others. Within a flow, tasks are still ordered by
+priority, then earliest deadline, then FIFO.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from src.core.tasks.queue.task import Task
+
+logger = logging.getLogger(__name__)
+
+# Heap entry: (-priority, deadline_ns or inf, sequence, task_id)
+_Entry = Tuple[int, float, int, str]
+
+
+def flow_key(task: Task) -> str:
+    """Flow a task is scheduled in - its agent, or its task type when not tied to an agent"""
+    return getattr(task, "agent_id", None) or task.task_type
+
+
+class FairScheduler:
+    """Async DRR scheduler over per-agent priority heaps
+
+    Each dispatch costs one unit of deficit. A flow at the head of the round
+    receives its weight as quantum each time it comes around, so a flow with
+    weight 2 is dispatched twice as often as a flow with weight 1 while both
+    have work, and a flow with a single task waits for at most one quantum of
+    every other active flow regardless of how deep their backlogs are.
+
+    Priority only orders tasks within a flow: a high-priority task in one
+    flow does not run ahead of other flows' turns.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, default_weight: float = 1.0):
+        if default_weight <= 0:
+            raise ValueError(f"default_weight must be positive, got {default_weight}")
+        self.default_weight = default_weight
+        self.weights: Dict[str, float] = {}
+        for key, weight in (weights or {}).items():
+            self.set_weight(key, weight)
+
+        self._flows: Dict[str, List[_Entry]] = {}
+        self._active: Deque[str] = deque()  # Round-robin order of non-empty flows
+        self._deficit: Dict[str, float] = {}
+        self._sequence = itertools.count()
+        self._size = 0
+        self._not_empty = asyncio.Event()
+
+    def set_weight(self, key: str, weight: float):
+        """Set the relative share of a flow (agent ID or task type)"""
+        if weight <= 0:
+            raise ValueError(f"Weight for {key} must be positive, got {weight}")
+        self.weights[key] = weight
+
+    def put(self, task: Task):
+        """Add a task to its flow"""
+        key = flow_key(task)
+        heap = self._flows.get(key)
+        if heap is None:
+            heap = self._flows[key] = []
+            self._deficit[key] = 0.0
+            self._active.append(key)
+            if len(self._active) == 1:
+                self._top_up(key)  # Heads the round straight away
+
+        deadline = task.deadline_ns if task.deadline_ns is not None else math.inf
+        heapq.heappush(heap, (-task.priority, deadline, next(self._sequence), task.task_id))
+        self._size += 1
+        self._not_empty.set()
+
+    def get_nowait(self) -> str:
+        """Pop the next task ID according to DRR
+
+        Raises:
+            asyncio.QueueEmpty: If no task is waiting
+        """
+        if not self._size:
+            raise asyncio.QueueEmpty()
+
+        while True:
+            key = self._active[0]
+            if self._deficit[key] >= 1:
+                heap = self._flows[key]
+                entry = heapq.heappop(heap)
+                self._deficit[key] -= 1
+                self._size -= 1
+
+                if not heap:
+                    # Idle flows do not bank deficit
+                    self._active.popleft()
+                    del self._flows[key]
+                    del self._deficit[key]
+                    if self._active:
+                        self._top_up(self._active[0])  # The turn passes to the next flow
+                return entry[-1]
+
+            # Quantum spent - pass the turn and top up the next flow
+            self._active.rotate(-1)
+            self._top_up(self._active[0])
+
+    def _top_up(self, key: str):
+        """Give a flow arriving at the head of the round its quantum"""
+        self._deficit[key] += self.weights.get(key, self.default_weight)
+
+    async def get(self) -> str:
+        """Wait for and pop the next task ID"""
+        while not self._size:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    def qsize(self) -> int:
+        """Number of waiting entries across all flows"""
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def flow_depths(self) -> Dict[str, int]:
+        """Number of waiting entries per flow"""
+        return {key: len(heap) for key, heap in self._flows.items()}
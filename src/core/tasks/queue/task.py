@@ -1,10 +1,20 @@
 """Generic Task Base Classes
 
 Provides base classes for different types of tasks that can be queued and executed.
+
+Tasks are slotted records: timestamps are kept as one epoch float plus
+time.monotonic_ns() stamps and only formatted as ISO strings when serialized,
+and to_dict() output is cached until the task changes.
+
+The cache holds the result, request and tool arguments by reference, as
+to_dict() always has, so changes made to them in place show up in it.
+Reassigning any of them, the status, the error or the agent invalidates
+it. The remaining fields (ID, type, priority, timeout, idempotency key,
+tool name and parent task) are fixed once the task is queued.
 """
 
-import uuid
-from dataclasses import dataclass, field
+import os
+import time
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Dict, Optional
@@ -16,68 +26,254 @@ class TaskStatus(Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+
+
+# Statuses after which a task will never run again
+TERMINAL_STATUSES = frozenset(
+    {TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED, TaskStatus.TIMED_OUT}
+)
+
+
+def _generate_task_id() -> str:
+    """Generate a short random task ID (same 8 hex char shape as a truncated uuid4)"""
+    return os.urandom(4).hex()
+
+
+def _format_epoch(timestamp: Optional[float]) -> Optional[str]:
+    """Format an epoch timestamp as an ISO 8601 UTC string"""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
 
 
-@dataclass
 class Task:
     """Base class for all tasks"""
-    task_id: str
-    task_type: str
-    status: TaskStatus
-    created_at: str
-    completed_at: Optional[str] = None
-    result: Optional[dict[str, Any]] = None
-    error: Optional[str] = None
-    priority: int = 0  # Higher number = higher priority
+
+    __slots__ = (
+        "task_id",
+        "task_type",
+        "priority",  # Higher number = higher priority
+        "timeout",  # Seconds allowed from creation to completion
+        "deadline_ns",  # Absolute time.monotonic_ns() deadline derived from timeout
+        "idempotency_key",  # Resubmissions with the same key reuse this task
+        "created_ts",  # Epoch seconds at creation
+        "created_ns",  # time.monotonic_ns() at creation
+        "started_ns",  # time.monotonic_ns() when dispatched to an executor
+        "finished_ns",  # time.monotonic_ns() when a terminal status was reached
+        "result_ref",  # Handle of a result spilled to disk by the queue's ResultStore
+        "_status",
+        "_result",
+        "_error",
+        "_dict_cache",
+        "_summary_cache",
+    )
+
+    def __init__(
+        self,
+        task_id: str,
+        task_type: str,
+        status: TaskStatus = TaskStatus.QUEUED,
+        priority: int = 0,
+        timeout: Optional[float] = None,
+        idempotency_key: Optional[str] = None,
+        result: Optional[dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ):
+        self.task_id = task_id
+        self.task_type = task_type
+        self.priority = priority
+        self.timeout = timeout
+        self.idempotency_key = idempotency_key
+        self.created_ts = time.time()
+        self.created_ns = time.monotonic_ns()
+        self.deadline_ns = None if timeout is None else self.created_ns + int(timeout * 1_000_000_000)
+        self.started_ns: Optional[int] = None
+        self.finished_ns: Optional[int] = None
+        self.result_ref: Optional[Dict[str, Any]] = None
+        self._status = status
+        self._result = result
+        self._error = error
+        self._dict_cache: Optional[Dict[str, Any]] = None
+        self._summary_cache: Optional[Dict[str, Any]] = None
 
     @classmethod
-    def create(cls, task_type: str, priority: int = 0, **kwargs):
-        """Create a new task with generated ID and timestamp"""
-        return cls(
-            task_id=str(uuid.uuid4())[:8],
-            task_type=task_type,
-            status=TaskStatus.QUEUED,
-            created_at=datetime.now(timezone.utc).isoformat(),
-            priority=priority,
-            **kwargs
-        )
+    def create(cls, task_type: str, priority: int = 0, timeout: Optional[float] = None, **kwargs):
+        """Create a new task with generated ID"""
+        return cls(task_id=_generate_task_id(), task_type=task_type, priority=priority, timeout=timeout, **kwargs)
+
+    # Mutable fields invalidate the cached dictionaries when they change
+
+    def _invalidate(self):
+        self._dict_cache = None
+        self._summary_cache = None
+
+    @property
+    def status(self) -> TaskStatus:
+        return self._status
+
+    @status.setter
+    def status(self, value: TaskStatus):
+        self._status = value
+        self._invalidate()
+
+    @property
+    def result(self) -> Optional[dict[str, Any]]:
+        return self._result
+
+    @result.setter
+    def result(self, value: Optional[dict[str, Any]]):
+        self._result = value
+        self._invalidate()
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._error
+
+    @error.setter
+    def error(self, value: Optional[str]):
+        self._error = value
+        self._invalidate()
+
+    @property
+    def created_at(self) -> str:
+        """Creation time as an ISO string"""
+        return _format_epoch(self.created_ts)
+
+    @property
+    def completed_at(self) -> Optional[str]:
+        """Completion time as an ISO string, derived from the monotonic finish stamp"""
+        return _format_epoch(self.completed_ts)
+
+    @property
+    def completed_ts(self) -> Optional[float]:
+        """Completion time in epoch seconds"""
+        if self.finished_ns is None:
+            return None
+        return self.created_ts + (self.finished_ns - self.created_ns) / 1_000_000_000
+
+    @property
+    def is_terminal(self) -> bool:
+        """Whether the task has finished, one way or another"""
+        return self._status in TERMINAL_STATUSES
+
+    def time_remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None if the task has no deadline"""
+        if self.deadline_ns is None:
+            return None
+        return (self.deadline_ns - time.monotonic_ns()) / 1_000_000_000
+
+    def start(self, started_ns: Optional[int] = None):
+        """Mark the task as running and stamp its start time (now, unless given)"""
+        self.started_ns = time.monotonic_ns() if started_ns is None else started_ns
+        self.status = TaskStatus.RUNNING
+
+    def finish(self, status: TaskStatus, error: Optional[str] = None):
+        """Move the task to a terminal status and stamp its completion time"""
+        self.finished_ns = time.monotonic_ns()
+        if error is not None:
+            self._error = error
+        self.status = status
 
     def to_dict(self) -> dict[str, Any]:
-        """Convert to dictionary for serialization"""
-        return {
+        """Convert to dictionary for serialization (cached until the task changes)"""
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        return dict(self._dict_cache)
+
+    def spill_result(self, handle: Dict[str, Any]):
+        """Replace the in-memory result with a handle to its on-disk copy"""
+        self.result_ref = handle
+        self.result = None
+
+    def to_summary_dict(self) -> dict[str, Any]:
+        """Serialized form without the result payload, for listings (cached like to_dict)"""
+        if self._summary_cache is None:
+            self._summary_cache = self._build_dict(include_result=False)
+        return dict(self._summary_cache)
+
+    def _build_dict(self, include_result: bool = True) -> dict[str, Any]:
+        """Build the serialized form - subclasses extend this"""
+        data = {
             "task_id": self.task_id,
             "task_type": self.task_type,
-            "status": self.status.value,
+            "status": self._status.value,
             "created_at": self.created_at,
             "completed_at": self.completed_at,
-            "result": self.result,
-            "error": self.error,
+            "result_ref": self.result_ref,
+            "error": self._error,
             "priority": self.priority,
+            "timeout": self.timeout,
+            "idempotency_key": self.idempotency_key,
         }
+        if include_result:
+            data["result"] = self._result
+        return data
+
+    def __hash__(self):
+        return hash(self.task_id)
+
+    def __eq__(self, other):
+        if not isinstance(other, Task):
+            return NotImplemented
+        return self.task_id == other.task_id
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(task_id={self.task_id!r}, task_type={self.task_type!r}, status={self._status.value})"
 
 
-@dataclass
 class AgentTask(Task):
     """Task for agent operations - maintains backward compatibility"""
-    agent_id: str = ""
-    request: dict[str, Any] = field(default_factory=dict)
+
+    __slots__ = ("_agent_id", "_request")
+
+    def __init__(self, agent_id: str = "", request: Optional[dict[str, Any]] = None, **kwargs):
+        kwargs.setdefault("task_type", "agent_operation")
+        super().__init__(**kwargs)
+        self._agent_id = agent_id
+        self._request = request if request is not None else {}
+
+    @property
+    def agent_id(self) -> str:
+        return self._agent_id
+
+    @agent_id.setter
+    def agent_id(self, value: str):
+        self._agent_id = value
+        self._invalidate()
+
+    @property
+    def request(self) -> dict[str, Any]:
+        return self._request
+
+    @request.setter
+    def request(self, value: dict[str, Any]):
+        self._request = value
+        self._invalidate()
 
     @classmethod
-    def create(cls, agent_id: str, request: dict[str, Any], priority: int = 0):
+    def create(
+        cls,
+        agent_id: str,
+        request: dict[str, Any],
+        priority: int = 0,
+        timeout: Optional[float] = None,
+        idempotency_key: Optional[str] = None,
+    ):
         """Create a new agent task"""
         return cls(
-            task_id=str(uuid.uuid4())[:8],
-            task_type="agent_operation",
-            status=TaskStatus.QUEUED,
-            created_at=datetime.now(timezone.utc).isoformat(),
+            task_id=_generate_task_id(),
             priority=priority,
+            timeout=timeout,
+            idempotency_key=idempotency_key,
             agent_id=agent_id,
             request=request
         )
 
-    def to_dict(self) -> dict[str, Any]:
+    def _build_dict(self, include_result: bool = True) -> dict[str, Any]:
         """Convert to dictionary with agent-specific fields"""
-        base_dict = super().to_dict()
+        base_dict = super()._build_dict(include_result)
         base_dict.update({
             "agent_id": self.agent_id,
             "request": self.request,
@@ -85,58 +281,58 @@ class AgentTask(Task):
         return base_dict
 
 
-@dataclass
 class ToolCallTask(Task):
     """Task for MCP tool operations"""
-    tool_name: str = ""
-    tool_args: dict[str, Any] = field(default_factory=dict)
-    parent_task_id: Optional[str] = None
-    agent_id: Optional[str] = None  # Add agent_id field
-
-    def __init__(self, **kwargs):
-        tool_args = kwargs.pop('tool_args', {})
-        tool_name = kwargs.pop('tool_name', '')
-        parent_task_id = kwargs.pop('parent_task_id', None)
-        agent_id = kwargs.pop('agent_id', None)
-        
+
+    __slots__ = ("tool_name", "_tool_args", "parent_task_id", "agent_id")
+
+    def __init__(
+        self,
+        tool_name: str = "",
+        tool_args: Optional[dict[str, Any]] = None,
+        parent_task_id: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        **kwargs,
+    ):
         # Ensure task_type is always tool_call
-        kwargs['task_type'] = "tool_call"
-        
+        kwargs["task_type"] = "tool_call"
         super().__init__(**kwargs)
-        
+
         self.tool_name = tool_name
-        self.tool_args = tool_args
+        self._tool_args = tool_args if tool_args is not None else {}
         self.parent_task_id = parent_task_id
-        self.agent_id = agent_id
+        self.agent_id = agent_id  # Not serialized
+
+    @property
+    def tool_args(self) -> dict[str, Any]:
+        return self._tool_args
+
+    @tool_args.setter
+    def tool_args(self, value: dict[str, Any]):
+        self._tool_args = value
+        self._invalidate()
 
     @classmethod
     def create(cls, tool_name: str, tool_args: dict[str, Any],
-               parent_task_id: Optional[str] = None, priority: int = 1):
+               parent_task_id: Optional[str] = None, priority: int = 1, timeout: Optional[float] = None,
+               idempotency_key: Optional[str] = None):
         """Create a new tool call task"""
         return cls(
-            task_id=str(uuid.uuid4())[:8],
-            status=TaskStatus.QUEUED,
-            created_at=datetime.now(timezone.utc).isoformat(),
+            task_id=_generate_task_id(),
+            timeout=timeout,
+            idempotency_key=idempotency_key,
             tool_name=tool_name,
             tool_args=tool_args,
             parent_task_id=parent_task_id,
             priority=priority
         )
 
-    def to_dict(self) -> dict[str, Any]:
+    def _build_dict(self, include_result: bool = True) -> dict[str, Any]:
         """Convert to dictionary with tool-specific fields"""
-        base_dict = super().to_dict()
+        base_dict = super()._build_dict(include_result)
         base_dict.update({
             "tool_name": self.tool_name,
             "tool_args": self.tool_args,
             "parent_task_id": self.parent_task_id,
         })
         return base_dict
-    
-    def __hash__(self):
-        return hash(self.task_id)
-        
-    def __eq__(self, other):
-        if not isinstance(other, ToolCallTask):
-            return NotImplemented
-        return self.task_id == other.task_id
\ No newline at end of file
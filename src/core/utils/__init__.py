@@ -2,6 +2,7 @@
 
 from .utils import (
     build_prompt,
+    create_mcp_error_response,
     create_mcp_response,
     create_response,
     ensure_parent_dirs,
@@ -19,6 +20,7 @@ from .utils import (
 __all__ = [
     "create_response",
     "create_mcp_response",
+    "create_mcp_error_response",
     "handle_exception",
     "validate_path",
     "get_workspace_root",
@@ -120,6 +120,22 @@ def create_mcp_response(success: bool, message: str, is_json: bool = False) -> d
         return {"content": [{"type": "text", "text": f"❌ **Error:** {message}"}], "isError": True}
 
 
+def create_mcp_error_response(message: str, error_type: str, metadata: Optional[dict] = None) -> dict:
+    """Create MCP-compliant error response with machine-readable details
+
+    Args:
+        message: Human-readable error message
+        error_type: Stable error identifier (e.g., "task_queue_full")
+        metadata: Extra details for the caller, such as a retry_after hint
+
+    Returns:
+        MCP-compliant error response with structuredContent
+    """
+    response = create_mcp_response(False, message)
+    response["structuredContent"] = {"error_type": error_type, **(metadata or {})}
+    return response
+
+
 def handle_exception(e: Exception, context: str) -> dict:
     """Handle exceptions with consistent error format
 
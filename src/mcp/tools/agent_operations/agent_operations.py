@@ -11,7 +11,8 @@ Responsibilities:
 import logging
 from typing import Any, Optional
 
-from src.core.utils.utils import create_mcp_response, handle_exception
+from src.core.exceptions import FileOwnershipConflict, TaskQueueFull, create_error_response
+from src.core.utils.utils import create_mcp_error_response, create_mcp_response, handle_exception
 
 logger = logging.getLogger(__name__)
 
@@ -30,19 +31,18 @@ class AgentOperations:
 
         try:
             agents = []
-            agent_list = self.agent_registry.list_agents()
-
-            for agent in agent_list:
+            # Listing only needs metadata, so agents are not built for it
+            for state in self.agent_registry.list_agent_states():
                 agent_info = {
-                    "id": agent.state.agent_id,
-                    "name": agent.state.name,
-                    "description": agent.state.description,
-                    "files_count": len(agent.state.managed_files),
-                    "interactions": agent.state.interaction_count,
-                    "success_rate": agent.state.success_rate,
-                    "created_at": agent.state.created_at,
-                    "last_updated": agent.state.last_updated,
-                    "total_tasks": agent.state.total_tasks_completed,
+                    "id": state.agent_id,
+                    "name": state.name,
+                    "description": state.description,
+                    "files_count": len(state.managed_files),
+                    "interactions": state.interaction_count,
+                    "success_rate": state.success_rate,
+                    "created_at": state.created_at,
+                    "last_updated": state.last_updated,
+                    "total_tasks": state.total_tasks_completed,
                 }
                 agents.append(agent_info)
 
@@ -71,21 +71,22 @@ class AgentOperations:
             return {"success": False, "error": "Agent registry not available"}
 
         try:
-            agent = self.agent_registry.get_agent(agent_id)
-            if not agent:
+            # Indexed state only - building the agent could unload another one
+            state = self.agent_registry.agent_index.get(agent_id)
+            if not state:
                 return {"success": False, "error": f"Agent not found: {agent_id}"}
 
             info = {
-                "id": agent.state.agent_id,
-                "name": agent.state.name,
-                "description": agent.state.description,
-                "files_count": len(agent.state.managed_files),
-                "managed_files": list(agent.state.managed_files),
-                "interactions": agent.state.interaction_count,
-                "success_rate": agent.state.success_rate,
-                "created_at": agent.state.created_at,
-                "last_updated": agent.state.last_updated,
-                "total_tasks": agent.state.total_tasks_completed,
+                "id": state.agent_id,
+                "name": state.name,
+                "description": state.description,
+                "files_count": len(state.managed_files),
+                "managed_files": list(state.managed_files),
+                "interactions": state.interaction_count,
+                "success_rate": state.success_rate,
+                "created_at": state.created_at,
+                "last_updated": state.last_updated,
+                "total_tasks": state.total_tasks_completed,
             }
 
             return {"success": True, "agent": info}
@@ -107,6 +108,18 @@ class AgentOperations:
             logger.error(f"Failed to get registry stats: {e}")
             return {"success": False, "error": str(e)}
 
+    def get_queue_stats(self) -> dict[str, Any]:
+        """Get task queue statistics"""
+        if not self.agent_registry:
+            return {"success": False, "error": "Agent registry not available"}
+
+        try:
+            return {"success": True, "stats": self.agent_registry.get_queue_stats()}
+
+        except Exception as e:
+            logger.error(f"Failed to get queue stats: {e}")
+            return {"success": False, "error": str(e)}
+
     def create_agent(self, name: str, description: str, specialized_files: list[str] = None) -> dict[str, Any]:
         """Create a new agent"""
         if not self.agent_registry:
@@ -126,6 +139,10 @@ class AgentOperations:
 
             return {"success": True, "agent": agent.to_dict(), "response_text": response_text}
 
+        except FileOwnershipConflict as e:
+            logger.warning(f"Rejected agent {name}: {e}")
+            return create_error_response(e)
+
         except Exception as e:
             logger.error(f"Failed to create agent: {e}")
             return {"success": False, "error": str(e)}
@@ -144,69 +161,120 @@ class AgentOperations:
             return {"success": False, "error": "Agent registry not available"}
 
         try:
-            agent = self.agent_registry.get_agent(agent_id)
-            if not agent:
-                return {"success": False, "error": f"Agent not found: {agent_id}"}
-
-            # Import task type enum
-            from src.schemas.agents.agents import TaskType
-
-            # Map string task type to enum
-            task_type_map = {
-                "conversation": TaskType.CONVERSATION,
-                "file_edit": TaskType.FILE_EDIT,
-                "code_generation": TaskType.CODE_GENERATION,
-                "system_query": TaskType.SYSTEM_QUERY,
-            }
+            with self.agent_registry.agent_in_use(agent_id) as agent:
+                if not agent:
+                    return {"success": False, "error": f"Agent not found: {agent_id}"}
+
+                # Import task type enum
+                from src.schemas.agents.agents import TaskType
+
+                # Map string task type to enum
+                task_type_map = {
+                    "conversation": TaskType.CONVERSATION,
+                    "file_edit": TaskType.FILE_EDIT,
+                    "code_generation": TaskType.CODE_GENERATION,
+                    "system_query": TaskType.SYSTEM_QUERY,
+                }
 
-            task_enum = task_type_map.get(task_type, TaskType.CONVERSATION)
+                task_enum = task_type_map.get(task_type, TaskType.CONVERSATION)
 
-            # Create agent request
-            from src.schemas.agents.agents import create_standard_request
+                # Create agent request
+                from src.schemas.agents.agents import create_standard_request
 
-            request = create_standard_request(message, task_enum, agent_id)
+                request = create_standard_request(message, task_enum, agent_id)
 
-            # Process the request through the agent
-            response = await agent.process_request(request)
+                # Process the request through the agent
+                response = await agent.process_request(request)
 
-            return {
-                "success": response.success,
-                "content": response.content,
-                "agent_id": response.agent_id,
-                "task_type": response.task_type.value,
-                "timestamp": response.timestamp,
-                "files_modified": response.files_modified or [],
-            }
+                return {
+                    "success": response.success,
+                    "content": response.content,
+                    "agent_id": response.agent_id,
+                    "task_type": response.task_type.value,
+                    "timestamp": response.timestamp,
+                    "files_modified": response.files_modified or [],
+                }
 
         except Exception as e:
             logger.error(f"Failed to chat with agent {agent_id}: {e}")
             return {"success": False, "error": str(e)}
 
-    def queue_agent_task(self, agent_id: str, message: str, task_type: str) -> dict[str, Any]:
+    def queue_agent_task(
+        self,
+        agent_id: str,
+        message: str,
+        task_type: str,
+        timeout: Optional[float] = None,
+        idempotency_key: Optional[str] = None,
+        files: Optional[list[str]] = None,
+    ) -> dict[str, Any]:
         """Queue an agent task for async execution"""
         if not self.agent_registry:
             return {"success": False, "error": "Agent registry not available"}
 
         try:
-            # Check agent exists
-            agent = self.agent_registry.get_agent(agent_id)
-            if not agent:
+            # Check agent exists (its indexed state is enough; the executor builds the agent)
+            state = self.agent_registry.agent_index.get(agent_id)
+            if not state:
                 return {"success": False, "error": f"Agent not found: {agent_id}"}
 
+            # A live idempotency key means this is a resubmission of an earlier task
+            deduplicated = bool(
+                idempotency_key and self.agent_registry.task_queue.resolve_idempotency_key(idempotency_key, agent_id)
+            )
+
             # Queue the task
-            task_id = self.agent_registry.queue_task(agent_id, {"message": message, "task_type": task_type})
+            request = {"message": message, "task_type": task_type}
+            if files:
+                request["files"] = files
+
+            task_id = self.agent_registry.queue_task(
+                agent_id,
+                request,
+                timeout=timeout,
+                idempotency_key=idempotency_key,
+            )
+
+            if deduplicated:
+                status = self.agent_registry.get_task_status(task_id)
+                return {
+                    "success": True,
+                    "task_id": task_id,
+                    "status": status["status"] if status else "queued",
+                    "deduplicated": True,
+                    "message": f"Task {task_id} already submitted for agent {state.name} (idempotency key reused)",
+                }
 
             return {
                 "success": True,
                 "task_id": task_id,
                 "status": "queued",
-                "message": f"Task {task_id} queued for agent {agent.state.name}",
+                "deduplicated": False,
+                "message": f"Task {task_id} queued for agent {state.name}",
             }
 
+        except TaskQueueFull as e:
+            logger.warning(f"Task queue full, rejecting task for {agent_id}: {e}")
+            return create_error_response(e)
+
         except Exception as e:
             logger.error(f"Failed to queue task: {e}")
             return {"success": False, "error": str(e)}
 
+    def cancel_task(self, task_id: str) -> dict[str, Any]:
+        """Cancel a queued or running task"""
+        if not self.agent_registry:
+            return {"success": False, "error": "Agent registry not available"}
+
+        if not self.agent_registry.task_queue.get_task_status(task_id):
+            return {"success": False, "error": f"Task not found: {task_id}"}
+
+        if not self.agent_registry.cancel_task(task_id):
+            status = self.agent_registry.task_queue.get_task_status(task_id)["status"]
+            return {"success": False, "error": f"Task {task_id} already finished with status: {status}"}
+
+        return {"success": True, "task_id": task_id}
+
     def check_task_status(self, task_id: str) -> dict[str, Any]:
         """Check status of a queued task"""
         if not self.agent_registry:
@@ -218,12 +286,12 @@ class AgentOperations:
 
         return {"success": True, **status}
 
-    def get_task_result(self, task_id: str) -> dict[str, Any]:
+    async def get_task_result(self, task_id: str) -> dict[str, Any]:
         """Get result of a completed task"""
         if not self.agent_registry:
             return {"success": False, "error": "Agent registry not available"}
 
-        result = self.agent_registry.task_queue.get_task_result(task_id)
+        result = await self.agent_registry.task_queue.get_task_result_async(task_id)
         if not result:
             return {"success": False, "error": f"Task not found or not completed: {task_id}"}
 
@@ -251,6 +319,38 @@ def initialize_agent_operations_tool(agent_registry) -> None:
     _agent_operations_tool = AgentOperations(agent_registry)
 
 
+def _format_seconds(value: Optional[float]) -> str:
+    """Format a latency for display"""
+    if value is None:
+        return "-"
+    return f"{value * 1000:.0f}ms" if value < 1 else f"{value:.2f}s"
+
+
+def _format_queue_stats(stats: dict[str, Any]) -> str:
+    """Format queue statistics as MCP response text"""
+    text = "**Task Queue Statistics:**\n"
+    text += f"Waiting: {stats['waiting']}  Running: {stats['running']}\n"
+    counters = stats["counters"]
+    text += (
+        f"Timeouts: {counters.get('timeouts', 0)}  Cancelled: {counters.get('cancelled', 0)}  "
+        f"Rejected: {counters.get('rejected', 0)}  Deduplicated: {counters.get('deduplicated', 0)}\n"
+    )
+
+    for task_type, type_stats in stats["by_type"].items():
+        wait = type_stats["wait_seconds"]
+        run = type_stats["run_seconds"]
+        outcomes = type_stats["outcomes"]
+        limit = stats["capacity"].get(task_type)
+        text += f"\n**{task_type}**\n"
+        text += f"Depth: {type_stats['depth']} (max {type_stats['max_depth']})"
+        text += f"  Outstanding: {stats['outstanding'].get(task_type, 0)}/{limit if limit is not None else '∞'}\n"
+        text += f"Wait: p50 {_format_seconds(wait['p50'])}, p95 {_format_seconds(wait['p95'])}, max {_format_seconds(wait['max'])}\n"
+        text += f"Run: p50 {_format_seconds(run['p50'])}, p95 {_format_seconds(run['p95'])}, max {_format_seconds(run['max'])}\n"
+        text += "Outcomes: " + (", ".join(f"{status} {count}" for status, count in sorted(outcomes.items())) or "none") + "\n"
+
+    return text
+
+
 async def agent_operations_tool(args: dict[str, Any]) -> dict[str, Any]:
     """Agent operations MCP tool interface
 
@@ -258,10 +358,12 @@ async def agent_operations_tool(args: dict[str, Any]) -> dict[str, Any]:
     - list: List all agents with details
     - info: Get detailed information about a specific agent
     - stats: Get agent registry statistics
+    - queue_stats: Get task queue depth, wait/run time percentiles and outcomes per task type
     - create: Create a new agent with specified name, description, and managed files
     - queue_task: Queue a task for async execution (PREFERRED for agent interactions)
     - task_status: Check status of queued task
     - task_result: Get result of completed task
+    - cancel_task: Cancel a queued or running task
     - list_tasks: List all queued/running tasks
 
     DEBUG OPERATIONS (Use only for troubleshooting):
@@ -272,7 +374,7 @@ async def agent_operations_tool(args: dict[str, Any]) -> dict[str, Any]:
     if not operation:
         return create_mcp_response(
             False,
-            "Operation parameter required. STRUCTURED: list, info, stats, create, queue_task, task_status, task_result, list_tasks. DEBUG: debug_chat",
+            "Operation parameter required. STRUCTURED: list, info, stats, queue_stats, create, queue_task, task_status, task_result, cancel_task, list_tasks. DEBUG: debug_chat",
         )
 
     if not _agent_operations_tool:
@@ -316,15 +418,33 @@ async def agent_operations_tool(args: dict[str, Any]) -> dict[str, Any]:
                 stats = result["stats"]
                 stats_text = "**Agent Registry Statistics:**\n"
                 stats_text += f"Total Agents: {stats.get('total_agents', 0)}\n"
+                stats_text += (
+                    f"Loaded Agents: {stats.get('hydrated_agents', 0)}/{stats.get('max_hydrated_agents', 0)} "
+                    f"({stats.get('resident_bytes', 0) / 1024:.0f} KB resident)\n"
+                )
                 stats_text += f"Managed Files: {stats.get('managed_files', 0)}\n"
                 stats_text += f"Total Interactions: {stats.get('total_interactions', 0)}\n"
                 stats_text += f"Queued Tasks: {stats.get('queued_tasks', 0)}\n"
                 stats_text += f"Active Tasks: {stats.get('active_tasks', 0)}\n"
+                stats_text += f"Timed Out Tasks: {stats.get('timed_out_tasks', 0)}\n"
+                stats_text += f"Deduplicated Submissions: {stats.get('deduplicated_submissions', 0)}\n"
+                stats_text += f"Rejected Tasks: {stats.get('rejected_tasks', 0)}\n"
+                stats_text += (
+                    f"Batched Tasks: {stats.get('batched_tasks', 0)} "
+                    f"({stats.get('llm_calls_saved', 0)} LLM calls saved)\n"
+                )
                 stats_text += f"Registry Integrity: {'✅ Good' if stats.get('integrity', False) else '❌ Issues'}"
                 return create_mcp_response(True, stats_text)
             else:
                 return create_mcp_response(False, result.get("error", "Operation failed"))
 
+        elif operation == "queue_stats":
+            result = _agent_operations_tool.get_queue_stats()
+            if result["success"]:
+                return create_mcp_response(True, _format_queue_stats(result["stats"]))
+            else:
+                return create_mcp_response(False, result.get("error", "Operation failed"))
+
         elif operation == "create":
             name = args.get("name", "")
             description = args.get("description", "")
@@ -365,6 +485,8 @@ async def agent_operations_tool(args: dict[str, Any]) -> dict[str, Any]:
 
             if result["success"]:
                 return create_mcp_response(True, result["response_text"])
+            elif result.get("error_type"):
+                return create_mcp_error_response(result["error"], result["error_type"], result.get("metadata"))
             else:
                 return create_mcp_response(False, result.get("error", "Operation failed"))
 
@@ -410,14 +532,39 @@ async def agent_operations_tool(args: dict[str, Any]) -> dict[str, Any]:
             if task_type not in valid_task_types:
                 return create_mcp_response(False, f"Invalid task_type '{task_type}'. Must be one of: {', '.join(valid_task_types)}")
 
-            result = _agent_operations_tool.queue_agent_task(agent_id, message, task_type)
+            timeout = args.get("timeout")
+            if timeout is not None:
+                try:
+                    timeout = float(timeout)
+                except (TypeError, ValueError):
+                    return create_mcp_response(False, f"Invalid timeout '{timeout}'. Must be a number of seconds")
+                if timeout <= 0:
+                    return create_mcp_response(False, "timeout must be greater than 0 seconds")
+
+            idempotency_key = args.get("idempotency_key")
+
+            files = args.get("files")
+            if files is not None and (
+                not isinstance(files, list) or not all(isinstance(f, str) and f for f in files)
+            ):
+                return create_mcp_response(False, "files must be a list of file paths")
+
+            result = _agent_operations_tool.queue_agent_task(
+                agent_id, message, task_type, timeout, idempotency_key, files
+            )
 
             if result["success"]:
-                response_text = "**Task Queued Successfully**\n\n"
+                if result["deduplicated"]:
+                    response_text = "**Task Already Submitted**\n\n"
+                else:
+                    response_text = "**Task Queued Successfully**\n\n"
                 response_text += f"🎫 **Task ID:** {result['task_id']}\n"
                 response_text += f"📊 **Status:** {result['status']}\n"
                 response_text += f"💬 **Message:** {result['message']}"
                 return create_mcp_response(True, response_text)
+            elif result.get("error_type"):
+                # Structured rejection (e.g. queue full) so clients can honour retry_after
+                return create_mcp_error_response(result["error"], result["error_type"], result.get("metadata"))
             else:
                 return create_mcp_response(False, result.get("error", "Failed to queue task"))
 
@@ -448,7 +595,7 @@ async def agent_operations_tool(args: dict[str, Any]) -> dict[str, Any]:
             if not task_id:
                 return create_mcp_response(False, "task_id parameter required")
 
-            result = _agent_operations_tool.get_task_result(task_id)
+            result = await _agent_operations_tool.get_task_result(task_id)
 
             if result["success"]:
                 task_result = result["result"]
@@ -459,6 +606,19 @@ async def agent_operations_tool(args: dict[str, Any]) -> dict[str, Any]:
             else:
                 return create_mcp_response(False, result.get("error", "Failed to get result"))
 
+        elif operation == "cancel_task":
+            task_id = args.get("task_id", "")
+
+            if not task_id:
+                return create_mcp_response(False, "task_id parameter required")
+
+            result = _agent_operations_tool.cancel_task(task_id)
+
+            if result["success"]:
+                return create_mcp_response(True, f"🚫 Task {result['task_id']} cancelled")
+            else:
+                return create_mcp_response(False, result.get("error", "Failed to cancel task"))
+
         elif operation == "list_tasks":
             agent_id = args.get("agent_id")  # Optional filter
 
@@ -482,7 +642,7 @@ async def agent_operations_tool(args: dict[str, Any]) -> dict[str, Any]:
         else:
             return create_mcp_response(
                 False,
-                f"Unknown operation '{operation}'. STRUCTURED: list, info, stats, create, queue_task, task_status, task_result, list_tasks. DEBUG: debug_chat",
+                f"Unknown operation '{operation}'. STRUCTURED: list, info, stats, queue_stats, create, queue_task, task_status, task_result, cancel_task, list_tasks. DEBUG: debug_chat",
             )
 
     except Exception as e:
@@ -10,6 +10,7 @@ Responsibilities:
 import logging
 from typing import Any, Dict
 
+from src.core.mcp.bridge.validators import compile_tool_validators
 from src.core.utils.utils import create_mcp_response, handle_exception
 from src.mcp.tools.agent_operations.agent_operations import agent_operations_tool
 from src.mcp.tools.file_metadata.file_metadata import file_metadata_tool
@@ -65,6 +66,8 @@ class ConsolidatedToolExecutor:
             initialize_agent_operations_tool(agent_registry)
 
         self.available_tools = self._build_tool_registry()
+        # Compiled once here; the MCP bridge validates model tool calls with them before queuing
+        self.tool_validators = compile_tool_validators(self.available_tools.values())
 
     def _build_tool_registry(self) -> dict[str, Any]:
         """Build registry of  tools"""
@@ -227,16 +230,29 @@ class ConsolidatedToolExecutor:
                         "operation": {
                             "type": "string",
                             "description": "Agent operation to perform",
-                            "enum": ["list", "info", "stats", "create", "queue_task", "task_status", "task_result", "list_tasks"],
+                            "enum": ["list", "info", "stats", "queue_stats", "create", "queue_task", "task_status", "task_result", "cancel_task", "list_tasks"],
                         },
                         "agent_id": {"type": "string", "description": "Agent ID (for info and task operations)"},
                         "message": {"type": "string", "description": "Message to send to agent (for task operations)"},
-                        "task_id": {"type": "string", "description": "Task ID (for task status/result operations)"},
+                        "task_id": {"type": "string", "description": "Task ID (for task status/result/cancel operations)"},
                         "task_type": {
                             "type": "string",
                             "description": "Type of task (conversation, file_edit, code_generation, system_query)",
                             "default": "conversation",
                         },
+                        "timeout": {
+                            "type": "number",
+                            "description": "Seconds before a queued task is abandoned as timed out (for queue_task)",
+                        },
+                        "idempotency_key": {
+                            "type": "string",
+                            "description": "Reuse the same key when retrying queue_task to get the original task back",
+                        },
+                        "files": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Target files for a code_generation queue_task; several files are generated in one request",
+                        },
                         "name": {"type": "string", "description": "Agent name (for create operation)"},
                         "description": {"type": "string", "description": "Agent description (for create operation)"},
                         "specialized_files": {
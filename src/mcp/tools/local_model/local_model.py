@@ -8,6 +8,7 @@ Responsibilities:
 - Manage model lifecycle operations
 """
 
+import asyncio
 import logging
 from typing import Any, Optional
 
@@ -57,7 +58,8 @@ class LocalModelTool:
             self.llm_manager.performance_stats["total_requests"] += 1
 
             # Generate response using loaded model
-            response = self.llm_manager.llm(prompt, max_tokens=max_tokens, temperature=temperature, echo=False)
+            with self.llm_manager.generation_lock:
+                response = self.llm_manager.llm(prompt, max_tokens=max_tokens, temperature=temperature, echo=False)
 
             self.llm_manager.performance_stats["successful_requests"] += 1
 
@@ -145,7 +147,8 @@ async def local_model_tool(args: dict[str, Any]) -> dict[str, Any]:
             max_tokens = args.get("max_tokens", 512)
             temperature = args.get("temperature", 0.7)
 
-            result = _local_model_tool.generate_response(prompt, max_tokens, temperature)
+            # Blocks on the model (and its generation lock) - keep it off the event loop
+            result = await asyncio.to_thread(_local_model_tool.generate_response, prompt, max_tokens, temperature)
 
             if result["success"]:
                 response_text = f"**Generated Response:**\n\n{result['response']}\n\n"
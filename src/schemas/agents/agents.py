@@ -43,6 +43,8 @@ class AgentState:
     success_rate: float
     total_tasks_completed: int
     recent_interactions: list[dict[str, Any]]
+    conversation_summary: str = ""  # Model-written summary of entries older than the prompt window
+    summarized_seq: Optional[int] = None  # Log position (seq) of the newest entry folded into the summary
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary"""
@@ -107,14 +109,21 @@ class ConversationEntry:
     content: str
     timestamp: str
     metadata: Optional[dict[str, Any]] = None
+    seq: Optional[int] = None  # Position in the agent's conversation log, set when the entry is added
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary"""
         return asdict(self)
 
 
-def create_standard_request(message: str, task_type: TaskType, agent_id: str) -> AgentRequest:
+def create_standard_request(
+    message: str, task_type: TaskType, agent_id: str, files: Optional[list[str]] = None
+) -> AgentRequest:
     """Create a standard agent request"""
     return AgentRequest(
-        message=message, task_type=task_type, agent_id=agent_id, timestamp=datetime.now(timezone.utc).isoformat()
+        message=message,
+        task_type=task_type,
+        agent_id=agent_id,
+        files=files,
+        timestamp=datetime.now(timezone.utc).isoformat(),
     )